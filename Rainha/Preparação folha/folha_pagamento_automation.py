@@ -7,14 +7,42 @@ import pandas as pd
 import os
 import logging
 from datetime import datetime
+import re
 import json
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from modulo1_catalogo import competencia_do_nome
+from modulo2_nucleo import ARQUIVO_CONFIG_SISTEMA, SubstituidorCPF, carregar_mapeamento_cpf
+from modulo2_carregadores import CARREGADORES, processar_fonte, de_colunas
+from modulo3_consolidacao import ConsolidadorFolha
+from modulo4_historico import HistoricoFolha
+from modulo4_diferencas import DiferencaFolha, CHAVES_FOLHA_AGRUPADA
+from modulo5_identidades import CadastroIdentidades, tabela_identidades
+from instrumentacao import Instrumentacao
+
+# Processos para carregar as fontes do mês (uma planilha por processo)
+MAX_WORKERS_FONTES = min(len(CARREGADORES), os.cpu_count() or 1)
+
+# Fontes em formato longo (Atributo, Valor) na ordem do Table.Combine do
+# Folha Agrupada.txt: a consulta "Fenix" do M lê a folha GENESIS e vice-versa
+FONTES_RELATORIO = {"extrato": "Extrato", "genesis": "Genesis", "fenix": "Fenix"}
+
+# Planilhas de apoio -> coluna do nome do funcionário (Codigo via cadastro de identidades)
+COLUNAS_NOME_APOIO = {"alocacoes": "Nome", "gratificacao": "COLABORADOR", "nao_contabil": "Nome"}
 
 class FolhaPagamentoAutomation:
     def __init__(self, base_path="C:/Users/bsacr/OneDrive/Área de Trabalho/Claude Resumos/Rainha"):
         self.base_path = Path(base_path)
         self.setup_logging()
         self.load_config()
+        self.substituidor = SubstituidorCPF(self.config["mapeamento_funcionarios"])
+        self.consolidador = ConsolidadorFolha()
+        self.ultimo_relatorio = None
+        self.instrumentacao = Instrumentacao(
+            ativo=self.config["instrumentacao"]["ativo"],
+            memoria=self.config["instrumentacao"]["memoria"]
+        )
         
     def setup_logging(self):
         """Configura sistema de logs"""
@@ -46,11 +74,30 @@ class FolhaPagamentoAutomation:
                 "33333333333": "000170"
                 # ... adicionar mais conforme necessário
             },
+            # Competência AAAA-MM (None: deduzida do nome da folha, ex: "052025")
+            "competencia": None,
+            # Histórico Parquet particionado por competência/empresa (relativo a base_path)
+            "pasta_historico": "historico",
+            # Cadastro SQLite nome -> Codigo compartilhado entre os meses
+            # (relativo a base_path; None: sem identificação das planilhas de apoio)
+            "cadastro_identidades": "identidades.sqlite",
+            # Folha não contábil: combina todas as pastas de trabalho com "não" no
+            # nome da pasta do arquivo configurado (Folder.Files do Pagamentos.txt)
+            "combinar_nao_contabil": True,
+            # Pasta do xlsx exportado e do relatorio_validacao.json (None: pasta atual)
+            "pasta_saida": None,
+            # Tempo (e opcionalmente pico de memória) de cada etapa na seção
+            # "performance" do relatorio_validacao.json; chrome_trace: arquivo .json
+            "instrumentacao": {"ativo": True, "memoria": False, "chrome_trace": None},
             "colunas_padrao": [
                 "Código", "Nome", "CPF", "Empresa", "Cargo", 
                 "Salário Base", "Total Líquido", "Data Admissão"
             ]
         }
+        
+        # Completar com o mapeamento CPF -> Código do config_sistema.json
+        if ARQUIVO_CONFIG_SISTEMA.exists():
+            self.config["mapeamento_funcionarios"].update(carregar_mapeamento_cpf(ARQUIVO_CONFIG_SISTEMA))
     
     def validar_estrutura_arquivos(self):
         """Valida se todos os arquivos necessários existem"""
@@ -90,7 +137,7 @@ class FolhaPagamentoAutomation:
         """Aplica transformações específicas da Fenix"""
         # Substituir CPFs por códigos de funcionários
         if 'CPF' in df.columns:
-            df['Código'] = df['CPF'].map(self.config["mapeamento_funcionarios"]).fillna(df['CPF'])
+            df['Código'] = self.substituidor.substituir_serie(df['CPF'])
         
         # Adicionar empresa
         df['Empresa'] = 'Fenix'
@@ -120,13 +167,100 @@ class FolhaPagamentoAutomation:
         """Aplica transformações específicas da Genesis"""
         # Substituir CPFs por códigos
         if 'CPF' in df.columns:
-            df['Código'] = df['CPF'].map(self.config["mapeamento_funcionarios"]).fillna(df['CPF'])
+            df['Código'] = self.substituidor.substituir_serie(df['CPF'])
         
         df['Empresa'] = 'Genesis'
         df = df.dropna(subset=['Nome'])
         
         return df
     
+    def carregar_fontes(self, tipos=None, paralelo=True):
+        """
+        Carrega as fontes do mês, uma por processo (ProcessPoolExecutor)
+
+        Cada processo devolve colunas NumPy compactas (ver modulo2_carregadores);
+        os resultados são lidos na ordem de CARREGADORES, independente de qual
+        processo termina primeiro.
+
+        Returns:
+            Dict tipo -> DataFrame (fontes com erro ficam de fora)
+        """
+        tipos = [tipo for tipo in CARREGADORES if tipos is None or tipo in tipos]
+        arquivos = {
+            tipo: self.base_path / self.config["arquivos_entrada"][tipo]
+            for tipo in tipos if tipo in self.config["arquivos_entrada"]
+        }
+        arquivos = {tipo: arquivo for tipo, arquivo in arquivos.items() if arquivo.exists()}
+        if self.config.get("combinar_nao_contabil") and "nao_contabil" in arquivos:
+            arquivos["nao_contabil"] = arquivos["nao_contabil"].parent
+        self.logger.info(f"Carregando {len(arquivos)} fontes: {', '.join(arquivos)}")
+
+        resultados = {}
+        if paralelo and len(arquivos) > 1:
+            with ProcessPoolExecutor(max_workers=min(MAX_WORKERS_FONTES, len(arquivos))) as executor:
+                futuros = {tipo: executor.submit(processar_fonte, tipo, str(arquivo)) for tipo, arquivo in arquivos.items()}
+                for tipo, futuro in futuros.items():
+                    try:
+                        resultados[tipo] = futuro.result()
+                    except Exception as e:
+                        self.logger.error(f"❌ Erro ao processar {tipo}: {e}")
+        else:
+            for tipo, arquivo in arquivos.items():
+                try:
+                    resultados[tipo] = processar_fonte(tipo, str(arquivo))
+                except Exception as e:
+                    self.logger.error(f"❌ Erro ao processar {tipo}: {e}")
+
+        fontes = {}
+        for tipo, (_, colunas, resumo) in resultados.items():
+            fontes[tipo] = de_colunas(colunas)
+            self.instrumentacao.registrar(f"fonte_{tipo}", resumo['segundos'], registros=resumo['registros'])
+            self.logger.info(f"✅ {tipo}: {resumo['registros']} registros em {resumo['segundos']:.2f}s")
+        return fontes
+
+    def resolver_identidades(self, fontes):
+        """
+        Codigo do funcionário nas planilhas de apoio
+
+        A folha (Extrato, FENIX, GENESIS) alimenta o cadastro e tem os Codigos
+        ausentes preenchidos por ele; as planilhas de apoio consultam o
+        cadastro e só os nomes novos vão para a conciliação aproximada. A
+        identidade é o par (Empresa, Codigo), com a origem da folha como
+        empresa quando ela não traz a coluna Empresa.
+
+        Returns:
+            Dict tipo -> contagem de linhas por Identificação
+        """
+        if not self.config.get("cadastro_identidades"):
+            return {}
+        folhas = [tipo for tipo in FONTES_RELATORIO if tipo in fontes]
+        if not folhas:
+            return {}
+
+        competencia = self.obter_competencia()
+        cadastro = CadastroIdentidades(self.base_path / self.config["cadastro_identidades"])
+        try:
+            cadastro.aprender_folha({FONTES_RELATORIO[tipo]: fontes[tipo] for tipo in folhas}, competencia=competencia)
+            for tipo in folhas:
+                fontes[tipo] = cadastro.completar_codigos(fontes[tipo], FONTES_RELATORIO[tipo])
+            referencia = tabela_identidades({FONTES_RELATORIO[tipo]: fontes[tipo] for tipo in folhas})
+
+            contagens = {}
+            for tipo, coluna in COLUNAS_NOME_APOIO.items():
+                if tipo in fontes and coluna in fontes[tipo].columns:
+                    fontes[tipo], contagens[tipo] = cadastro.resolver(fontes[tipo], coluna, referencia, competencia)
+            self.logger.info(f"✅ Identidades: {cadastro.estatisticas()}")
+            return contagens
+        except Exception as e:
+            self.logger.error(f"❌ Erro no cadastro de identidades: {e}")
+            return {}
+        finally:
+            cadastro.fechar()
+
+    def consolidar_fontes(self, fontes):
+        """Monta a Folha Agrupada a partir das fontes em formato longo"""
+        return self.consolidar_dados(fontes.get("fenix"), fontes.get("genesis"), fontes.get("extrato"))
+
     def consolidar_dados(self, df_fenix, df_genesis, df_extrato=None):
         """Consolida todos os dados em uma base única"""
         self.logger.info("Consolidando dados...")
@@ -137,6 +271,16 @@ class FolhaPagamentoAutomation:
             self.logger.error("❌ Nenhum dataframe para consolidar")
             return None
         
+        # Relatórios em formato longo: Folha Agrupada (colunas e filtro do código M)
+        if any('Atributo' in df.columns for df in dataframes):
+            tabelas = {"fenix": df_fenix, "genesis": df_genesis, "extrato": df_extrato}
+            df_agrupado = self.consolidador.consolidar(
+                {empresa: tabelas[tipo] for tipo, empresa in FONTES_RELATORIO.items()},
+                coluna_origem='Empresa'
+            )
+            self.logger.info(f"✅ Dados consolidados: {len(df_agrupado)} registros")
+            return df_agrupado
+        
         # Unir todos os dataframes
         df_consolidado = pd.concat(dataframes, ignore_index=True)
         
@@ -168,30 +312,81 @@ class FolhaPagamentoAutomation:
         
         return df_agrupado
     
+    def contar_funcionarios(self, df):
+        """Conta funcionários; na Folha Agrupada, um por (Empresa, Nome)"""
+        if 'Atributo' in df.columns and 'Empresa' in df.columns:
+            return int(df.groupby(['Empresa', 'Nome'], observed=True).ngroups)
+        return len(df)
+    
     def gerar_relatorio_validacao(self, df):
         """Gera relatório de validação dos dados"""
         self.logger.info("Gerando relatório de validação...")
         
         relatorio = {
             "timestamp": datetime.now().isoformat(),
-            "total_funcionarios": len(df),
-            "empresas": df['Empresa'].value_counts().to_dict() if 'Empresa' in df.columns else {},
+            "total_funcionarios": self.contar_funcionarios(df),
+            "empresas": {str(k): int(v) for k, v in df['Empresa'].value_counts().items()} if 'Empresa' in df.columns else {},
             "funcionarios_sem_codigo": len(df[df['Código'].isna()]) if 'Código' in df.columns else 0,
-            "total_folha": df['Total Líquido'].sum() if 'Total Líquido' in df.columns else 0
+            "total_folha": float(df['Total Líquido'].sum()) if 'Total Líquido' in df.columns else 0
         }
         
-        # Salvar relatório
-        with open('relatorio_validacao.json', 'w') as f:
-            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        self.salvar_relatorio(relatorio)
         
         self.logger.info("✅ Relatório de validação salvo")
         return relatorio
     
-    def exportar_resultado(self, df, nome_arquivo=None):
-        """Exporta resultado final"""
+    def caminho_saida(self, nome_arquivo):
+        """Caminho de um arquivo gerado, dentro de pasta_saida se configurada"""
+        if self.config.get("pasta_saida"):
+            pasta = Path(self.config["pasta_saida"])
+            pasta.mkdir(parents=True, exist_ok=True)
+            return pasta / nome_arquivo
+        return Path(nome_arquivo)
+    
+    def salvar_relatorio(self, relatorio):
+        """Grava o relatorio_validacao.json"""
+        with open(self.caminho_saida('relatorio_validacao.json'), 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    
+    def obter_competencia(self):
+        """Competência AAAA-MM da configuração, do nome das folhas ou do nome da pasta"""
+        if self.config.get("competencia"):
+            return self.config["competencia"]
+        for nome in list(self.config["arquivos_entrada"].values()) + [self.base_path.resolve().name]:
+            competencia = competencia_do_nome(nome)
+            if competencia:
+                return competencia
+        return datetime.now().strftime("%Y-%m")
+    
+    def gravar_historico(self, df):
+        """Acrescenta a Folha Agrupada ao histórico por competência/empresa"""
+        if not self.config.get("pasta_historico") or 'Empresa' not in df.columns:
+            return []
+        try:
+            historico = HistoricoFolha(self.base_path / self.config["pasta_historico"])
+            return historico.gravar(df, self.obter_competencia())
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao gravar histórico: {e}")
+            return []
+    
+    def comparar_competencia_anterior(self, df):
+        """Rubricas novas, removidas e alteradas em relação à competência anterior do histórico"""
+        if not self.config.get("pasta_historico") or 'Empresa' not in df.columns:
+            return None
+        try:
+            historico = HistoricoFolha(self.base_path / self.config["pasta_historico"])
+            comparador = DiferencaFolha(CHAVES_FOLHA_AGRUPADA)
+            return comparador.comparar_com_historico(df, historico, self.obter_competencia())
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao comparar com a competência anterior: {e}")
+            return None
+    
+    def exportar_resultado(self, df, nome_arquivo=None, complementares=None):
+        """Exporta resultado final (complementares: Dict aba -> DataFrame)"""
         if nome_arquivo is None:
             data_atual = datetime.now().strftime("%m.%y")
             nome_arquivo = f"FolhaRainha.{data_atual}.xlsx"
+        nome_arquivo = self.caminho_saida(nome_arquivo)
         
         self.logger.info(f"Exportando para {nome_arquivo}...")
         
@@ -205,6 +400,10 @@ class FolhaPagamentoAutomation:
                     for empresa in df['Empresa'].unique():
                         df_empresa = df[df['Empresa'] == empresa]
                         df_empresa.to_excel(writer, sheet_name=empresa, index=False)
+                
+                # Planilhas de apoio (Gratificação, Não contábil, Alocações)
+                for aba, df_aba in (complementares or {}).items():
+                    df_aba.to_excel(writer, sheet_name=aba, index=False)
             
             self.logger.info(f"✅ Arquivo exportado: {nome_arquivo}")
             return True
@@ -213,30 +412,74 @@ class FolhaPagamentoAutomation:
             self.logger.error(f"❌ Erro ao exportar: {e}")
             return False
     
-    def executar_processo_completo(self):
-        """Executa o processo completo de automação"""
+    def executar_processo_completo(self, paralelo=True, nome_arquivo=None):
+        """
+        Executa o processo completo de automação
+
+        Args:
+            paralelo: Carrega as fontes em processos separados
+            nome_arquivo: xlsx exportado (padrão: FolhaRainha.MM.AA.xlsx do mês atual)
+        """
         self.logger.info("🚀 Iniciando processo de automação da folha de pagamento")
+        etapa = self.instrumentacao.etapa
         
         # 1. Validar arquivos
-        if not self.validar_estrutura_arquivos():
-            return False
+        with etapa("validacao_arquivos"):
+            if not self.validar_estrutura_arquivos():
+                return False
+        
+        # 2. Carregar dados (todas as fontes em paralelo)
+        with etapa("carregamento_fontes"):
+            fontes = self.carregar_fontes(paralelo=paralelo)
         
-        # 2. Carregar dados
-        df_fenix = self.carregar_arquivo_fenix()
-        df_genesis = self.carregar_arquivo_genesis()
+        # Codigo nas planilhas de apoio (cadastro primeiro, conciliação só para nomes novos)
+        with etapa("identidades"):
+            identidades = self.resolver_identidades(fontes)
         
         # 3. Consolidar
-        df_consolidado = self.consolidar_dados(df_fenix, df_genesis)
+        with etapa("consolidacao"):
+            df_consolidado = self.consolidar_fontes(fontes)
         
         if df_consolidado is None:
             self.logger.error("❌ Falha na consolidação")
             return False
         
         # 4. Validar
-        relatorio = self.gerar_relatorio_validacao(df_consolidado)
+        with etapa("relatorio"):
+            relatorio = self.gerar_relatorio_validacao(df_consolidado)
+        if identidades:
+            relatorio["identidades"] = identidades
+            self.salvar_relatorio(relatorio)
+        self.ultimo_relatorio = relatorio
         
         # 5. Exportar
-        sucesso = self.exportar_resultado(df_consolidado)
+        complementares = {
+            aba: fontes[tipo] for tipo, aba in
+            [("gratificacao", "Gratificação"), ("nao_contabil", "Não Contábil"), ("alocacoes", "Alocações")]
+            if tipo in fontes
+        }
+        
+        # Só as rubricas que mudaram desde a competência anterior, para revisão
+        with etapa("diferencas"):
+            df_diferencas = self.comparar_competencia_anterior(df_consolidado)
+        if df_diferencas is not None:
+            complementares["Alterações"] = df_diferencas
+        
+        with etapa("exportacao"):
+            sucesso = self.exportar_resultado(df_consolidado, nome_arquivo, complementares=complementares)
+        
+        # 6. Histórico (append-only, por competência e empresa)
+        if sucesso:
+            with etapa("historico"):
+                self.gravar_historico(df_consolidado)
+        
+        # 7. Custo das etapas no relatório (e no Chrome trace, se configurado)
+        if self.instrumentacao.ativo:
+            relatorio["performance"] = self.instrumentacao.resumo()
+            self.salvar_relatorio(relatorio)
+            if self.config["instrumentacao"].get("chrome_trace"):
+                self.instrumentacao.salvar_chrome_trace(self.config["instrumentacao"]["chrome_trace"])
+            self.instrumentacao.encerrar()
         
         if sucesso:
             self.logger.info("🎉 Processo concluído com sucesso!")
@@ -256,6 +499,7 @@ if __name__ == "__main__":
     sistema.executar_processo_completo()
     
     # Para executar apenas uma parte:
+    # fontes = sistema.carregar_fontes(["fenix", "genesis"])
     # df_fenix = sistema.carregar_arquivo_fenix()
     # df_genesis = sistema.carregar_arquivo_genesis()
     # df_final = sistema.consolidar_dados(df_fenix, df_genesis)
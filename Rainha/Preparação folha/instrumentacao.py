@@ -0,0 +1,235 @@
+"""
+INSTRUMENTAÇÃO: TEMPO E MEMÓRIA POR ETAPA
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Medir o tempo (perf_counter) de cada etapa, por context manager ou decorador
+2. Medir o pico de memória alocada em cada etapa (tracemalloc), se pedido
+3. Resumir as medições na seção "performance" dos relatórios JSON
+4. Exportar as etapas no formato Chrome Trace (chrome://tracing ou Perfetto)
+
+Uso:
+    instrumentacao = Instrumentacao(ativo=True, memoria=True)
+    with instrumentacao.etapa("leitura_excel"):
+        ...
+    relatorio["performance"] = instrumentacao.resumo()
+
+Desativada, etapa() devolve um context manager vazio compartilhado: o custo
+por etapa é uma chamada de método, sem relógio nem tracemalloc.
+"""
+
+import os
+import json
+import time
+import logging
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Context manager devolvido quando a instrumentação está desativada
+_ETAPA_VAZIA = nullcontext()
+
+_MB = 1024 * 1024
+
+class Instrumentacao:
+    """
+    Coleta o tempo e o pico de memória das etapas de um processamento
+
+    As etapas podem ser aninhadas; o pico de uma etapa inclui o das etapas
+    internas. Uma instância mede uma linha de execução por vez.
+    """
+
+    def __init__(self, ativo: bool = False, memoria: bool = False):
+        """
+        Inicializa a instrumentação
+
+        Args:
+            ativo: Mede as etapas (False: custo próximo de zero)
+            memoria: Mede também o pico de memória com tracemalloc (mais lento)
+        """
+        self.ativo = ativo
+        self.memoria = ativo and memoria
+        self.logger = logging.getLogger('Instrumentacao')
+
+        self.etapas: List[Dict] = []
+        self._pilha: List[Dict] = []
+        self._origem = time.perf_counter()
+        self._tracemalloc_proprio = False
+
+    def etapa(self, nome: str, **detalhes):
+        """
+        Context manager que mede uma etapa
+
+        Args:
+            nome: Nome da etapa no relatório
+            detalhes: Informações extras gravadas com a etapa (ex: arquivo)
+        """
+        if not self.ativo:
+            return _ETAPA_VAZIA
+        return self._medir(nome, detalhes)
+
+    def medir(self, nome: Optional[str] = None) -> Callable:
+        """Decorador de funções: mede cada chamada como uma etapa"""
+        def decorador(funcao):
+            rotulo = nome or funcao.__qualname__
+
+            @functools.wraps(funcao)
+            def envolvida(*args, **kwargs):
+                with self.etapa(rotulo):
+                    return funcao(*args, **kwargs)
+            return envolvida
+        return decorador
+
+    def _iniciar_memoria(self):
+        """Liga o tracemalloc na primeira etapa (se ainda não estiver ligado)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_proprio = True
+
+    @contextmanager
+    def _medir(self, nome: str, detalhes: Dict):
+        registro = {
+            "nome": nome,
+            "nivel": len(self._pilha),
+            "inicio": time.perf_counter() - self._origem
+        }
+        if detalhes:
+            registro["detalhes"] = detalhes
+
+        if self.memoria:
+            self._iniciar_memoria()
+            atual, pico = tracemalloc.get_traced_memory()
+            # O pico acumulado até aqui pertence à etapa externa
+            if self._pilha:
+                self._pilha[-1]["_pico"] = max(self._pilha[-1]["_pico"], pico)
+            tracemalloc.reset_peak()
+            registro["_base"] = registro["_pico"] = atual
+
+        self._pilha.append(registro)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        except BaseException:
+            registro["erro"] = True
+            raise
+        finally:
+            registro["segundos"] = time.perf_counter() - inicio
+            self._pilha.pop()
+
+            if self.memoria:
+                pico = max(registro.pop("_pico"), tracemalloc.get_traced_memory()[1])
+                registro["pico_memoria_mb"] = (pico - registro.pop("_base")) / _MB
+                if self._pilha:
+                    self._pilha[-1]["_pico"] = max(self._pilha[-1]["_pico"], pico)
+                tracemalloc.reset_peak()
+
+            self.etapas.append(registro)
+
+    def registrar(self, nome: str, segundos: float, **detalhes):
+        """
+        Acrescenta uma etapa medida fora desta instância (ex: em outro processo)
+
+        A etapa é posicionada terminando agora, no nível atual da pilha.
+        """
+        if not self.ativo:
+            return
+        registro = {
+            "nome": nome,
+            "nivel": len(self._pilha),
+            "inicio": max(time.perf_counter() - self._origem - segundos, 0.0),
+            "segundos": float(segundos),
+            "externa": True
+        }
+        if detalhes:
+            registro["detalhes"] = detalhes
+        self.etapas.append(registro)
+
+    def resumo(self) -> Dict:
+        """
+        Seção "performance" dos relatórios
+
+        Returns:
+            Dict com o total das etapas de primeiro nível e cada etapa na ordem de início
+        """
+        if not self.ativo:
+            return {"ativo": False}
+
+        etapas = []
+        for registro in sorted(self.etapas, key=lambda item: item["inicio"]):
+            etapa = {"nome": registro["nome"], "nivel": registro["nivel"], "segundos": round(registro["segundos"], 4)}
+            if "pico_memoria_mb" in registro:
+                etapa["pico_memoria_mb"] = round(registro["pico_memoria_mb"], 2)
+            for campo in ("detalhes", "externa", "erro"):
+                if campo in registro:
+                    etapa[campo] = registro[campo]
+            etapas.append(etapa)
+
+        return {
+            "ativo": True,
+            "memoria": self.memoria,
+            "total_segundos": round(sum(item["segundos"] for item in self.etapas if item["nivel"] == 0), 4),
+            "etapas": etapas
+        }
+
+    def salvar_chrome_trace(self, arquivo: Path) -> Optional[Path]:
+        """
+        Grava as etapas como eventos completos ("ph": "X") do Chrome Trace
+
+        Returns:
+            Caminho gravado ou None se a instrumentação estiver desativada
+        """
+        if not self.ativo:
+            return None
+
+        pid, tid = os.getpid(), threading.get_native_id()
+        eventos = []
+        for registro in self.etapas:
+            argumentos: Dict[str, Any] = dict(registro.get("detalhes", {}))
+            if "pico_memoria_mb" in registro:
+                argumentos["pico_memoria_mb"] = round(registro["pico_memoria_mb"], 2)
+            eventos.append({
+                "name": registro["nome"],
+                "cat": "externa" if registro.get("externa") else "etapa",
+                "ph": "X",
+                "ts": round(registro["inicio"] * 1e6, 1),
+                "dur": round(registro["segundos"] * 1e6, 1),
+                "pid": pid,
+                # Etapas de outros processos em trilha própria (podem se sobrepor)
+                "tid": 0 if registro.get("externa") else tid,
+                "args": argumentos
+            })
+
+        arquivo = Path(arquivo)
+        with open(arquivo, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+        self.logger.info(f"Chrome trace salvo: {arquivo}")
+        return arquivo
+
+    def encerrar(self):
+        """Desliga o tracemalloc, se foi ligado por esta instância"""
+        if self._tracemalloc_proprio:
+            tracemalloc.stop()
+            self._tracemalloc_proprio = False
+
+def medir_etapa(nome: Optional[str] = None) -> Callable:
+    """
+    Decorador de métodos: mede a chamada com o atributo instrumentacao do objeto
+
+    Args:
+        nome: Nome da etapa (padrão: nome do método)
+    """
+    def decorador(metodo):
+        rotulo = nome or metodo.__name__
+
+        @functools.wraps(metodo)
+        def envolvido(self, *args, **kwargs):
+            with self.instrumentacao.etapa(rotulo):
+                return metodo(self, *args, **kwargs)
+        return envolvido
+    return decorador
+
+# Instância compartilhada pelos objetos criados sem instrumentação
+INSTRUMENTACAO_DESATIVADA = Instrumentacao(ativo=False)
@@ -0,0 +1,375 @@
+"""
+MÓDULO 1 (BACKUP): ARMAZÉM DE BACKUP ENDEREÇADO POR CONTEÚDO
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Guardar cada versão de arquivo uma única vez, indexada pelo hash MD5
+2. Registrar cada sessão de backup como um manifesto (backup_info.json)
+3. Restaurar arquivos de uma sessão
+4. Aplicar a política de retenção e remover objetos não referenciados
+"""
+
+import os
+import sys
+import stat
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+# Blocos grandes reduzem o número de leituras em disco sincronizado (OneDrive)
+TAMANHO_BUFFER = 1024 * 1024
+MAX_WORKERS_BACKUP = 4
+
+def calcular_hash_md5(arquivo: Path) -> str:
+    """Calcula hash MD5 do arquivo lendo blocos grandes"""
+    hash_md5 = hashlib.md5()
+    with open(arquivo, "rb") as f:
+        for chunk in iter(lambda: f.read(TAMANHO_BUFFER), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+class ArmazemBackup:
+    """
+    Armazém de backup com deduplicação por conteúdo
+
+    Estrutura em disco:
+        backup/objetos/ab/abcdef...   conteúdo, um arquivo por hash
+        backup/backup_YYYYMMDD_HHMMSS_ffffff/backup_info.json   manifesto da sessão
+        backup/backup_YYYYMMDD_HHMMSS_ffffff/<tipo>_<nome>      hardlink para o objeto
+                                                                (quando o sistema de arquivos permite)
+    """
+
+    def __init__(self, pasta_backup: Path, politica: Dict = None):
+        """
+        Inicializa o armazém
+
+        Args:
+            pasta_backup: Pasta raiz dos backups
+            politica: Política de retenção ({"manter_sessoes": int, "manter_dias": int})
+        """
+        self.pasta_backup = Path(pasta_backup)
+        self.pasta_objetos = self.pasta_backup / "objetos"
+        self.pasta_temp = self.pasta_objetos / "tmp"
+        self.politica = politica or {"manter_sessoes": 20, "manter_dias": 90}
+        self.logger = logging.getLogger('ArmazemBackup')
+
+        self.pasta_temp.mkdir(parents=True, exist_ok=True)
+
+    def caminho_objeto(self, hash_arquivo: str) -> Path:
+        """Retorna o caminho do objeto de um hash"""
+        return self.pasta_objetos / hash_arquivo[:2] / hash_arquivo
+
+    def armazenar_arquivo(self, arquivo: Path) -> Dict:
+        """
+        Guarda o conteúdo do arquivo no armazém, numa única passada de leitura
+
+        O arquivo é copiado para um temporário enquanto o hash é calculado;
+        se o objeto já existir o temporário é descartado (deduplicação).
+
+        Returns:
+            Dicionário com hash, tamanho e se o objeto é novo
+        """
+        hash_md5 = hashlib.md5()
+        buffer = bytearray(TAMANHO_BUFFER)
+        visao = memoryview(buffer)
+        temporario = self.pasta_temp / f"{os.getpid()}_{id(arquivo)}_{arquivo.name}"
+
+        try:
+            with open(arquivo, "rb") as f_origem, open(temporario, "wb") as f_destino:
+                while True:
+                    lidos = f_origem.readinto(buffer)
+                    if not lidos:
+                        break
+                    hash_md5.update(visao[:lidos])
+                    f_destino.write(visao[:lidos])
+
+            hash_arquivo = hash_md5.hexdigest()
+            objeto = self.caminho_objeto(hash_arquivo)
+            novo = not objeto.exists()
+
+            if novo:
+                objeto.parent.mkdir(exist_ok=True)
+                shutil.copystat(arquivo, temporario)
+                try:
+                    os.replace(temporario, objeto)
+                except OSError:
+                    # Outra thread/processo gravou o mesmo conteúdo depois do
+                    # exists(); no Windows o replace sobre o objeto somente
+                    # leitura falha, mas o objeto já está no armazém
+                    if not objeto.exists():
+                        raise
+                    novo = False
+                else:
+                    # Objetos são imutáveis: hardlinks das sessões apontam para eles
+                    os.chmod(objeto, stat.S_IREAD)
+        finally:
+            if temporario.exists():
+                temporario.unlink()
+
+        return {
+            "hash": hash_arquivo,
+            "tamanho": objeto.stat().st_size,
+            "novo": novo
+        }
+
+    def _vincular(self, objeto: Path, destino: Path) -> bool:
+        """Cria hardlink do objeto na pasta da sessão; retorna False se não suportado"""
+        try:
+            os.link(objeto, destino)
+            return True
+        except OSError:
+            return False
+
+    def criar_sessao(self, arquivos: Dict[str, Path]) -> Dict:
+        """
+        Cria uma sessão de backup para os arquivos informados
+
+        Args:
+            arquivos: Dicionário tipo_arquivo: caminho_arquivo
+
+        Returns:
+            Conteúdo do manifesto (backup_info.json) da sessão
+        """
+        # Microssegundos e, se ainda assim a pasta existir (relógio de baixa
+        # resolução), um sufixo: duas sessões nunca compartilham o manifesto
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        pasta_sessao = self.pasta_backup / f"backup_{timestamp}"
+        sufixo = 0
+        while True:
+            try:
+                pasta_sessao.mkdir()
+                break
+            except FileExistsError:
+                sufixo += 1
+                pasta_sessao = self.pasta_backup / f"backup_{timestamp}_{sufixo}"
+
+        self.logger.info(f"Criando backup em: {pasta_sessao}")
+
+        backup_info = {"timestamp": timestamp, "arquivos": {}}
+        arquivos_existentes = {tipo: arquivo for tipo, arquivo in arquivos.items() if arquivo.exists()}
+        bytes_novos = 0
+
+        if arquivos_existentes:
+            max_workers = min(MAX_WORKERS_BACKUP, len(arquivos_existentes))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futuros = {
+                    tipo: executor.submit(self.armazenar_arquivo, arquivo)
+                    for tipo, arquivo in arquivos_existentes.items()
+                }
+
+                # Manter a ordem de descoberta no manifesto
+                for tipo, futuro in futuros.items():
+                    arquivo = arquivos_existentes[tipo]
+                    resultado = futuro.result()
+                    objeto = self.caminho_objeto(resultado["hash"])
+                    destino = pasta_sessao / f"{tipo}_{arquivo.name}"
+                    vinculado = self._vincular(objeto, destino)
+
+                    backup_info["arquivos"][tipo] = {
+                        "original": str(arquivo),
+                        "backup": str(destino if vinculado else objeto),
+                        "objeto": objeto.relative_to(self.pasta_backup).as_posix(),
+                        "hash": resultado["hash"],
+                        "tamanho": resultado["tamanho"]
+                    }
+
+                    if resultado["novo"]:
+                        bytes_novos += resultado["tamanho"]
+                    self.logger.info(
+                        f"Backup: {arquivo.name} -> {resultado['hash'][:12]} "
+                        f"({'novo' if resultado['novo'] else 'já armazenado'})"
+                    )
+
+        with open(pasta_sessao / "backup_info.json", "w", encoding="utf-8") as f:
+            json.dump(backup_info, f, indent=2, ensure_ascii=False)
+
+        self.logger.info(
+            f"Backup criado: {len(backup_info['arquivos'])} arquivos, "
+            f"{bytes_novos / 1024:.1f} KB novos no armazém"
+        )
+        return backup_info
+
+    def listar_sessoes(self) -> List[Path]:
+        """Lista as pastas de sessão, da mais antiga para a mais recente"""
+        return sorted(
+            pasta for pasta in self.pasta_backup.glob("backup_*")
+            if pasta.is_dir() and (pasta / "backup_info.json").exists()
+        )
+
+    def carregar_manifesto(self, sessao) -> Dict:
+        """Carrega o backup_info.json de uma sessão (nome ou caminho)"""
+        pasta_sessao = Path(sessao)
+        if not pasta_sessao.is_absolute() and not pasta_sessao.exists():
+            pasta_sessao = self.pasta_backup / pasta_sessao
+
+        with open(pasta_sessao / "backup_info.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _origem_restauracao(self, info: Dict) -> Path:
+        """Localiza o conteúdo de um arquivo da sessão (objeto ou cópia legada)"""
+        if "objeto" in info:
+            return self.pasta_backup / info["objeto"]
+        return Path(info["backup"])
+
+    def restaurar(self, sessao, destino: Path = None, tipos: List[str] = None) -> Dict[str, Path]:
+        """
+        Restaura os arquivos de uma sessão
+
+        Args:
+            sessao: Nome ou caminho da pasta da sessão
+            destino: Pasta de destino; se None, restaura no caminho original
+            tipos: Tipos de arquivo a restaurar; se None, restaura todos
+
+        Returns:
+            Dicionário tipo_arquivo: caminho_restaurado
+        """
+        manifesto = self.carregar_manifesto(sessao)
+        restaurados = {}
+
+        for tipo, info in manifesto["arquivos"].items():
+            if tipos and tipo not in tipos:
+                continue
+
+            origem = self._origem_restauracao(info)
+            nome_original = Path(info["original"].replace("\\", "/")).name
+            alvo = Path(destino) / nome_original if destino else Path(info["original"])
+            alvo.parent.mkdir(parents=True, exist_ok=True)
+
+            shutil.copyfile(origem, alvo)
+            shutil.copystat(origem, alvo)
+            os.chmod(alvo, stat.S_IREAD | stat.S_IWRITE)
+
+            hash_restaurado = calcular_hash_md5(alvo)
+            if hash_restaurado != info["hash"]:
+                raise ValueError(f"Hash divergente ao restaurar {tipo}: {hash_restaurado} != {info['hash']}")
+
+            restaurados[tipo] = alvo
+            self.logger.info(f"Restaurado: {tipo} -> {alvo}")
+
+        return restaurados
+
+    def _remover(self, caminho: Path):
+        """Remove arquivo ou pasta, inclusive objetos somente leitura"""
+        def liberar_e_remover(funcao, alvo, _):
+            os.chmod(alvo, stat.S_IREAD | stat.S_IWRITE)
+            funcao(alvo)
+
+        if caminho.is_dir():
+            # onerror está obsoleto desde o Python 3.12 (substituído por onexc)
+            if sys.version_info >= (3, 12):
+                shutil.rmtree(caminho, onexc=liberar_e_remover)
+            else:
+                shutil.rmtree(caminho, onerror=liberar_e_remover)
+        else:
+            os.chmod(caminho, stat.S_IREAD | stat.S_IWRITE)
+            caminho.unlink()
+
+    def coletar_lixo(self, manter_sessoes: int = None, manter_dias: int = None) -> Dict:
+        """
+        Aplica a política de retenção e remove objetos não referenciados
+
+        Uma sessão é mantida se estiver entre as `manter_sessoes` mais recentes,
+        se tiver menos de `manter_dias` dias ou se tiver o backup mais recente
+        de algum tipo de arquivo: arquivos inalterados não entram em sessões
+        novas (cache da validação), e essa pode ser a única cópia deles.
+
+        Returns:
+            Resumo com sessões e objetos removidos e bytes liberados
+        """
+        if manter_sessoes is None:
+            manter_sessoes = self.politica.get("manter_sessoes", 20)
+        if manter_dias is None:
+            manter_dias = self.politica.get("manter_dias", 90)
+
+        sessoes = self.listar_sessoes()
+        manifestos = {pasta_sessao: self.carregar_manifesto(pasta_sessao) for pasta_sessao in sessoes}
+        limite = datetime.now() - timedelta(days=manter_dias)
+        recentes = set(sessoes[-manter_sessoes:]) if manter_sessoes > 0 else set()
+
+        # Sessão mais recente de cada tipo
+        vigentes, tipos_vistos = set(), set()
+        for pasta_sessao in reversed(sessoes):
+            tipos = set(manifestos[pasta_sessao]["arquivos"]) - tipos_vistos
+            if tipos:
+                vigentes.add(pasta_sessao)
+                tipos_vistos |= tipos
+
+        resumo = {"sessoes_removidas": [], "objetos_removidos": 0, "bytes_liberados": 0}
+        referenciados = set()
+
+        for pasta_sessao in sessoes:
+            try:
+                # backup_YYYYMMDD_HHMMSS[_ffffff[_n]]
+                data_sessao = datetime.strptime(pasta_sessao.name[len("backup_"):][:15], "%Y%m%d_%H%M%S")
+            except ValueError:
+                data_sessao = datetime.fromtimestamp(pasta_sessao.stat().st_mtime)
+
+            if pasta_sessao in recentes or pasta_sessao in vigentes or data_sessao >= limite:
+                manifesto = manifestos[pasta_sessao]
+                referenciados.update(info["hash"] for info in manifesto["arquivos"].values())
+                continue
+
+            self._remover(pasta_sessao)
+            resumo["sessoes_removidas"].append(pasta_sessao.name)
+
+        for objeto in self.pasta_objetos.glob("??/*"):
+            if objeto.name not in referenciados:
+                resumo["bytes_liberados"] += objeto.stat().st_size
+                self._remover(objeto)
+                resumo["objetos_removidos"] += 1
+
+        self.logger.info(
+            f"Coleta de lixo: {len(resumo['sessoes_removidas'])} sessões e "
+            f"{resumo['objetos_removidos']} objetos removidos "
+            f"({resumo['bytes_liberados'] / 1024:.1f} KB liberados)"
+        )
+        return resumo
+
+# Linha de comando: restauração e coleta de lixo
+def main():
+    """Função principal: restaurar sessões e aplicar a política de retenção"""
+    parser = argparse.ArgumentParser(description="Armazém de backup da folha de pagamento")
+    parser.add_argument("--pasta-backup", default=r"C:\Users\bsacr\OneDrive\Área de Trabalho\Claude Resumos\Rainha\backup")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    subparsers.add_parser("listar", help="Lista as sessões de backup")
+
+    parser_restaurar = subparsers.add_parser("restaurar", help="Restaura os arquivos de uma sessão")
+    parser_restaurar.add_argument("sessao", help="Nome da sessão (ex: backup_20250621_180009_123456)")
+    parser_restaurar.add_argument("--destino", help="Pasta de destino (padrão: caminho original)")
+    parser_restaurar.add_argument("--tipos", nargs="*", help="Tipos a restaurar (ex: fenix genesis)")
+
+    parser_gc = subparsers.add_parser("gc", help="Aplica a retenção e remove objetos órfãos")
+    parser_gc.add_argument("--manter-sessoes", type=int)
+    parser_gc.add_argument("--manter-dias", type=int)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Política de retenção do config_sistema.json (importação tardia: o módulo de validação usa este)
+    from modulo1_validacao import carregar_configuracao_validacao
+    armazem = ArmazemBackup(Path(args.pasta_backup), carregar_configuracao_validacao()["backup"])
+
+    if args.comando == "listar":
+        for pasta_sessao in armazem.listar_sessoes():
+            manifesto = armazem.carregar_manifesto(pasta_sessao)
+            print(f"{pasta_sessao.name}: {', '.join(manifesto['arquivos'])}")
+
+    elif args.comando == "restaurar":
+        destino = Path(args.destino) if args.destino else None
+        restaurados = armazem.restaurar(args.sessao, destino, args.tipos)
+        print(f"{len(restaurados)} arquivos restaurados")
+
+    elif args.comando == "gc":
+        resumo = armazem.coletar_lixo(args.manter_sessoes, args.manter_dias)
+        print(f"Sessões removidas: {len(resumo['sessoes_removidas'])}")
+        print(f"Objetos removidos: {resumo['objetos_removidos']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+MÓDULO 1 (CATÁLOGO): CATÁLOGO PERSISTENTE DOS ARQUIVOS DE ENTRADA
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Varrer a árvore de entradas numa única passada (os.scandir)
+2. Classificar cada arquivo pelo tipo (padrões de arquivos_obrigatorios)
+3. Extrair a competência do nome (ex: 052025), dos demais arquivos da mesma
+   pasta ou das pastas (ex: 2025/Maio, 2025-05)
+4. Manter tipo, competência, tamanho, mtime e hash num banco SQLite
+
+Permite guardar vários meses na mesma árvore e localizar, por exemplo,
+"FENIX mais recente de 05/2025" por consulta indexada, sem novo glob.
+"""
+
+import os
+import re
+import sqlite3
+import fnmatch
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from modulo1_backup import calcular_hash_md5
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "março": 3, "abril": 4,
+    "maio": 5, "junho": 6, "julho": 7, "agosto": 8, "setembro": 9,
+    "outubro": 10, "novembro": 11, "dezembro": 12
+}
+
+# Competência num nome de arquivo ou pasta: MMAAAA (ex: "FOLHA GENESIS EXCEL
+# 052025.xlsx"), MM-AAAA ou AAAA-MM (ex: pasta "2025-05")
+PADROES_COMPETENCIA = [
+    (re.compile(r"(?<!\d)(0[1-9]|1[0-2])[-_. ]?(20\d{2})(?!\d)"), "mes_ano"),
+    (re.compile(r"(?<!\d)(20\d{2})[-_. ]?(0[1-9]|1[0-2])(?!\d)"), "ano_mes")
+]
+PADRAO_ANO = re.compile(r"^(20\d{2})$")
+
+def competencia_do_nome(nome: str) -> Optional[str]:
+    """Competência AAAA-MM de um nome de arquivo ou pasta (None se não houver)"""
+    for padrao, ordem in PADROES_COMPETENCIA:
+        correspondencia = padrao.search(nome)
+        if correspondencia:
+            mes, ano = correspondencia.groups() if ordem == "mes_ano" else reversed(correspondencia.groups())
+            return f"{ano}-{mes}"
+    return None
+
+def competencia_das_pastas(pasta: Path) -> Optional[str]:
+    """
+    Competência AAAA-MM pelas pastas: uma pasta de ano seguida de uma pasta
+    com o nome do mês (ex: .../2025/Maio/folha) ou o nome da própria pasta (ex: 2025-05)
+    """
+    partes = [parte.lower() for parte in pasta.parts]
+    for posicao, parte in enumerate(partes):
+        if PADRAO_ANO.match(parte) and posicao + 1 < len(partes):
+            mes = MESES.get(partes[posicao + 1])
+            if mes:
+                return f"{parte}-{mes:02d}"
+
+    return competencia_do_nome(pasta.name)
+
+def extrair_competencia(caminho: Path) -> Optional[str]:
+    """
+    Extrai a competência no formato AAAA-MM
+
+    Procura primeiro MMAAAA no nome do arquivo e depois nas pastas
+    (ver competencia_das_pastas). No catálogo, um arquivo sem competência no
+    nome (ex: "Extrato Mensal.xlsx") usa antes a dos demais arquivos da pasta.
+    """
+    return competencia_do_nome(caminho.stem) or competencia_das_pastas(caminho.parent)
+
+def intervalo_pasta(raiz: Path) -> Tuple[str, str]:
+    """
+    Limites (>=, <) dos caminhos catalogados dentro de uma pasta
+
+    Intervalo de texto em vez de LIKE: "_" e "%" no caminho não são
+    curingas, e a pasta irmã "Base de Dados 2" não entra na "Base de Dados".
+    """
+    prefixo = os.path.join(str(Path(raiz).resolve()), "")
+    return prefixo, prefixo + chr(0x10FFFF)
+
+class CatalogoEntradas:
+    """
+    Catálogo SQLite dos arquivos de entrada da folha
+    """
+
+    def __init__(self, arquivo_banco: Path, arquivos_obrigatorios: Dict):
+        """
+        Inicializa o catálogo
+
+        Args:
+            arquivo_banco: Caminho do banco SQLite
+            arquivos_obrigatorios: Configuração de tipos (tipo: {"pattern": ...})
+        """
+        self.arquivo_banco = Path(arquivo_banco)
+        self.logger = logging.getLogger('CatalogoEntradas')
+
+        # Padrões compilados uma única vez; sem distinção de maiúsculas, como no Windows
+        self.classificadores = [
+            (tipo, re.compile(fnmatch.translate(config["pattern"]), re.IGNORECASE))
+            for tipo, config in arquivos_obrigatorios.items()
+        ]
+
+        self.conexao = sqlite3.connect(self.arquivo_banco)
+        self._criar_tabelas()
+
+    def _criar_tabelas(self):
+        self.conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS arquivos (
+                caminho TEXT PRIMARY KEY,
+                nome TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                competencia TEXT,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_arquivos_tipo_competencia
+                ON arquivos (tipo, competencia, mtime_ns);
+        """)
+        self.conexao.commit()
+
+    def fechar(self):
+        self.conexao.close()
+
+    def classificar(self, nome_arquivo: str) -> Optional[str]:
+        """Retorna o primeiro tipo cujo padrão corresponde ao nome do arquivo"""
+        for tipo, padrao in self.classificadores:
+            if padrao.match(nome_arquivo):
+                return tipo
+        return None
+
+    def varrer(self, raiz: Path):
+        """Percorre a árvore numa única passada, gerando (caminho, stat) dos xlsx"""
+        pendentes = [raiz]
+        while pendentes:
+            pasta = pendentes.pop()
+            try:
+                with os.scandir(pasta) as entradas:
+                    for entrada in entradas:
+                        if entrada.is_dir(follow_symlinks=False):
+                            pendentes.append(entrada.path)
+                        elif (entrada.name.lower().endswith(".xlsx")
+                              and not entrada.name.startswith("~$")):
+                            yield Path(entrada.path), entrada.stat()
+            except (FileNotFoundError, PermissionError) as e:
+                self.logger.warning(f"Pasta ignorada na varredura: {pasta} ({e})")
+
+    def atualizar(self, raiz: Path, calcular_hash: bool = False) -> Dict[str, int]:
+        """
+        Sincroniza o catálogo com a árvore de arquivos
+
+        Apenas arquivos novos, com tamanho/mtime diferentes ou cuja competência
+        mudou (ex: chegou a folha do mês na mesma pasta) são regravados;
+        arquivos que sumiram da árvore são removidos do catálogo.
+
+        Args:
+            raiz: Pasta raiz das entradas
+            calcular_hash: Calcula o MD5 dos arquivos novos/alterados durante a varredura
+
+        Returns:
+            Contagem de arquivos novos/alterados, inalterados e removidos
+        """
+        raiz = Path(raiz)
+        existentes = {
+            caminho: (tamanho, mtime_ns, hash_arquivo, competencia)
+            for caminho, tamanho, mtime_ns, hash_arquivo, competencia in self.conexao.execute(
+                "SELECT caminho, tamanho, mtime_ns, hash, competencia FROM arquivos WHERE caminho >= ? AND caminho < ?",
+                intervalo_pasta(raiz)
+            )
+        }
+
+        resumo = {"alterados": 0, "inalterados": 0, "removidos": 0}
+        vistos = set()
+        gravar = []
+
+        # Competências no nome dos arquivos de cada pasta: "Extrato Mensal.xlsx"
+        # ao lado da "FOLHA GENESIS EXCEL 052025.xlsx" é de 05/2025
+        classificados = []
+        competencias_pasta: Dict[Path, set] = {}
+        for caminho, stat in self.varrer(raiz):
+            tipo = self.classificar(caminho.name)
+            if tipo is None:
+                continue
+            classificados.append((caminho, stat, tipo))
+            competencia = competencia_do_nome(caminho.stem)
+            if competencia:
+                competencias_pasta.setdefault(caminho.parent, set()).add(competencia)
+
+        for caminho, stat, tipo in classificados:
+            da_pasta = competencias_pasta.get(caminho.parent, set())
+            competencia = (
+                competencia_do_nome(caminho.stem)
+                or (next(iter(da_pasta)) if len(da_pasta) == 1 else None)
+                or competencia_das_pastas(caminho.parent)
+            )
+
+            chave = str(caminho.resolve())
+            vistos.add(chave)
+            anterior = existentes.get(chave)
+            inalterado = anterior is not None and anterior[0] == stat.st_size and anterior[1] == stat.st_mtime_ns
+            if inalterado and anterior[3] == competencia and (anterior[2] is not None or not calcular_hash):
+                resumo["inalterados"] += 1
+                continue
+
+            hash_arquivo = anterior[2] if inalterado else None
+            if hash_arquivo is None and calcular_hash:
+                hash_arquivo = calcular_hash_md5(caminho)
+            gravar.append((
+                chave, caminho.name, tipo, competencia,
+                stat.st_size, stat.st_mtime_ns, hash_arquivo
+            ))
+            resumo["alterados"] += 1
+
+        removidos = [(caminho,) for caminho in existentes if caminho not in vistos]
+        resumo["removidos"] = len(removidos)
+
+        with self.conexao:
+            self.conexao.executemany(
+                "INSERT OR REPLACE INTO arquivos VALUES (?, ?, ?, ?, ?, ?, ?)", gravar
+            )
+            self.conexao.executemany("DELETE FROM arquivos WHERE caminho = ?", removidos)
+
+        self.logger.info(
+            f"Catálogo atualizado: {resumo['alterados']} novos/alterados, "
+            f"{resumo['inalterados']} inalterados, {resumo['removidos']} removidos"
+        )
+        return resumo
+
+    def registrar_hash(self, caminho: Path, hash_arquivo: str):
+        """Grava o hash de um arquivo já calculado em outra etapa (ex: backup)"""
+        with self.conexao:
+            self.conexao.execute(
+                "UPDATE arquivos SET hash = ? WHERE caminho = ?",
+                (hash_arquivo, str(Path(caminho).resolve()))
+            )
+
+    @staticmethod
+    def _filtros(tipo: str = None, competencia: str = None, raiz: Path = None) -> Tuple[str, List]:
+        """Cláusula WHERE e parâmetros dos filtros de consulta"""
+        condicoes, parametros = [], []
+        if tipo:
+            condicoes.append("tipo = ?")
+            parametros.append(tipo)
+        if competencia:
+            condicoes.append("competencia = ?")
+            parametros.append(competencia)
+        if raiz is not None:
+            condicoes.append("caminho >= ? AND caminho < ?")
+            parametros.extend(intervalo_pasta(raiz))
+        return (f"WHERE {' AND '.join(condicoes)}" if condicoes else ""), parametros
+
+    def mais_recente(self, tipo: str, competencia: str = None, raiz: Path = None) -> Optional[Path]:
+        """
+        Retorna o arquivo mais recente (maior mtime) de um tipo
+
+        Args:
+            tipo: Tipo de arquivo (ex: "fenix")
+            competencia: Competência AAAA-MM; se None, considera todas
+            raiz: Só arquivos dentro desta pasta (um banco pode catalogar várias árvores)
+        """
+        where, parametros = self._filtros(tipo, competencia, raiz)
+        linha = self.conexao.execute(
+            f"SELECT caminho FROM arquivos {where} ORDER BY mtime_ns DESC LIMIT 1", parametros
+        ).fetchone()
+        return Path(linha[0]) if linha else None
+
+    def mais_recentes(self, tipos: List[str], competencia: str = None, raiz: Path = None) -> Dict[str, Path]:
+        """
+        Arquivo mais recente de cada tipo
+
+        Sem competência, os mais recentes de cada tipo precisam ser do mesmo
+        mês (arquivos sem competência conhecida não entram na comparação): uma
+        FENIX de 06/2025 com uma GENESIS de 05/2025 não é escolhida em silêncio.
+
+        Args:
+            tipos: Tipos de arquivo (ex: ["fenix", "genesis"])
+            competencia: Competência AAAA-MM; se None, considera todas
+            raiz: Só arquivos dentro desta pasta
+
+        Raises:
+            ValueError: Sem competência, os arquivos mais recentes são de meses diferentes
+        """
+        encontrados = {}
+        for tipo in tipos:
+            arquivo = self.mais_recente(tipo, competencia, raiz)
+            if arquivo is not None:
+                encontrados[tipo] = arquivo
+        if competencia is not None or not encontrados:
+            return encontrados
+
+        marcadores = ",".join("?" * len(encontrados))
+        por_competencia: Dict[str, List[str]] = {}
+        for tipo, valor in self.conexao.execute(
+            f"SELECT tipo, competencia FROM arquivos WHERE caminho IN ({marcadores}) AND competencia IS NOT NULL",
+            [str(arquivo) for arquivo in encontrados.values()]
+        ):
+            por_competencia.setdefault(valor, []).append(tipo)
+        if len(por_competencia) > 1:
+            detalhes = "; ".join(
+                f"{valor}: {', '.join(sorted(tipos_competencia))}"
+                for valor, tipos_competencia in sorted(por_competencia.items())
+            )
+            raise ValueError(f"Arquivos mais recentes de competências diferentes ({detalhes}); informe a competência")
+        return encontrados
+
+    def consultar(self, tipo: str = None, competencia: str = None, raiz: Path = None) -> List[Dict]:
+        """Lista as entradas do catálogo, opcionalmente filtradas (raiz: só dentro desta pasta)"""
+        where, parametros = self._filtros(tipo, competencia, raiz)
+
+        cursor = self.conexao.execute(
+            f"SELECT * FROM arquivos {where} ORDER BY competencia, tipo, mtime_ns", parametros
+        )
+        colunas = [descricao[0] for descricao in cursor.description]
+        return [dict(zip(colunas, linha)) for linha in cursor]
+
+    def competencias(self) -> List[str]:
+        """Lista as competências catalogadas"""
+        return [
+            linha[0] for linha in self.conexao.execute(
+                "SELECT DISTINCT competencia FROM arquivos WHERE competencia IS NOT NULL ORDER BY competencia"
+            )
+        ]
+
+# Linha de comando: atualizar e consultar o catálogo
+def main():
+    """Função principal: atualizar e consultar o catálogo de entradas"""
+    from modulo1_validacao import ValidadorArquivos
+
+    parser = argparse.ArgumentParser(description="Catálogo dos arquivos de entrada da folha")
+    parser.add_argument("--base-path", help="Pasta base (contém 'Base de Dados')")
+    parser.add_argument("--raiz", help="Raiz da árvore de entradas (padrão: Base de Dados)")
+    parser.add_argument("--hash", action="store_true", help="Calcular MD5 dos arquivos novos/alterados")
+    parser.add_argument("--tipo")
+    parser.add_argument("--competencia", help="AAAA-MM")
+    args = parser.parse_args()
+
+    validador = ValidadorArquivos(args.base_path)
+    catalogo = validador.catalogo
+    raiz = Path(args.raiz) if args.raiz else validador.pasta_dados
+    catalogo.atualizar(raiz, calcular_hash=args.hash)
+
+    for entrada in catalogo.consultar(args.tipo, args.competencia, raiz):
+        print(f"{entrada['competencia'] or '-':8} {entrada['tipo']:13} {entrada['nome']}")
+
+if __name__ == "__main__":
+    main()
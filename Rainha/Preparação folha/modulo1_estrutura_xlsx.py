@@ -0,0 +1,249 @@
+"""
+MÓDULO 1 (ESTRUTURA): LEITURA ESTRUTURAL DE ARQUIVOS XLSX
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Listar as planilhas a partir do workbook.xml, sem carregar o arquivo
+2. Ler apenas as primeiras linhas de uma planilha (cabeçalhos)
+3. Estimar linhas e colunas pelo elemento <dimension> da planilha
+
+O xlsx é lido diretamente como zip + XML em streaming, evitando o custo de
+um pd.read_excel completo só para conferir a estrutura.
+"""
+
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL_DOC = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_REL_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+PADRAO_REFERENCIA = re.compile(r"^([A-Z]+)(\d+)$")
+
+def coluna_para_indice(letras: str) -> int:
+    """Converte letras de coluna do Excel em índice base 1 (A=1, Z=26, AA=27)"""
+    indice = 0
+    for letra in letras:
+        indice = indice * 26 + (ord(letra) - ord("A") + 1)
+    return indice
+
+class LeitorEstruturaXlsx:
+    """
+    Leitor da estrutura de um arquivo xlsx diretamente do zip
+    """
+
+    def __init__(self, arquivo: Path):
+        """
+        Abre o arquivo xlsx
+
+        Args:
+            arquivo: Caminho do arquivo xlsx
+
+        Raises:
+            zipfile.BadZipFile: se o arquivo não for um xlsx válido
+        """
+        self.arquivo = Path(arquivo)
+        self.zip = zipfile.ZipFile(self.arquivo)
+        self._planilhas = None
+        self._strings_compartilhadas = []
+        self._iter_strings = None
+
+    def fechar(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def listar_planilhas(self) -> Dict[str, str]:
+        """
+        Lista as planilhas do workbook.xml
+
+        Returns:
+            Dicionário nome_planilha: caminho da planilha dentro do zip (ordem do arquivo)
+        """
+        if self._planilhas is not None:
+            return self._planilhas
+
+        relacoes = {}
+        with self.zip.open("xl/_rels/workbook.xml.rels") as f:
+            for rel in ET.parse(f).getroot().iter(f"{NS_REL_PKG}Relationship"):
+                alvo = rel.get("Target")
+                if alvo.startswith("/"):
+                    alvo = alvo.lstrip("/")
+                else:
+                    alvo = posixpath.normpath(posixpath.join("xl", alvo))
+                relacoes[rel.get("Id")] = alvo
+
+        self._planilhas = {}
+        with self.zip.open("xl/workbook.xml") as f:
+            for sheet in ET.parse(f).getroot().iter(f"{NS_MAIN}sheet"):
+                self._planilhas[sheet.get("name")] = relacoes.get(sheet.get(f"{NS_REL_DOC}id"))
+
+        return self._planilhas
+
+    def _caminho_planilha(self, planilha: str) -> str:
+        planilhas = self.listar_planilhas()
+        if planilha not in planilhas:
+            raise KeyError(f"Planilha não encontrada: {planilha}")
+        return planilhas[planilha]
+
+    def estimar_dimensao(self, planilha: str) -> Optional[Tuple[int, int]]:
+        """
+        Estima (linhas, colunas) pelo elemento <dimension> da planilha
+
+        Lê apenas o início do XML: o elemento <dimension> vem antes de <sheetData>.
+
+        Returns:
+            Tupla (linhas, colunas) ou None se a planilha não declarar dimensão
+        """
+        with self.zip.open(self._caminho_planilha(planilha)) as f:
+            for evento, elemento in ET.iterparse(f, events=("start",)):
+                if elemento.tag == f"{NS_MAIN}dimension":
+                    referencia = elemento.get("ref", "")
+                    fim = referencia.split(":")[-1]
+                    correspondencia = PADRAO_REFERENCIA.match(fim)
+                    if not correspondencia:
+                        return None
+                    return int(correspondencia.group(2)), coluna_para_indice(correspondencia.group(1))
+                if elemento.tag == f"{NS_MAIN}sheetData":
+                    return None
+        return None
+
+    def _string_compartilhada(self, indice: int) -> str:
+        """Resolve uma string compartilhada, lendo sharedStrings.xml só até o índice pedido"""
+        if self._iter_strings is None:
+            if "xl/sharedStrings.xml" not in self.zip.namelist():
+                return ""
+            self._iter_strings = ET.iterparse(self.zip.open("xl/sharedStrings.xml"), events=("end",))
+
+        while len(self._strings_compartilhadas) <= indice:
+            try:
+                evento, elemento = next(self._iter_strings)
+            except StopIteration:
+                return ""
+            if elemento.tag == f"{NS_MAIN}si":
+                texto = "".join(t.text or "" for t in elemento.iter(f"{NS_MAIN}t"))
+                self._strings_compartilhadas.append(texto)
+                elemento.clear()
+
+        return self._strings_compartilhadas[indice]
+
+    def _valor_celula(self, celula: ET.Element):
+        tipo = celula.get("t")
+        if tipo == "inlineStr":
+            return "".join(t.text or "" for t in celula.iter(f"{NS_MAIN}t"))
+
+        valor = celula.find(f"{NS_MAIN}v")
+        if valor is None or valor.text is None:
+            return None
+        if tipo == "s":
+            return self._string_compartilhada(int(valor.text))
+        return valor.text
+
+    def ler_primeiras_linhas(self, planilha: str, n_linhas: int = 10) -> List[Dict[int, object]]:
+        """
+        Lê apenas as primeiras linhas de uma planilha
+
+        Args:
+            planilha: Nome da planilha
+            n_linhas: Quantidade de linhas (com conteúdo) a ler
+
+        Returns:
+            Lista de linhas; cada linha é um dicionário índice_coluna (base 1): valor
+        """
+        linhas = []
+        with self.zip.open(self._caminho_planilha(planilha)) as f:
+            for evento, elemento in ET.iterparse(f, events=("end",)):
+                if elemento.tag != f"{NS_MAIN}row":
+                    continue
+
+                linha = {}
+                for posicao, celula in enumerate(elemento.iter(f"{NS_MAIN}c"), start=1):
+                    correspondencia = PADRAO_REFERENCIA.match(celula.get("r", ""))
+                    coluna = coluna_para_indice(correspondencia.group(1)) if correspondencia else posicao
+                    valor = self._valor_celula(celula)
+                    if valor is not None and valor != "":
+                        linha[coluna] = valor
+                elemento.clear()
+
+                if linha:
+                    linhas.append(linha)
+                if len(linhas) >= n_linhas:
+                    break
+
+        return linhas
+
+def validar_estrutura_xlsx(arquivo: Path, config_tipo: Dict, linhas_minimas: int,
+                           linhas_cabecalho: int = 10) -> Dict:
+    """
+    Valida planilhas esperadas, colunas críticas e quantidade mínima de linhas
+
+    Colunas no formato "ColumnN" (nomes padrão do Power Query para planilhas
+    sem cabeçalho) exigem apenas que a planilha tenha ao menos N colunas; as
+    demais precisam aparecer nas primeiras `linhas_cabecalho` linhas.
+    Sem planilhas esperadas, todas as planilhas do arquivo são conferidas.
+
+    Returns:
+        Dicionário com erros, warnings e info da estrutura
+    """
+    resultado = {"erros": [], "warnings": [], "info": {}}
+
+    with LeitorEstruturaXlsx(arquivo) as leitor:
+        planilhas = list(leitor.listar_planilhas())
+        resultado["info"]["planilhas"] = planilhas
+
+        esperadas = config_tipo.get("sheets_esperadas", [])
+        faltantes = [nome for nome in esperadas if nome not in planilhas]
+        for nome in faltantes:
+            resultado["erros"].append(f"Planilha esperada não encontrada: {nome}")
+
+        alvos = [nome for nome in esperadas if nome in planilhas] if esperadas else planilhas
+        colunas_criticas = config_tipo.get("colunas_criticas", [])
+        rotulos = [coluna for coluna in colunas_criticas if not re.match(r"^Column\d+$", coluna)]
+        min_colunas = max(
+            [int(coluna[len("Column"):]) for coluna in colunas_criticas if re.match(r"^Column\d+$", coluna)],
+            default=0
+        )
+
+        linhas_estimadas = {}
+        rotulos_encontrados = set()
+
+        for planilha in alvos:
+            dimensao = leitor.estimar_dimensao(planilha)
+            if dimensao is None:
+                resultado["warnings"].append(f"{planilha}: dimensão não declarada, linhas não estimadas")
+            else:
+                linhas, colunas = dimensao
+                linhas_estimadas[planilha] = linhas
+                if linhas < linhas_minimas:
+                    resultado["erros"].append(f"{planilha}: apenas {linhas} linhas (mínimo {linhas_minimas})")
+                if colunas < min_colunas:
+                    resultado["erros"].append(f"{planilha}: {colunas} colunas (esperado ao menos {min_colunas})")
+
+            if rotulos:
+                cabecalho = {
+                    str(valor).strip()
+                    for linha in leitor.ler_primeiras_linhas(planilha, linhas_cabecalho)
+                    for valor in linha.values()
+                }
+                presentes = {rotulo for rotulo in rotulos if rotulo.strip() in cabecalho}
+                rotulos_encontrados |= presentes
+                if len(alvos) > 1:
+                    for rotulo in rotulos:
+                        if rotulo not in presentes:
+                            resultado["warnings"].append(f"{planilha}: coluna '{rotulo}' não encontrada")
+
+        for rotulo in rotulos:
+            if rotulo not in rotulos_encontrados:
+                resultado["erros"].append(f"Coluna crítica não encontrada: {rotulo}")
+
+        resultado["info"]["linhas_estimadas"] = linhas_estimadas
+
+    return resultado
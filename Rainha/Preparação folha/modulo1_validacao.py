@@ -15,25 +15,190 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
+import time
 import hashlib
+import zipfile
+import argparse
+import xml.etree.ElementTree as ET
 from typing import Dict, List, Tuple, Optional
 
+from modulo1_backup import ArmazemBackup, calcular_hash_md5
+from modulo1_catalogo import CatalogoEntradas
+from modulo1_estrutura_xlsx import validar_estrutura_xlsx
+from modulo2_nucleo import ARQUIVO_CONFIG_SISTEMA
+from instrumentacao import INSTRUMENTACAO_DESATIVADA, Instrumentacao
+
+def configuracao_validacao_padrao() -> Dict:
+    """Regras padrão de validação (tipos de arquivo, limites e retenção do backup)"""
+    return {
+        "arquivos_obrigatorios": {
+            "fenix": {
+                "pattern": "*FENIX*.xlsx",
+                "alias": "FOLHA_FENIX",
+                "sheets_esperadas": ["Report"],
+                "colunas_criticas": ["Column1", "Column2", "Column3"]
+            },
+            "genesis": {
+                "pattern": "*GENESIS*.xlsx", 
+                "alias": "FOLHA_GENESIS", 
+                "sheets_esperadas": ["Report"],
+                "colunas_criticas": ["Column1", "Column2", "Column3"]
+            },
+            "alocacoes": {
+                "pattern": "*Alocações*.xlsx",
+                "alias": "ALOCACOES",
+                "sheets_esperadas": ["ALOCAÇÃO MAIO"],
+                "colunas_criticas": ["NOME", "FUNÇÃO", "ALOCAÇAO"]
+            },
+            "extrato": {
+                "pattern": "*Extrato*.xlsx",
+                "alias": "EXTRATO_MENSAL",
+                "sheets_esperadas": ["Extrato Mensal"],
+                "colunas_criticas": ["Column1", "Column2"]
+            },
+            "gratificacao": {
+                "pattern": "*Gratificação*.xlsx",
+                "alias": "GRATIFICACAO",
+                "sheets_esperadas": [],
+                "colunas_criticas": ["COLABORADOR", "Gratificação"]
+            },
+            "nao_contabil": {
+                "pattern": "*não contábil*.xlsx",
+                "alias": "NAO_CONTABIL",
+                "sheets_esperadas": [],
+                "colunas_criticas": []
+            }
+        },
+        "validacoes": {
+            "tamanho_minimo_kb": 10,
+            "linhas_minimas": 5,
+            "linhas_cabecalho": 10,
+            "encoding_aceitos": ["utf-8", "latin-1", "cp1252"]
+        },
+        "backup": {
+            "manter_sessoes": 20,
+            "manter_dias": 90
+        }
+    }
+
+# Seções do config_sistema.json aplicadas sobre as regras padrão
+SECOES_CONFIG_SISTEMA = ["validacoes", "backup"]
+
+def carregar_configuracao_validacao(arquivo_config: Path = ARQUIVO_CONFIG_SISTEMA) -> Dict:
+    """
+    Regras de validação: as padrão com as SECOES_CONFIG_SISTEMA do config_sistema.json por cima
+
+    Cada chave presente no arquivo substitui a padrão; as ausentes mantêm o padrão.
+
+    Args:
+        arquivo_config: config_sistema.json (se não existir, valem só as regras padrão)
+    """
+    config = configuracao_validacao_padrao()
+    if not Path(arquivo_config).exists():
+        return config
+    with open(arquivo_config, "r", encoding="utf-8") as f:
+        sistema = json.load(f)
+    for secao in SECOES_CONFIG_SISTEMA:
+        config[secao].update(sistema.get(secao, {}))
+    return config
+
+class CacheValidacao:
+    """
+    Cache persistente da validação dos arquivos de entrada
+
+    Cada entrada é indexada pelo caminho do arquivo e só é considerada válida
+    enquanto tamanho e mtime continuarem iguais. Guarda o hash MD5 calculado
+    no último backup, permitindo pular validação, backup e hash de arquivos
+    que não mudaram desde a execução anterior.
+    """
+
+    VERSAO = 1
+
+    def __init__(self, arquivo_cache: Path, assinatura_config: str):
+        """
+        Inicializa o cache
+
+        Args:
+            arquivo_cache: Caminho do arquivo JSON do cache
+            assinatura_config: Hash das regras de validação; se mudar, o cache é descartado
+        """
+        self.arquivo_cache = arquivo_cache
+        self.assinatura_config = assinatura_config
+        self.entradas = self._carregar()
+
+    def _carregar(self) -> Dict:
+        """Carrega o cache do disco, descartando versões incompatíveis"""
+        if not self.arquivo_cache.exists():
+            return {}
+
+        try:
+            with open(self.arquivo_cache, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if dados.get("versao") != self.VERSAO or dados.get("assinatura_config") != self.assinatura_config:
+            return {}
+
+        return dados.get("arquivos", {})
+
+    @staticmethod
+    def _chave(arquivo: Path) -> str:
+        return str(arquivo.resolve())
+
+    def consultar(self, arquivo: Path, stat: os.stat_result) -> Optional[Dict]:
+        """
+        Retorna a entrada do cache se o arquivo não mudou (mesmo tamanho e mtime)
+
+        Args:
+            arquivo: Caminho do arquivo
+            stat: Resultado de os.stat já obtido para o arquivo
+        """
+        entrada = self.entradas.get(self._chave(arquivo))
+        if entrada is None:
+            return None
+
+        if entrada["tamanho"] != stat.st_size or entrada["mtime_ns"] != stat.st_mtime_ns:
+            return None
+
+        return entrada
+
+    def registrar(self, arquivo: Path, stat: os.stat_result, hash_arquivo: str):
+        """Registra (ou atualiza) a entrada de um arquivo"""
+        self.entradas[self._chave(arquivo)] = {
+            "tamanho": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": hash_arquivo
+        }
+
+    def salvar(self):
+        """Persiste o cache em disco"""
+        dados = {
+            "versao": self.VERSAO,
+            "assinatura_config": self.assinatura_config,
+            "arquivos": self.entradas
+        }
+        with open(self.arquivo_cache, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False)
+
 class ValidadorArquivos:
     """
     Classe responsável pela validação e preparação dos arquivos
     """
     
-    def __init__(self, base_path: str = None):
+    def __init__(self, base_path: str = None, instrumentacao: Optional[Instrumentacao] = None):
         """
         Inicializa o validador
         
         Args:
             base_path: Caminho base onde estão os arquivos
+            instrumentacao: Medição de tempo/memória por etapa (None: desativada)
         """
         if base_path is None:
             base_path = r"C:\Users\bsacr\OneDrive\Área de Trabalho\Claude Resumos\Rainha"
         
         self.base_path = Path(base_path)
+        self.instrumentacao = instrumentacao or INSTRUMENTACAO_DESATIVADA
         self.pasta_dados = self.base_path / "Base de Dados"
         self.pasta_backup = self.base_path / "backup"
         
@@ -45,7 +210,23 @@ class ValidadorArquivos:
         
         # Criar estrutura de pastas se necessário
         self.criar_estrutura_pastas()
-    
+
+        # Armazém de backup deduplicado por conteúdo
+        self.armazem = ArmazemBackup(self.pasta_backup, self.config["backup"])
+
+        # Cache de validação (arquivos inalterados não são revalidados)
+        self.cache = CacheValidacao(
+            self.base_path / "cache_validacao.json",
+            self.calcular_assinatura_config()
+        )
+        self.ultimo_backup = None
+
+        # Catálogo persistente das entradas (uma varredura, consultas indexadas)
+        self.catalogo = CatalogoEntradas(
+            self.base_path / "catalogo_entradas.db",
+            self.config["arquivos_obrigatorios"]
+        )
+
     def setup_logging(self):
         """Configura sistema de logs"""
         log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -60,54 +241,14 @@ class ValidadorArquivos:
         self.logger = logging.getLogger('ValidadorArquivos')
     
     def carregar_configuracoes(self) -> Dict:
-        """Carrega as configurações do sistema"""
-        config = {
-            "arquivos_obrigatorios": {
-                "fenix": {
-                    "pattern": "*FENIX*.xlsx",
-                    "alias": "FOLHA_FENIX",
-                    "sheets_esperadas": ["Report"],
-                    "colunas_criticas": ["Column1", "Column2", "Column3"]
-                },
-                "genesis": {
-                    "pattern": "*GENESIS*.xlsx", 
-                    "alias": "FOLHA_GENESIS", 
-                    "sheets_esperadas": ["Report"],
-                    "colunas_criticas": ["Column1", "Column2", "Column3"]
-                },
-                "alocacoes": {
-                    "pattern": "*Alocações*.xlsx",
-                    "alias": "ALOCACOES",
-                    "sheets_esperadas": ["ALOCAÇÃO MAIO"],
-                    "colunas_criticas": ["NOME", "FUNÇÃO", "ALOCAÇAO"]
-                },
-                "extrato": {
-                    "pattern": "*Extrato*.xlsx",
-                    "alias": "EXTRATO_MENSAL",
-                    "sheets_esperadas": ["Extrato Mensal"],
-                    "colunas_criticas": ["Column1", "Column2"]
-                },
-                "gratificacao": {
-                    "pattern": "*Gratificação*.xlsx",
-                    "alias": "GRATIFICACAO",
-                    "sheets_esperadas": [],
-                    "colunas_criticas": ["COLABORADOR", "Gratificação"]
-                },
-                "nao_contabil": {
-                    "pattern": "*não contábil*.xlsx",
-                    "alias": "NAO_CONTABIL",
-                    "sheets_esperadas": [],
-                    "colunas_criticas": []
-                }
-            },
-            "validacoes": {
-                "tamanho_minimo_kb": 10,
-                "linhas_minimas": 5,
-                "encoding_aceitos": ["utf-8", "latin-1", "cp1252"]
-            }
-        }
-        return config
-    
+        """Carrega as configurações do sistema (ver carregar_configuracao_validacao)"""
+        return carregar_configuracao_validacao()
+
+    def calcular_assinatura_config(self) -> str:
+        """Calcula hash das regras de validação (invalida o cache quando mudam)"""
+        conteudo = json.dumps(self.config, sort_keys=True, ensure_ascii=False)
+        return hashlib.md5(conteudo.encode("utf-8")).hexdigest()
+
     def criar_estrutura_pastas(self):
         """Cria estrutura de pastas necessárias"""
         pastas = [
@@ -121,12 +262,22 @@ class ValidadorArquivos:
             pasta.mkdir(exist_ok=True)
             self.logger.info(f"Pasta criada/verificada: {pasta}")
     
-    def descobrir_arquivos(self) -> Dict[str, Path]:
+    def descobrir_arquivos(self, competencia: str = None) -> Dict[str, Path]:
         """
         Descobre e mapeia todos os arquivos na pasta de dados
-        
+
+        A pasta (e suas subpastas) é varrida uma única vez para atualizar o
+        catálogo; cada tipo é então resolvido por consulta ao catálogo.
+
+        Args:
+            competencia: Competência AAAA-MM; se None, usa o arquivo mais recente de
+                         cada tipo, desde que todos sejam do mesmo mês
+
         Returns:
             Dicionário com tipo_arquivo: caminho_arquivo
+
+        Raises:
+            ValueError: Sem competência, os arquivos mais recentes são de meses diferentes
         """
         arquivos_encontrados = {}
         
@@ -136,25 +287,25 @@ class ValidadorArquivos:
             self.logger.error(f"Pasta de dados não encontrada: {self.pasta_dados}")
             return {}
         
-        # Listar todos os arquivos Excel na pasta
-        arquivos_excel = list(self.pasta_dados.glob("*.xlsx"))
-        
-        self.logger.info(f"Encontrados {len(arquivos_excel)} arquivos Excel")
+        # Uma única varredura atualiza o catálogo
+        self.catalogo.atualizar(self.pasta_dados)
         
-        # Tentar mapear cada arquivo baseado nos padrões
+        # Resolver cada tipo pelo arquivo mais recente no catálogo (só desta árvore)
+        mais_recentes = self.catalogo.mais_recentes(
+            list(self.config["arquivos_obrigatorios"]), competencia, self.pasta_dados
+        )
         for tipo, config in self.config["arquivos_obrigatorios"].items():
-            pattern = config["pattern"]
-            arquivos_match = list(self.pasta_dados.glob(pattern))
+            arquivo_mais_recente = mais_recentes.get(tipo)
             
-            if arquivos_match:
-                # Pegar o mais recente se houver múltiplos
-                arquivo_mais_recente = max(arquivos_match, key=lambda x: x.stat().st_mtime)
+            if arquivo_mais_recente:
                 arquivos_encontrados[tipo] = arquivo_mais_recente
                 self.logger.info(f"{tipo.upper()}: {arquivo_mais_recente.name}")
             else:
-                self.logger.warning(f"{tipo.upper()}: Não encontrado (padrão: {pattern})")
+                na_competencia = f" na competência {competencia}" if competencia else ""
+                self.logger.warning(f"{tipo.upper()}: Não encontrado{na_competencia} (padrão: {config['pattern']})")
         
-        return arquivos_encontrados    
+        return arquivos_encontrados
+
     def validar_arquivo_individual(self, arquivo: Path, config_tipo: Dict) -> Dict:
         """Valida um arquivo individual"""
         resultado = {
@@ -181,52 +332,46 @@ class ValidadorArquivos:
         if tamanho_kb < self.config["validacoes"]["tamanho_minimo_kb"]:
             resultado["valido"] = False
             resultado["erros"].append(f"Arquivo muito pequeno: {tamanho_kb:.1f}KB")
-        
+
+        # 3. Verificar estrutura (planilhas, colunas críticas, linhas mínimas)
+        try:
+            estrutura = validar_estrutura_xlsx(
+                arquivo,
+                config_tipo,
+                self.config["validacoes"]["linhas_minimas"],
+                self.config["validacoes"]["linhas_cabecalho"]
+            )
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            resultado["valido"] = False
+            resultado["erros"].append(f"Arquivo xlsx ilegível: {e}")
+            return resultado
+
+        resultado["erros"].extend(estrutura["erros"])
+        resultado["warnings"].extend(estrutura["warnings"])
+        resultado["info"].update(estrutura["info"])
+        if estrutura["erros"]:
+            resultado["valido"] = False
+
         return resultado    
     def calcular_hash_arquivo(self, arquivo: Path) -> str:
         """Calcula hash MD5 do arquivo"""
-        hash_md5 = hashlib.md5()
-        with open(arquivo, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    
+        return calcular_hash_md5(arquivo)
+
     def criar_backup(self, arquivos: Dict[str, Path]) -> bool:
-        """Cria backup dos arquivos originais"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pasta_backup_sessao = self.pasta_backup / f"backup_{timestamp}"
-        pasta_backup_sessao.mkdir(exist_ok=True)
-        
-        self.logger.info(f"Criando backup em: {pasta_backup_sessao}")
-        
+        """Cria backup dos arquivos originais no armazém deduplicado por conteúdo"""
         try:
-            backup_info = {"timestamp": timestamp, "arquivos": {}}
-            
-            for tipo, arquivo in arquivos.items():
-                if arquivo.exists():
-                    import shutil
-                    novo_nome = f"{tipo}_{arquivo.name}"
-                    destino = pasta_backup_sessao / novo_nome
-                    shutil.copy2(arquivo, destino)
-                    
-                    backup_info["arquivos"][tipo] = {
-                        "original": str(arquivo),
-                        "backup": str(destino),
-                        "hash": self.calcular_hash_arquivo(arquivo)
-                    }
-                    
-                    self.logger.info(f"Backup: {arquivo.name} -> {novo_nome}")
-            
-            # Salvar informações do backup
-            with open(pasta_backup_sessao / "backup_info.json", "w", encoding="utf-8") as f:
-                json.dump(backup_info, f, indent=2, ensure_ascii=False)
-            
-            self.logger.info(f"Backup criado: {len(backup_info['arquivos'])} arquivos")
-            return True
-            
+            self.ultimo_backup = self.armazem.criar_sessao(arquivos)
         except Exception as e:
             self.logger.error(f"Erro ao criar backup: {e}")
-            return False    
+            return False
+
+        try:
+            self.armazem.coletar_lixo()
+        except Exception as e:
+            self.logger.warning(f"Erro na coleta de lixo do backup: {e}")
+
+        return True
+
     def gerar_relatorio_validacao(self, resultados: Dict) -> Dict:
         """Gera relatório consolidado da validação"""
         relatorio = {
@@ -263,40 +408,119 @@ class ValidadorArquivos:
         else:
             relatorio["proximos_passos"] = ["Corrigir arquivos inválidos antes de continuar"]
         
-        return relatorio    
-    def executar_validacao_completa(self) -> Tuple[bool, Dict]:
-        """Executa o processo completo de validação"""
+        return relatorio
+
+    def salvar_relatorio(self, relatorio: Dict):
+        """Grava o relatorio_validacao.json"""
+        try:
+            with open(self.base_path / "relatorio_validacao.json", "w", encoding="utf-8") as f:
+                json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar relatório: {e}")
+
+    def salvar_relatorio_erro(self, erro: str) -> Dict:
+        """
+        Grava um relatório só com o erro e sem detalhes
+
+        O relatório anterior descreve arquivos que não valem mais (sumiram ou
+        são de outra competência); o monitoramento e o pipeline o leem.
+        """
+        relatorio = {"timestamp": datetime.now().isoformat(), "erro": erro, "detalhes": {}}
+        self.salvar_relatorio(relatorio)
+        return relatorio
+
+    def carregar_detalhes_anteriores(self) -> Dict:
+        """Carrega os resultados por arquivo do último relatorio_validacao.json"""
+        caminho_relatorio = self.base_path / "relatorio_validacao.json"
+        if not caminho_relatorio.exists():
+            return {}
+
+        try:
+            with open(caminho_relatorio, "r", encoding="utf-8") as f:
+                return json.load(f).get("detalhes", {})
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Relatório anterior ilegível, ignorando cache: {e}")
+            return {}
+
+    def executar_validacao_completa(self, tipos: List[str] = None,
+                                    competencia: str = None) -> Tuple[bool, Dict]:
+        """
+        Executa o processo completo de validação
+
+        Args:
+            tipos: Se informado, revalida apenas esses tipos de arquivo e mantém
+                   os demais resultados do relatorio_validacao.json anterior
+            competencia: Competência AAAA-MM a validar; se None, a mais recente de cada tipo
+        """
         self.logger.info("Iniciando validação completa dos arquivos")
         
         # 1. Descobrir arquivos
-        arquivos_encontrados = self.descobrir_arquivos()
+        try:
+            with self.instrumentacao.etapa("descoberta"):
+                arquivos_encontrados = self.descobrir_arquivos(competencia)
+        except ValueError as e:
+            self.logger.error(f"❌ {e}")
+            return False, self.salvar_relatorio_erro(str(e))
         
         if not arquivos_encontrados:
             self.logger.error("Nenhum arquivo encontrado para validação")
-            return False, {"erro": "Nenhum arquivo encontrado"}
+            return False, self.salvar_relatorio_erro("Nenhum arquivo encontrado")
         
-        # 2. Validar cada arquivo
+        # 2. Validar cada arquivo (reaproveitando o cache para os inalterados)
         resultados_validacao = {}
-        
+        detalhes_anteriores = self.carregar_detalhes_anteriores()
+        stats = {}
+        arquivos_alterados = {}
+        arquivos_em_cache = []
+
         for tipo, arquivo in arquivos_encontrados.items():
+            anterior = detalhes_anteriores.get(tipo)
+
+            if tipos is not None and tipo not in tipos and anterior:
+                resultados_validacao[tipo] = anterior
+                continue
+
+            stats[tipo] = arquivo.stat()
+            entrada_cache = self.cache.consultar(arquivo, stats[tipo])
+
+            if entrada_cache and anterior and anterior.get("caminho") == str(arquivo):
+                resultados_validacao[tipo] = anterior
+                arquivos_em_cache.append(tipo)
+                self.logger.info(f"Cache: {arquivo.name} inalterado, validação reaproveitada")
+                continue
+
             config_tipo = self.config["arquivos_obrigatorios"][tipo]
-            resultado = self.validar_arquivo_individual(arquivo, config_tipo)
+            with self.instrumentacao.etapa(f"validacao_{tipo}", arquivo=arquivo.name):
+                resultado = self.validar_arquivo_individual(arquivo, config_tipo)
             resultados_validacao[tipo] = resultado
-        
-        # 3. Criar backup
-        backup_sucesso = self.criar_backup(arquivos_encontrados)
-        
+            arquivos_alterados[tipo] = arquivo
+
+        # 3. Criar backup apenas dos arquivos alterados
+        backup_sucesso = True
+        if arquivos_alterados:
+            with self.instrumentacao.etapa("backup"):
+                backup_sucesso = self.criar_backup(arquivos_alterados)
+
+        if backup_sucesso and self.ultimo_backup:
+            for tipo, info in self.ultimo_backup["arquivos"].items():
+                if tipo in arquivos_alterados:
+                    self.cache.registrar(arquivos_alterados[tipo], stats[tipo], info["hash"])
+                    self.catalogo.registrar_hash(arquivos_alterados[tipo], info["hash"])
+                    resultados_validacao[tipo]["info"]["hash"] = info["hash"]
+            try:
+                self.cache.salvar()
+            except Exception as e:
+                self.logger.error(f"Erro ao salvar cache de validação: {e}")
+
         # 4. Gerar relatório
         relatorio = self.gerar_relatorio_validacao(resultados_validacao)
         relatorio["backup_criado"] = backup_sucesso
+        relatorio["arquivos_em_cache"] = arquivos_em_cache
         relatorio["detalhes"] = resultados_validacao
-        
+        relatorio["performance"] = self.instrumentacao.resumo()
+
         # 5. Salvar relatório
-        try:
-            with open(self.base_path / "relatorio_validacao.json", "w", encoding="utf-8") as f:
-                json.dump(relatorio, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            self.logger.error(f"Erro ao salvar relatório: {e}")
+        self.salvar_relatorio(relatorio)
         
         # 6. Determinar sucesso geral
         sucesso_geral = relatorio["arquivos_invalidos"] == 0
@@ -307,6 +531,7 @@ class ValidadorArquivos:
         self.logger.info(f"   Válidos: {relatorio['arquivos_validos']}")
         self.logger.info(f"   Com warnings: {relatorio['arquivos_com_warnings']}")
         self.logger.info(f"   Inválidos: {relatorio['arquivos_invalidos']}")
+        self.logger.info(f"   Reaproveitados do cache: {len(arquivos_em_cache)}")
         self.logger.info(f"   Backup criado: {'✅' if backup_sucesso else '❌'}")
         
         for passo in relatorio["proximos_passos"]:
@@ -314,17 +539,114 @@ class ValidadorArquivos:
         
         return sucesso_geral, relatorio
 
+    def tipos_do_arquivo(self, nome_arquivo: str) -> List[str]:
+        """Retorna o tipo do arquivo pelo classificador do catálogo (sem distinção de maiúsculas)"""
+        tipo = self.catalogo.classificar(Path(nome_arquivo).name)
+        return [tipo] if tipo else []
+
+    def _instantaneo_pasta(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Tamanho e mtime de cada entrada classificada da árvore de dados
+
+        Usa a varredura do catálogo (subpastas como 2025/Junho incluídas;
+        temporários ~$ do Excel e arquivos que não são xlsx ignorados).
+        """
+        if not self.pasta_dados.exists():
+            return {}
+        return {
+            str(caminho): (stat.st_size, stat.st_mtime_ns)
+            for caminho, stat in self.catalogo.varrer(self.pasta_dados)
+            if self.catalogo.classificar(caminho.name)
+        }
+
+    def monitorar_pasta(self, intervalo: float = 2.0, estabilidade: float = 5.0, max_ciclos: int = None):
+        """
+        Monitora a pasta de dados e revalida apenas os tipos de arquivo alterados
+
+        Um arquivo alterado só é revalidado depois de ficar `estabilidade` segundos
+        sem mudar de tamanho/mtime e de ser um zip completo, o que evita processar
+        arquivos ainda sendo gravados ou sincronizados pelo OneDrive. Um arquivo
+        removido revalida seus tipos na hora: o relatório passa a apontar outro
+        arquivo do tipo ou deixa de listá-lo.
+
+        Args:
+            intervalo: Intervalo entre varreduras, em segundos
+            estabilidade: Tempo mínimo sem alterações antes de revalidar
+            max_ciclos: Número máximo de varreduras (None = até Ctrl+C)
+        """
+        self.logger.info(f"Monitorando {self.pasta_dados} (intervalo {intervalo}s, estabilidade {estabilidade}s)")
+        self.executar_validacao_completa()
+
+        anterior = self._instantaneo_pasta()
+        pendentes = {}  # caminho: (tamanho, mtime_ns, instante da última alteração)
+        ciclos = 0
+
+        try:
+            while max_ciclos is None or ciclos < max_ciclos:
+                time.sleep(intervalo)
+                ciclos += 1
+                atual = self._instantaneo_pasta()
+                agora = time.monotonic()
+
+                for nome, assinatura in atual.items():
+                    if anterior.get(nome) != assinatura:
+                        pendentes[nome] = (*assinatura, agora)
+                removidos = sorted(set(anterior) - set(atual))
+                for nome in removidos:
+                    pendentes.pop(nome, None)
+                anterior = atual
+
+                prontos = []
+                for nome, (tamanho, mtime_ns, alterado_em) in list(pendentes.items()):
+                    if agora - alterado_em < estabilidade:
+                        continue
+                    if not zipfile.is_zipfile(nome):
+                        # Ainda incompleto: aguardar nova estabilização
+                        pendentes[nome] = (tamanho, mtime_ns, agora)
+                        continue
+                    prontos.append(nome)
+                    del pendentes[nome]
+
+                tipos = sorted({tipo for nome in prontos + removidos for tipo in self.tipos_do_arquivo(nome)})
+                if tipos:
+                    nomes = ", ".join(Path(nome).name for nome in prontos + removidos)
+                    self.logger.info(f"Alterados: {nomes} -> revalidando {', '.join(tipos)}")
+                    self.executar_validacao_completa(tipos)
+        except KeyboardInterrupt:
+            self.logger.info("Monitoramento encerrado")
+
 # Função de teste e demonstração
 def main():
     """Função principal para testar o módulo"""
+    parser = argparse.ArgumentParser(description="Validação dos arquivos da folha de pagamento")
+    parser.add_argument("--base-path", help="Pasta base (contém 'Base de Dados')")
+    parser.add_argument("--monitorar", action="store_true", help="Revalida continuamente a pasta de dados")
+    parser.add_argument("--intervalo", type=float, default=2.0, help="Intervalo de varredura em segundos")
+    parser.add_argument("--estabilidade", type=float, default=5.0,
+                        help="Segundos sem alteração antes de revalidar um arquivo")
+    parser.add_argument("--competencia", help="Competência AAAA-MM (padrão: arquivos mais recentes)")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="Registra o tempo de cada etapa na seção performance do relatório")
+    parser.add_argument("--memoria", action="store_true", help="Com --instrumentar, mede também o pico de memória")
+    parser.add_argument("--chrome-trace", help="Com --instrumentar, grava as etapas neste arquivo Chrome Trace")
+    args = parser.parse_args()
+
     print("MÓDULO 1: VALIDAÇÃO E PREPARAÇÃO DE ARQUIVOS")
     print("=" * 60)
     
     # Instanciar validador
-    validador = ValidadorArquivos()
+    instrumentacao = Instrumentacao(ativo=args.instrumentar, memoria=args.memoria)
+    validador = ValidadorArquivos(args.base_path, instrumentacao)
+
+    if args.monitorar:
+        validador.monitorar_pasta(args.intervalo, args.estabilidade)
+        return True
     
     # Executar validação completa
-    sucesso, relatorio = validador.executar_validacao_completa()
+    sucesso, relatorio = validador.executar_validacao_completa(competencia=args.competencia)
+    if args.chrome_trace:
+        instrumentacao.salvar_chrome_trace(args.chrome_trace)
+    instrumentacao.encerrar()
     
     print(f"\n{'SUCESSO' if sucesso else 'FALHA'}: Validação {'concluída' if sucesso else 'falhou'}")
     
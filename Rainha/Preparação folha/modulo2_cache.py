@@ -0,0 +1,203 @@
+"""
+MÓDULO 2 (CACHE): CACHE PARQUET DAS ETAPAS DE LEITURA DA FOLHA
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Guardar em Parquet o Report compactado (Índice, valores com o tipo de
+   origem) e a tabela longa
+2. Endereçar cada entrada pelo MD5 do arquivo de entrada e pelo hash da
+   configuração que afeta a leitura
+3. Devolver as etapas já processadas em reexecuções, sem reler o xlsx
+4. Podar as entradas menos usadas (cada configuração testada gera uma etapa)
+
+Estrutura em disco:
+    <pasta_cache>/<md5 do arquivo>_<hash da config>/secoes.parquet
+    <pasta_cache>/<md5 do arquivo>_<hash da config>/<etapa>_<hash da config completa>.parquet
+
+A pasta do cache é escolhida por quem usa (pasta de trabalho ou de saída),
+nunca a pasta dos arquivos de entrada. Sem pyarrow instalado o cache fica
+desativado e o processamento segue normal.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from modulo1_backup import calcular_hash_md5
+
+try:
+    import pyarrow  # noqa: F401 (motor do to_parquet/read_parquet)
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+def hash_config(config: Dict, campos: Optional[Iterable[str]] = None) -> str:
+    """
+    Hash MD5 estável (chaves ordenadas) da configuração ou de parte dela
+
+    Args:
+        config: Configuração do processador
+        campos: Chaves consideradas (None: todas)
+    """
+    selecionado = config if campos is None else {campo: config.get(campo) for campo in campos}
+    texto = json.dumps(selecionado, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(texto.encode('utf-8')).hexdigest()
+
+class CacheParquet:
+    """
+    Cache em Parquet das etapas caras do processamento de um arquivo
+
+    A entrada é identificada pelo conteúdo do arquivo (MD5) e pelos campos de
+    configuração usados na leitura; mudanças em etapas posteriores (por exemplo,
+    funcionarios_excluidos) reaproveitam o Report compactado.
+    """
+
+    def __init__(self, pasta_cache: Path, max_entradas: int = 20, max_etapas: int = 4):
+        """
+        Inicializa o cache
+
+        Args:
+            pasta_cache: Pasta raiz do cache (criada sob demanda)
+            max_entradas: Arquivos de entrada mantidos (os usados há mais tempo saem)
+            max_etapas: Arquivos de etapa mantidos por entrada, além de secoes.parquet
+        """
+        self.pasta_cache = Path(pasta_cache)
+        self.max_entradas = max_entradas
+        self.max_etapas = max_etapas
+        self.logger = logging.getLogger('CacheParquet')
+        self.ativo = PARQUET_DISPONIVEL
+        if not self.ativo:
+            self.logger.info("pyarrow não instalado: cache Parquet desativado")
+
+    def chave(self, arquivo: Path, config: Dict, campos: Iterable[str]) -> str:
+        """Chave da entrada: MD5 do arquivo + hash dos campos de leitura"""
+        return f"{calcular_hash_md5(arquivo)}_{hash_config(config, campos)[:16]}"
+
+    def _caminho(self, chave: str, nome: str) -> Path:
+        return self.pasta_cache / chave / f"{nome}.parquet"
+
+    def carregar(self, chave: str, nome: str) -> Optional[pd.DataFrame]:
+        """Lê uma etapa do cache (None se ausente, ilegível ou cache desativado)"""
+        caminho = self._caminho(chave, nome)
+        if not self.ativo or not caminho.exists():
+            return None
+        try:
+            df = pd.read_parquet(caminho)
+            # mtime marca o último uso (poda das entradas menos usadas)
+            os.utime(caminho)
+            os.utime(caminho.parent)
+            return df
+        except Exception as e:
+            self.logger.warning(f"Entrada de cache ignorada ({caminho.name}): {e}")
+            return None
+
+    def guardar(self, chave: str, nome: str, df: pd.DataFrame) -> bool:
+        """Grava uma etapa no cache (arquivo temporário + rename, sem entrada parcial)"""
+        if not self.ativo:
+            return False
+        caminho = self._caminho(chave, nome)
+        try:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            temporario = caminho.with_suffix('.tmp')
+            df.to_parquet(temporario, index=False)
+            os.replace(temporario, caminho)
+            os.utime(caminho.parent)
+            self.podar()
+            return True
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o cache ({caminho.name}): {e}")
+            return False
+
+    def podar(self) -> int:
+        """
+        Remove as entradas e etapas usadas há mais tempo
+
+        Mantém as max_entradas pastas de entrada mais recentes e, em cada uma,
+        secoes.parquet e as max_etapas etapas mais recentes.
+
+        Returns:
+            Quantidade de arquivos removidos
+        """
+        if not self.pasta_cache.is_dir():
+            return 0
+        removidos = 0
+        entradas = sorted(
+            (entrada for entrada in os.scandir(self.pasta_cache) if entrada.is_dir()),
+            key=lambda entrada: entrada.stat().st_mtime_ns, reverse=True
+        )
+        for posicao, entrada in enumerate(entradas):
+            arquivos = sorted(
+                (arquivo for arquivo in os.scandir(entrada.path)
+                 if arquivo.is_file() and arquivo.name != "secoes.parquet"),
+                key=lambda arquivo: arquivo.stat().st_mtime_ns, reverse=True
+            )
+            descartar = arquivos if posicao >= self.max_entradas else arquivos[self.max_etapas:]
+            if posicao >= self.max_entradas:
+                descartar += [arquivo for arquivo in os.scandir(entrada.path) if arquivo.name == "secoes.parquet"]
+            for arquivo in descartar:
+                try:
+                    os.remove(arquivo.path)
+                    removidos += 1
+                except OSError as e:
+                    self.logger.warning(f"Não foi possível remover do cache ({arquivo.name}): {e}")
+            if posicao >= self.max_entradas:
+                try:
+                    os.rmdir(entrada.path)
+                except OSError:
+                    pass
+        if removidos:
+            self.logger.info(f"Cache podado: {removidos} arquivos removidos")
+        return removidos
+
+    def carregar_grade(self, chave: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Lê o Report compactado (ver compactar_grade), com o tipo de cada valor
+
+        Returns:
+            Tuple[indices, valores, offsets] ou None se não estiver no cache
+        """
+        df = self.carregar(chave, "secoes")
+        if df is None or 'Texto' not in df.columns:
+            # Entradas gravadas só como texto (formato anterior) são refeitas
+            return None
+        linha = df['Índice'].to_numpy()
+        inicios = np.flatnonzero(np.r_[True, linha[1:] != linha[:-1]]) if len(linha) else np.array([], dtype=np.int64)
+        offsets = np.append(inicios, len(linha)).astype(np.int64)
+
+        valores = df['Texto'].to_numpy(dtype=object, na_value=None)
+        numeros = df['Numero'].notna().to_numpy()
+        valores[numeros] = df['Numero'].to_numpy()[numeros].tolist()
+        datas = df['Data'].notna().to_numpy()
+        valores[datas] = df['Data'][datas].dt.to_pydatetime().tolist()
+        return linha[inicios], valores, offsets
+
+    def guardar_grade(self, chave: str, indices: np.ndarray, valores: np.ndarray, offsets: np.ndarray) -> bool:
+        """
+        Grava o Report compactado, uma linha por valor (Índice repetido)
+
+        Cada valor vai na coluna do seu tipo (Texto, Numero ou Data): números
+        do Excel não passam por texto e voltam como número.
+        """
+        valores = np.asarray(valores, dtype=object)
+        eh_numero = np.fromiter(
+            (isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, bool)
+             for valor in valores), dtype=bool, count=len(valores)
+        )
+        eh_data = np.fromiter(
+            (isinstance(valor, (datetime, np.datetime64)) for valor in valores), dtype=bool, count=len(valores)
+        )
+        eh_texto = ~(eh_numero | eh_data)
+
+        df = pd.DataFrame({
+            'Índice': np.repeat(np.asarray(indices, dtype=np.int64), np.diff(offsets)),
+            'Texto': pd.array(np.where(eh_texto, valores, None), dtype="str"),
+            'Numero': np.where(eh_numero, valores, np.nan).astype(float),
+            'Data': pd.to_datetime(pd.Series(np.where(eh_data, valores, None), dtype=object))
+        })
+        return self.guardar(chave, "secoes", df)
@@ -0,0 +1,361 @@
+"""
+MÓDULO 2 (CARREGADORES): CARGA DAS FONTES DA FOLHA EM PROCESSOS SEPARADOS
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Carregar as planilhas de apoio (Gratificação, Folha não contábil, Alocações)
+   conforme os códigos M Gratificação.txt, Pagamentos.txt e Base de Nomes.txt
+2. Expor um carregador por fonte (relatórios e planilhas de apoio)
+3. Executar cada fonte num processo (processar_fonte) e devolver o resultado
+   em colunas NumPy compactas, em vez de um DataFrame de objetos serializado
+4. Combinar todas as pastas de trabalho "não contábil" de uma pasta
+   (Folder.Files do Pagamentos.txt), lendo as abas em paralelo e guardando
+   a leitura de cada arquivo no cache Parquet pelo MD5
+
+O texto de cada coluna viaja como categoria (códigos inteiros + valores
+distintos), e números e datas como arrays NumPy.
+"""
+
+import os
+import stat
+import time
+import logging
+import unicodedata
+import multiprocessing
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from modulo2_cache import CacheParquet
+from modulo2_motor_layout import normalizar_textos
+from modulo2_processador_extrato import ProcessadorExtrato
+from modulo2_processador_fenix import ProcessadorFenix
+from modulo2_processador_genesis import ProcessadorGenesis
+
+logger = logging.getLogger('CarregadoresFolha')
+
+# Colunas expandidas pelo código M Pagamentos.txt (o restante da aba não é lido)
+COLUNAS_PAGAMENTOS = ["Nome", "Função", "Razão Social", "Alocação", "TOTAL"]
+
+# Configuração da leitura de cada arquivo de pagamentos (chave do cache Parquet)
+CONFIG_LEITURA_PAGAMENTOS = {"colunas": COLUNAS_PAGAMENTOS, "linhas_ignoradas": 1}
+
+# Processos para as abas das planilhas de pagamentos (só no processo principal:
+# dentro de um processo de pool a leitura é sequencial, sem pools aninhados)
+MAX_WORKERS_ABAS = os.cpu_count() or 1
+
+def _promover_cabecalho(df: pd.DataFrame) -> pd.DataFrame:
+    """Usa a primeira linha como cabeçalho (Table.PromoteHeaders), sem espaços repetidos"""
+    colunas = normalizar_textos(df.iloc[0].to_numpy(dtype=object))
+    colunas = [coluna if coluna is not None else f"Column{i + 1}" for i, coluna in enumerate(colunas)]
+    resultado = df.iloc[1:].copy()
+    resultado.columns = colunas
+    return resultado.reset_index(drop=True)
+
+def _aparar(serie: pd.Series) -> pd.Series:
+    """Text.Trim preservando nulos"""
+    return pd.Series(normalizar_textos(serie.to_numpy(dtype=object)), index=serie.index, dtype="str")
+
+def carregar_gratificacao(arquivo: Path) -> pd.DataFrame:
+    """
+    Carrega todas as abas da planilha de Gratificação (código M Gratificação.txt)
+
+    Returns:
+        DataFrame com COLABORADOR, Função, Razão Social, Alocação, Origem, Valor Total
+    """
+    partes = []
+    for aba, df in pd.read_excel(arquivo, sheet_name=None, header=None).items():
+        df = df[df[1].notna() & df[2].notna()] if df.shape[1] > 2 else df.iloc[0:0]
+        if df.empty:
+            continue
+        df = _promover_cabecalho(df)
+        df = df[df["COLABORADOR"] != "COLABORADOR"]
+
+        # Valor Total: Gratificação ou, na falta dela, o salário da aba
+        coluna_salario = next((coluna for coluna in df.columns if coluna.startswith("Salário")), None)
+        gratificacao = pd.to_numeric(df["Gratificação"], errors='coerce')
+        if coluna_salario is not None:
+            gratificacao = gratificacao.fillna(pd.to_numeric(df[coluna_salario], errors='coerce'))
+        df = df.assign(**{"Valor Total": gratificacao})
+
+        partes.append(df[["COLABORADOR", "Função", "Razão Social", "Alocação", "Origem", "Valor Total"]])
+
+    colunas = ["COLABORADOR", "Função", "Razão Social", "Alocação", "Origem", "Valor Total"]
+    resultado = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=colunas)
+    for coluna in colunas[:-1]:
+        resultado[coluna] = _aparar(resultado[coluna])
+    resultado["Valor Total"] = resultado["Valor Total"].astype(float)
+    return resultado
+
+def ler_aba_pagamentos(arquivo: str, aba: str) -> Optional[Dict[str, Any]]:
+    """
+    Lê uma aba de pagamentos projetando só COLUNAS_PAGAMENTOS (executada num processo)
+
+    Como no Pagamentos.txt: ignora a primeira linha e promove a seguinte a
+    cabeçalho. O modo read_only do openpyxl percorre só o XML da aba pedida.
+
+    Returns:
+        Colunas (para_colunas) ou None se a aba não tiver as colunas
+    """
+    pasta_trabalho = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = pasta_trabalho[aba].iter_rows(values_only=True)
+        next(linhas, None)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return None
+        posicoes = {coluna: i for i, coluna in reversed(list(enumerate(normalizar_textos(cabecalho))))}
+        if not set(COLUNAS_PAGAMENTOS).issubset(posicoes):
+            logger.warning(f"Aba ignorada em {Path(arquivo).name} (colunas ausentes): {aba}")
+            return None
+
+        indices = [posicoes[coluna] for coluna in COLUNAS_PAGAMENTOS]
+        valores = [tuple(linha[i] if i < len(linha) else None for i in indices) for linha in linhas]
+    finally:
+        pasta_trabalho.close()
+
+    colunas = list(zip(*valores)) if valores else [()] * len(COLUNAS_PAGAMENTOS)
+    return para_colunas(_projecao_pagamentos(colunas))
+
+def _projecao_pagamentos(colunas: List[tuple]) -> pd.DataFrame:
+    """Colunas lidas de uma aba: textos como str e TOTAL numérico (gravável em Parquet)"""
+    df = pd.DataFrame({
+        coluna: pd.array([None if valor is None else str(valor) for valor in dados], dtype="str")
+        for coluna, dados in zip(COLUNAS_PAGAMENTOS[:-1], colunas[:-1])
+    })
+    df["TOTAL"] = pd.to_numeric(pd.Series(colunas[-1], dtype=object), errors='coerce').astype(float)
+    return df
+
+def agrupar_pagamentos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma o TOTAL por funcionário, ordena por Nome e remove as linhas de total
+
+    Returns:
+        DataFrame com Nome, Função, Razão Social, Alocação, Valor Pago
+    """
+    chaves = COLUNAS_PAGAMENTOS[:-1]
+    if df.empty:
+        return pd.DataFrame(columns=chaves + ["Valor Pago"])
+
+    df = df.copy()
+    for coluna in chaves:
+        df[coluna] = _aparar(df[coluna])
+    df["LIQUIDO A RECEBER"] = pd.to_numeric(df["TOTAL"], errors='coerce')
+
+    resultado = (
+        df.groupby(chaves, dropna=False, sort=False)["LIQUIDO A RECEBER"].sum(min_count=1)
+        .rename("Valor Pago").reset_index()
+        .sort_values("Nome", kind="stable", ignore_index=True)
+    )
+    return resultado[resultado["Nome"].notna() & ~resultado["Nome"].isin(["TOTAL", "VALOR TOTAL"])].reset_index(drop=True)
+
+def listar_pagamentos(pasta: Path, filtro: str = "não") -> List[Path]:
+    """
+    Pastas de trabalho de pagamentos da pasta (Folder.Files + Text.Contains)
+
+    Arquivos ocultos e temporários do Excel (~$) ficam de fora; a comparação
+    do filtro ignora maiúsculas e a forma Unicode do acento.
+    """
+    filtro = unicodedata.normalize("NFC", filtro).casefold()
+    arquivos = []
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if not entrada.is_file() or entrada.name.startswith(("~$", ".")):
+                continue
+            if getattr(entrada.stat(), "st_file_attributes", 0) & getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 0):
+                continue
+            nome = unicodedata.normalize("NFC", entrada.name).casefold()
+            if nome.endswith(".xlsx") and filtro in nome:
+                arquivos.append(Path(entrada.path))
+    return sorted(arquivos, key=lambda arquivo: arquivo.name)
+
+def carregar_pagamentos(arquivos: Iterable[Path], max_workers: Optional[int] = None,
+                        pasta_cache: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Combina as pastas de trabalho de pagamentos (código M Pagamentos.txt)
+
+    Cada arquivo já lido é buscado no cache Parquet pelo MD5; as abas dos
+    demais são lidas em paralelo, uma por tarefa, e o agrupamento é feito
+    uma vez sobre todas as linhas.
+
+    Args:
+        arquivos: Pastas de trabalho, na ordem da combinação
+        max_workers: Processos para as abas (1: leitura no próprio processo; None:
+                     MAX_WORKERS_ABAS no processo principal e 1 dentro de um
+                     processo de pool, como as fontes, o lote e o pipeline)
+        pasta_cache: Pasta do cache Parquet (ex: pasta de trabalho ou de saída; None desativa)
+
+    Returns:
+        DataFrame com Nome, Função, Razão Social, Alocação, Valor Pago (ordenado por Nome)
+    """
+    if max_workers is None:
+        max_workers = MAX_WORKERS_ABAS if multiprocessing.parent_process() is None else 1
+    arquivos = [Path(arquivo) for arquivo in arquivos]
+    cache = CacheParquet(pasta_cache) if pasta_cache else None
+    partes: Dict[Path, Optional[pd.DataFrame]] = {}
+    chaves, tarefas = {}, []
+    for arquivo in arquivos:
+        if cache is not None and cache.ativo:
+            chave = cache.chave(arquivo, CONFIG_LEITURA_PAGAMENTOS, None)
+            partes[arquivo] = cache.carregar(chave, "pagamentos")
+            if partes[arquivo] is not None:
+                continue
+            chaves[arquivo] = chave
+        pasta_trabalho = load_workbook(arquivo, read_only=True)
+        tarefas.extend((arquivo, aba) for aba in pasta_trabalho.sheetnames)
+        pasta_trabalho.close()
+
+    lidos = len(arquivos) - len({arquivo for arquivo, _ in tarefas})
+    logger.info(f"Pagamentos: {len(arquivos)} arquivos ({lidos} do cache), {len(tarefas)} abas a ler")
+
+    workers = max(1, min(max_workers, len(tarefas)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            resultados = list(executor.map(ler_aba_pagamentos, *zip(*[(str(arquivo), aba) for arquivo, aba in tarefas])))
+    else:
+        resultados = [ler_aba_pagamentos(str(arquivo), aba) for arquivo, aba in tarefas]
+
+    por_arquivo: Dict[Path, List[pd.DataFrame]] = {}
+    for (arquivo, _), colunas in zip(tarefas, resultados):
+        por_arquivo.setdefault(arquivo, [])
+        if colunas is not None:
+            por_arquivo[arquivo].append(de_colunas(colunas))
+    for arquivo, abas in por_arquivo.items():
+        partes[arquivo] = (
+            pd.concat(abas, ignore_index=True) if abas
+            else _projecao_pagamentos([()] * len(COLUNAS_PAGAMENTOS))
+        )
+        if arquivo in chaves:
+            cache.guardar(chaves[arquivo], "pagamentos", partes[arquivo])
+
+    combinadas = [partes[arquivo] for arquivo in arquivos if partes.get(arquivo) is not None]
+    return agrupar_pagamentos(pd.concat(combinadas, ignore_index=True) if combinadas else pd.DataFrame())
+
+def carregar_nao_contabil(arquivo: Path) -> pd.DataFrame:
+    """
+    Carrega a Folha não contábil somando o TOTAL por funcionário (código M Pagamentos.txt)
+
+    Returns:
+        DataFrame com Nome, Função, Razão Social, Alocação, Valor Pago (ordenado por Nome)
+    """
+    return carregar_pagamentos([arquivo])
+
+def carregar_pasta_nao_contabil(pasta: Path) -> pd.DataFrame:
+    """Todas as pastas de trabalho "não contábil" da pasta do mês, combinadas"""
+    return carregar_pagamentos(listar_pagamentos(pasta))
+
+def carregar_alocacoes(arquivo: Path) -> pd.DataFrame:
+    """
+    Carrega a relação de funcionários por alocação (código M Base de Nomes.txt)
+
+    A aba muda de nome a cada mês ("ALOCAÇÃO MAIO"); usa a primeira aba "ALOCAÇÃO*".
+
+    Returns:
+        DataFrame com Nome, Função, Razão Social, Alocações (um por Nome, ordenado)
+    """
+    abas = pd.read_excel(arquivo, sheet_name=None, header=None)
+    aba = next((nome for nome in abas if nome.upper().startswith("ALOCAÇÃO")), next(iter(abas)))
+    df = abas[aba]
+
+    df = df[df[1].notna() & ~df[1].astype(str).str.startswith("RELAÇÃO DE COLABORADORES")]
+    df = _promover_cabecalho(df).rename(columns={"NOME": "Nome", "FUNÇÃO": "Função", "ALOCAÇAO": "ALOCAÇÃO"})
+    df = df[["Nome", "Função", "EMPRESA", "ALOCAÇÃO"]].drop_duplicates(subset=["Nome"])
+
+    df = df.rename(columns={"EMPRESA": "Razão Social", "ALOCAÇÃO": "Alocações"})
+    for coluna in df.columns:
+        df[coluna] = _aparar(df[coluna])
+    return df.sort_values("Nome", kind="stable", ignore_index=True)
+
+def carregar_folha_fenix(arquivo: Path) -> pd.DataFrame:
+    """Folha FENIX; como nos códigos M, quem lê esta folha é o Genesis.txt"""
+    processador = ProcessadorGenesis(arquivo)
+    processador.carregar_dados_brutos()
+    return processador.processar_estrutura_dados()
+
+def carregar_folha_genesis(arquivo: Path) -> pd.DataFrame:
+    """Folha GENESIS; como nos códigos M, quem lê esta folha é o Fenix.txt"""
+    processador = ProcessadorFenix(arquivo)
+    processador.carregar_dados_brutos()
+    return processador.processar_estrutura_dados()
+
+def carregar_extrato(arquivo: Path) -> pd.DataFrame:
+    """Extrato Mensal (código M Extrato Mensal.txt)"""
+    processador = ProcessadorExtrato(arquivo)
+    processador.carregar_dados_brutos()
+    return processador.processar_estrutura_dados()
+
+# Tipo de arquivo (arquivos_entrada) -> carregador; a ordem define a ordem da junção
+CARREGADORES: Dict[str, Callable[[Path], pd.DataFrame]] = {
+    "extrato": carregar_extrato,
+    "fenix": carregar_folha_fenix,
+    "genesis": carregar_folha_genesis,
+    "gratificacao": carregar_gratificacao,
+    "nao_contabil": carregar_nao_contabil,
+    "alocacoes": carregar_alocacoes
+}
+
+# Fontes que também podem ser lidas de uma pasta inteira (processar_fonte com uma pasta)
+CARREGADORES_PASTA: Dict[str, Callable[[Path], pd.DataFrame]] = {
+    "nao_contabil": carregar_pasta_nao_contabil
+}
+
+# Arquivos que o carregador de CARREGADORES_PASTA lê de cada pasta
+LISTAGENS_PASTA: Dict[str, Callable[[Path], List[Path]]] = {
+    "nao_contabil": listar_pagamentos
+}
+
+def para_colunas(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Converte o DataFrame em colunas NumPy compactas para troca entre processos
+
+    Números e datas seguem como arrays; texto e categorias como códigos
+    inteiros + valores distintos.
+    """
+    dados = {}
+    for nome in df.columns:
+        serie = df[nome]
+        if isinstance(serie.dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_datetime64_any_dtype(serie.dtype)
+        ):
+            categorias = pd.Categorical(serie)
+            dados[nome] = (
+                "categoria" if isinstance(serie.dtype, pd.CategoricalDtype) else "texto",
+                categorias.codes,
+                np.asarray(categorias.categories, dtype=object)
+            )
+        else:
+            dados[nome] = ("array", serie.to_numpy(), None)
+    return {"colunas": [str(nome) for nome in df.columns], "dados": dados}
+
+def de_colunas(pacote: Dict[str, Any]) -> pd.DataFrame:
+    """Reconstrói o DataFrame gerado por para_colunas"""
+    colunas = {}
+    for nome in pacote["colunas"]:
+        tipo, valores, categorias = pacote["dados"][nome]
+        if tipo == "array":
+            colunas[nome] = valores
+        else:
+            categorico = pd.Categorical.from_codes(valores, categories=categorias)
+            colunas[nome] = categorico if tipo == "categoria" else pd.array(np.asarray(categorico, dtype=object), dtype="str")
+    return pd.DataFrame(colunas, columns=pacote["colunas"])
+
+def processar_fonte(tipo: str, arquivo: str) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """
+    Processa uma fonte (executado num processo do ProcessPoolExecutor)
+
+    Args:
+        tipo: Chave de CARREGADORES
+        arquivo: Caminho do arquivo (str, para serialização simples); uma pasta
+                 usa o carregador de CARREGADORES_PASTA
+
+    Returns:
+        Tuple[tipo, colunas (para_colunas), resumo com registros e segundos]
+    """
+    inicio = time.perf_counter()
+    carregador = CARREGADORES_PASTA[tipo] if Path(arquivo).is_dir() else CARREGADORES[tipo]
+    df = carregador(Path(arquivo))
+    resumo = {"registros": len(df), "segundos": round(time.perf_counter() - inicio, 3)}
+    return tipo, para_colunas(df), resumo
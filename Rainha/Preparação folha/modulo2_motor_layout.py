@@ -0,0 +1,618 @@
+"""
+MÓDULO 2 (MOTOR DE LAYOUT): PARSER DE RELATÓRIOS DIRIGIDO POR LAYOUT
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo concentra, num único núcleo vetorizado, os passos que os códigos
+M (Fenix.txt, Genesis.txt, Extrato Mensal.txt) repetem para cada empresa:
+1. Compactar cada linha da planilha na lista de valores não nulos (List.RemoveNulls)
+2. Dividir cada lista em grupos iniciados por rótulos terminados em ":"
+3. Marcar as seções por rótulo e preencher para baixo (Table.FillDown)
+4. Agrupar as linhas pelo cabeçalho de funcionário (000xxx, "Empr.:")
+5. Extrair campos por rótulo (Text.Combine) e atributos por regras de máscara,
+   inclusive rubricas com indicador P/D (Provento/Desconto)
+
+Cada relatório é declarado por um dicionário de layout (ver LAYOUT_FENIX,
+LAYOUT_GENESIS e LAYOUT_EXTRATO nos módulos dos processadores). As colunas
+dos layouts são numeradas a partir de 1, como Column1..ColumnN no código M.
+
+Os três processadores (Fenix, Genesis e Extrato) são construídos sobre o
+motor. A origem da grade compactada é um gancho (ProcessadorLayout.obter_grade):
+o ProcessadorFenix o usa para o cache Parquet e a leitura em streaming, e
+monta a trilha de auditoria com MotorLayout.intervalos_funcionarios.
+"""
+
+import re
+import logging
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from modulo2_nucleo import ClassificadorSecoes, SubstituidorCPF, converter_moeda_brl
+from instrumentacao import INSTRUMENTACAO_DESATIVADA, Instrumentacao, medir_etapa
+
+def compactar_grade(df: pd.DataFrame, como_texto: bool = False,
+                    coluna_indice: str = 'Índice') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compacta a grade removendo nulos e vazios
+    Equivale à lógica List.RemoveNulls do código M, aplicada à grade inteira
+
+    Args:
+        df: Grade lida com header=None e coluna de índice
+        como_texto: Converte os valores para str. O padrão (False) mantém os
+                    tipos nativos (números e datas), como o código M recebe do
+                    Excel: um float 16.605 convertido para texto seria lido
+                    como "16.605" no formato brasileiro (16605)
+        coluna_indice: Coluna com o índice original das linhas
+
+    Returns:
+        Tuple[Índice de cada linha não vazia, valores não nulos em sequência,
+              offsets: os valores da linha i estão em valores[offsets[i]:offsets[i + 1]]]
+    """
+    posicoes, selecionados = [], []
+
+    # Máscara de não nulos por coluna, no dtype nativo de cada coluna
+    for coluna in df.columns:
+        if coluna == coluna_indice:
+            continue
+        serie = df[coluna]
+        mascara = serie.notna().to_numpy()
+        if serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype):
+            mascara = mascara & serie.ne('').to_numpy(dtype=bool, na_value=False)
+
+        posicoes.append(np.flatnonzero(mascara))
+        valores_coluna = serie[mascara].tolist()
+        selecionados.append([str(valor) for valor in valores_coluna] if como_texto else valores_coluna)
+
+    linhas = np.concatenate(posicoes) if posicoes else np.array([], dtype=np.int64)
+    valores = np.empty(len(linhas), dtype=object)
+    valores[:] = [valor for coluna in selecionados for valor in coluna]
+
+    # Reordenar linha a linha; a ordenação estável preserva a ordem das colunas
+    ordem = np.argsort(linhas, kind='stable')
+    valores = valores[ordem]
+
+    contagens = np.bincount(linhas, minlength=len(df))
+    nao_vazias = contagens > 0
+    offsets = np.zeros(int(nao_vazias.sum()) + 1, dtype=np.int64)
+    np.cumsum(contagens[nao_vazias], out=offsets[1:])
+
+    indices = df[coluna_indice].to_numpy()[nao_vazias]
+    return indices, valores, offsets
+
+def normalizar_textos(valores, minusculas: bool = False) -> np.ndarray:
+    """
+    Converte para texto sem espaços repetidos nem nas pontas ("Trienio  5%" -> "Trienio 5%")
+
+    Args:
+        valores: Valores a converter; nulos continuam None
+        minusculas: Converte também para minúsculas (chave de comparação de rótulos)
+    """
+    # Os relatórios repetem muito os mesmos textos: normaliza só os valores distintos
+    codigos, unicos = pd.factorize(np.asarray(valores, dtype=object), use_na_sentinel=True)
+    textos = pd.Series(unicos, dtype=object).astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+    if minusculas:
+        textos = textos.str.casefold()
+    return np.append(textos.to_numpy(dtype=object), None)[codigos]
+
+def _pertence(valores: np.ndarray, textos) -> np.ndarray:
+    """Máscara dos valores contidos em textos (consulta por hash)"""
+    return pd.Series(valores, dtype=object).isin(list(textos)).to_numpy(dtype=bool)
+
+def normalizar_codigos(valores) -> np.ndarray:
+    """Códigos lidos como número (48.0) viram texto sem a parte decimal ("48")"""
+    textos = normalizar_textos(valores)
+    preenchidos = np.not_equal(textos, None)
+    textos[preenchidos] = pd.Series(textos[preenchidos], dtype=object).str.replace(
+        r"^(\d+)\.0+$", r"\1", regex=True
+    ).to_numpy(dtype=object)
+    return textos
+
+class MotorLayout:
+    """
+    Motor de parsing de relatórios dirigido por um layout declarativo
+
+    Chaves do layout:
+        colunas: Quantidade de colunas de cada grupo (Column1..ColumnN)
+        marcadores: Rótulo do Column1 -> True (seção mantida) ou False (descartada);
+                    o estado é preenchido para baixo até o próximo marcador
+        cabecalho: {"prefixo": "000"} ou {"rotulo": "Empr.:"}, e "codigo": coluna do
+                   código do funcionário; o cabeçalho sempre abre uma seção mantida
+        campos: Nome da coluna de saída -> {"rotulo" ou "cabecalho": True, "coluna",
+                "escopo": "pagina" (preenche para os funcionários seguintes),
+                "formato" (regex; valores fora dele são ignorados), "padrao",
+                "tipo": "data"}
+        atributos: Lista de regras, na ordem de saída. Cada regra filtra os grupos
+                   mantidos por "rotulo", "cabecalho", "preenchidas", "vazias",
+                   "em"/"fora" ({coluna: [textos]}), "padroes" ({coluna: regex},
+                   aplicado ao texto da célula, ex: código de rubrica) e
+                   "codigos", e gera
+                   "atributo" (coluna ou texto fixo) e "valor" (coluna).
+                   Regras com "indicador" ("P"/"D") leem rubricas no formato
+                   código, descrição, [referência], valor, indicador.
+                   "ignorar_zero" descarta valores iguais a zero.
+        saida: Ordem das colunas da tabela longa
+
+    Rótulos e textos das regras são comparados sem distinção de maiúsculas e
+    de espaços repetidos ("Resumo da folha" = "Resumo da Folha").
+    """
+
+    def __init__(self, layout: Dict):
+        """
+        Args:
+            layout: Dicionário de layout (ver docstring da classe)
+        """
+        self.layout = layout
+        self.logger = logging.getLogger('MotorLayout')
+        self.largura = layout.get("colunas", 10)
+
+        # Marcadores e cabeçalho compilados no classificador compartilhado
+        cabecalho = layout["cabecalho"]
+        rotulos = {
+            rotulo: "manter" if manter else "descartar"
+            for rotulo, manter in self._normalizar_chaves(layout.get("marcadores", {})).items()
+        }
+        if cabecalho.get("rotulo"):
+            rotulos[normalizar_textos([cabecalho["rotulo"]], True)[0]] = "funcionario"
+        self.classificador = ClassificadorSecoes(
+            rotulos, prefixo_funcionario=cabecalho.get("prefixo"), tipo_padrao=""
+        )
+        self.coluna_codigo = cabecalho.get("codigo", 1)
+
+        self.regras = [self._compilar_regra(regra) for regra in layout.get("atributos", [])]
+
+    @staticmethod
+    def _normalizar_chaves(dicionario: Dict) -> Dict:
+        chaves = normalizar_textos(list(dicionario), True)
+        return dict(zip(chaves.tolist(), dicionario.values()))
+
+    @staticmethod
+    def _conjunto(textos) -> set:
+        return set(normalizar_textos(list(textos), True).tolist())
+
+    def _compilar_regra(self, regra: Dict) -> Dict:
+        """Normaliza uma vez os textos de comparação da regra"""
+        compilada = dict(regra)
+        rotulo = regra.get("rotulo")
+        if rotulo is not None:
+            compilada["rotulo"] = self._conjunto([rotulo] if isinstance(rotulo, str) else rotulo)
+        for chave in ("em", "fora"):
+            if chave in regra:
+                compilada[chave] = {int(coluna): self._conjunto(textos) for coluna, textos in regra[chave].items()}
+        if "padroes" in regra:
+            compilada["padroes"] = {int(coluna): re.compile(padrao) for coluna, padrao in regra["padroes"].items()}
+        if "codigos" in regra:
+            compilada["codigos"] = set(regra["codigos"])
+        if "indicador" in regra:
+            compilada["indicador"] = regra["indicador"].upper()
+        return compilada
+
+    def dividir_grupos(self, indices: np.ndarray, valores: np.ndarray,
+                       offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Divide cada linha compactada em grupos iniciados por itens terminados em ":"
+
+        Returns:
+            Tuple[Índice da linha de origem de cada grupo,
+                  tabela (grupos x colunas, object) com None nas posições vazias]
+        """
+        quantidade = len(valores)
+        contagens = np.diff(offsets)
+        linha_do_item = np.repeat(np.arange(len(contagens)), contagens)
+        posicao_na_linha = np.arange(quantidade) - offsets[:-1][linha_do_item]
+
+        codigos, unicos = pd.factorize(valores, use_na_sentinel=True)
+        termina_rotulo = np.array(
+            [isinstance(valor, str) and valor.endswith(":") for valor in unicos.tolist()] + [False]
+        )[codigos]
+        abre_grupo = termina_rotulo | (posicao_na_linha == 0)
+
+        grupo_do_item = np.cumsum(abre_grupo) - 1
+        inicios = np.flatnonzero(abre_grupo)
+        posicao_no_grupo = np.arange(quantidade) - inicios[grupo_do_item]
+
+        tabela = np.full((len(inicios), self.largura), None, dtype=object)
+        cabe = posicao_no_grupo < self.largura
+        tabela[grupo_do_item[cabe], posicao_no_grupo[cabe]] = valores[cabe]
+
+        return indices[linha_do_item[inicios]], tabela
+
+    def processar(self, indices: np.ndarray, valores: np.ndarray, offsets: np.ndarray,
+                  funcionarios_excluidos=()) -> Tuple[pd.DataFrame, List[Dict]]:
+        """
+        Gera a tabela longa (funcionário x atributo) a partir do relatório compactado
+
+        Args:
+            indices, valores, offsets: Saída de compactar_grade (de preferência com
+                                       como_texto=False)
+            funcionarios_excluidos: Códigos de funcionário a ignorar
+
+        Returns:
+            Tuple[tabela longa com as colunas de layout["saida"],
+                  valores não reconhecidos ({'indice', 'valor'})]
+        """
+        indice_grupo, tabela = self.dividir_grupos(indices, valores, offsets)
+        chaves = normalizar_textos(tabela.ravel(), True).reshape(tabela.shape)
+        rotulos = chaves[:, 0]
+
+        # Seções: marcador preenchido para baixo; o cabeçalho sempre mantém
+        tipos = self.classificador.classificar_lote(rotulos)
+        cabecalho = tipos == "funcionario"
+        estado = np.where(cabecalho | (tipos == "manter"), 1.0, np.where(tipos == "descartar", 0.0, np.nan))
+        mantido = pd.Series(estado).ffill().to_numpy() == 1.0
+
+        # Funcionário de cada grupo (0 = antes do primeiro cabeçalho)
+        funcionario = np.cumsum(cabecalho)
+        mantido &= funcionario > 0
+
+        posicoes_cabecalho = np.flatnonzero(cabecalho)
+        codigos = normalizar_codigos(tabela[posicoes_cabecalho, self.coluna_codigo - 1])
+        excluido = _pertence(codigos, funcionarios_excluidos)
+
+        campos = {
+            nome: self._extrair_campo(spec, tabela, rotulos, mantido, funcionario, posicoes_cabecalho)
+            for nome, spec in self.layout.get("campos", {}).items()
+        }
+
+        partes = [
+            self._aplicar_regra(ordem, regra, tabela, chaves, mantido, cabecalho, funcionario, codigos)
+            for ordem, regra in enumerate(self.regras)
+        ]
+        linhas = self._combinar_partes(partes)
+
+        # Descartar funcionários excluídos e ordenar por funcionário, regra e posição
+        linhas = {chave: coluna[~excluido[linhas['funcionario'] - 1]] for chave, coluna in linhas.items()}
+        ordem = np.lexsort((linhas['coluna'], linhas['grupo'], linhas['regra'], linhas['funcionario']))
+        linhas = {chave: coluna[ordem] for chave, coluna in linhas.items()}
+
+        numeros, invalidos = converter_moeda_brl(linhas['valor_bruto'])
+        manter = ~(linhas['ignorar_zero'] & (numeros == 0))
+        linhas = {chave: coluna[manter] for chave, coluna in linhas.items()}
+        numeros, invalidos = numeros[manter], invalidos[manter]
+
+        valores_invalidos = [
+            {'indice': int(indice), 'valor': valor}
+            for indice, valor in zip(indice_grupo[linhas['grupo'][invalidos]].tolist(),
+                                     linhas['valor_bruto'][invalidos].tolist())
+        ]
+
+        return self._montar_tabela(linhas, numeros, codigos, campos), valores_invalidos
+
+    def intervalos_funcionarios(self, indices: np.ndarray, valores: np.ndarray,
+                                offsets: np.ndarray) -> Dict[str, Tuple[int, int]]:
+        """
+        Intervalo de linhas (Índice) de cada funcionário no relatório compactado
+
+        Vai da linha do cabeçalho até a última linha antes do próximo cabeçalho
+        (ou do fim do relatório). Um código repetido fica com a primeira ocorrência.
+
+        Returns:
+            Dicionário código do funcionário: (Índice inicial, Índice final)
+        """
+        if len(indices) == 0:
+            return {}
+        indice_grupo, tabela = self.dividir_grupos(indices, valores, offsets)
+        rotulos = normalizar_textos(tabela[:, 0], True)
+        posicoes = np.flatnonzero(self.classificador.classificar_lote(rotulos) == "funcionario")
+        codigos = normalizar_codigos(tabela[posicoes, self.coluna_codigo - 1])
+
+        inicios = indice_grupo[posicoes]
+        anteriores = np.searchsorted(indices, inicios[1:], side='left') - 1
+        fins = np.append(indices[anteriores], indices[-1])
+
+        intervalos = {}
+        for codigo, inicio, fim in zip(codigos.tolist(), inicios.tolist(), fins.tolist()):
+            intervalos.setdefault(codigo, (int(inicio), int(fim)))
+        return intervalos
+
+    def _extrair_campo(self, spec: Dict, tabela: np.ndarray, rotulos: np.ndarray,
+                       mantido: np.ndarray, funcionario: np.ndarray,
+                       posicoes_cabecalho: np.ndarray) -> np.ndarray:
+        """Valor do campo para cada funcionário (Text.Combine com espaço)"""
+        coluna = spec["coluna"] - 1
+        quantidade = len(posicoes_cabecalho)
+
+        if spec.get("cabecalho"):
+            resultado = tabela[posicoes_cabecalho, coluna].copy()
+
+        elif spec.get("escopo") == "pagina":
+            # Campo de página (ex: Empresa): vale para os funcionários seguintes
+            rotulo = normalizar_textos([spec["rotulo"]], True)[0]
+            selecao = self._no_formato(spec, tabela[:, coluna], rotulos == rotulo)
+            serie = pd.Series(np.where(selecao, tabela[:, coluna], None), dtype=object)
+            resultado = serie.ffill().to_numpy(dtype=object)[posicoes_cabecalho]
+
+        else:
+            rotulo = normalizar_textos([spec["rotulo"]], True)[0]
+            selecao = mantido & (rotulos == rotulo) & np.not_equal(tabela[:, coluna], None)
+            selecao = self._no_formato(spec, tabela[:, coluna], selecao)
+            resultado = np.full(quantidade, None, dtype=object)
+            if selecao.any():
+                textos = normalizar_textos(tabela[selecao, coluna])
+                posicoes = funcionario[selecao] - 1
+
+                # Em geral o rótulo aparece uma vez por funcionário; só as repetições são combinadas
+                repetido = np.bincount(posicoes, minlength=quantidade)[posicoes] > 1
+                resultado[posicoes[~repetido]] = textos[~repetido]
+                if repetido.any():
+                    combinados = pd.Series(textos[repetido], dtype=object).groupby(
+                        posicoes[repetido], sort=False
+                    ).agg(" ".join)
+                    resultado[combinados.index.to_numpy()] = combinados.to_numpy(dtype=object)
+
+        if spec.get("tipo") != "data":
+            resultado = normalizar_textos(resultado)
+        if "padrao" in spec:
+            resultado[np.equal(resultado, None) | np.equal(resultado, "")] = spec["padrao"]
+        return resultado
+
+    @staticmethod
+    def _no_formato(spec: Dict, valores: np.ndarray, selecao: np.ndarray) -> np.ndarray:
+        """Restringe a seleção aos valores no "formato" do campo (regex), se houver"""
+        if "formato" not in spec:
+            return selecao
+        selecao = selecao.copy()
+        posicoes = np.flatnonzero(selecao)
+        textos = pd.Series(normalizar_textos(valores[posicoes]), dtype=object)
+        selecao[posicoes] = textos.str.fullmatch(spec["formato"]).to_numpy(dtype=bool, na_value=False)
+        return selecao
+
+    def _aplicar_regra(self, ordem: int, regra: Dict, tabela: np.ndarray, chaves: np.ndarray,
+                       mantido: np.ndarray, cabecalho: np.ndarray, funcionario: np.ndarray,
+                       codigos: np.ndarray) -> Dict[str, np.ndarray]:
+        """Seleciona os grupos de uma regra e extrai (atributo, valor bruto)"""
+        selecao = mantido.copy()
+        if regra.get("cabecalho"):
+            selecao &= cabecalho
+        if "rotulo" in regra:
+            selecao &= _pertence(chaves[:, 0], regra["rotulo"])
+        for coluna in regra.get("preenchidas", []):
+            selecao &= np.not_equal(tabela[:, coluna - 1], None)
+        for coluna in regra.get("vazias", []):
+            selecao &= np.equal(tabela[:, coluna - 1], None)
+        for coluna, textos in regra.get("em", {}).items():
+            selecao &= _pertence(chaves[:, coluna - 1], textos)
+        for coluna, textos in regra.get("fora", {}).items():
+            selecao &= ~_pertence(chaves[:, coluna - 1], textos)
+        for coluna, padrao in regra.get("padroes", {}).items():
+            posicoes = np.flatnonzero(selecao)
+            textos = pd.Series(normalizar_codigos(tabela[posicoes, coluna - 1]), dtype=object)
+            selecao[posicoes] = textos.str.fullmatch(padrao).to_numpy(dtype=bool, na_value=False)
+        if "codigos" in regra:
+            selecionados = _pertence(codigos, regra["codigos"])
+            selecao &= (funcionario > 0) & np.append(False, selecionados)[funcionario]
+
+        if "indicador" in regra:
+            grupos, colunas, atributos, valores = self._extrair_rubricas(
+                tabela, chaves, selecao, regra["indicador"]
+            )
+        else:
+            grupos = np.flatnonzero(selecao)
+            colunas = np.zeros(len(grupos), dtype=np.int64)
+            atributo = regra["atributo"]
+            if isinstance(atributo, str):
+                atributos = np.full(len(grupos), atributo, dtype=object)
+            else:
+                atributos = normalizar_textos(tabela[grupos, atributo - 1])
+            valores = tabela[grupos, regra["valor"] - 1]
+
+        return {
+            'funcionario': funcionario[grupos],
+            'regra': np.full(len(grupos), ordem, dtype=np.int64),
+            'grupo': grupos,
+            'coluna': colunas,
+            'atributo': atributos,
+            'valor_bruto': valores,
+            'natureza': np.full(len(grupos), regra.get("indicador"), dtype=object),
+            'ignorar_zero': np.full(len(grupos), bool(regra.get("ignorar_zero")), dtype=bool)
+        }
+
+    @staticmethod
+    def _extrair_rubricas(tabela: np.ndarray, chaves: np.ndarray, selecao: np.ndarray,
+                          indicador: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Lê rubricas "código, descrição, [referência], valor, P/D" de cada grupo
+
+        Cada indicador fecha uma rubrica que começa logo após o indicador anterior
+        do mesmo grupo; a descrição é o segundo item e o valor o item anterior
+        ao indicador. Equivale às colunas Pagamento/Desconto do Extrato Mensal,
+        sem depender das posições fixas das células vazias.
+        """
+        linhas = np.flatnonzero(selecao)
+        chaves = chaves[linhas]
+        eh_indicador = (chaves == "p") | (chaves == "d")
+
+        # Coluna do indicador anterior (-1 se não houver) para cada posição
+        colunas = np.arange(tabela.shape[1])
+        ultimo = np.maximum.accumulate(np.where(eh_indicador, colunas, -1), axis=1)
+        anterior = np.hstack([np.full((len(linhas), 1), -1), ultimo[:, :-1]])
+
+        relativas, posicoes = np.nonzero(eh_indicador & (chaves == indicador.casefold()))
+        inicios = anterior[relativas, posicoes] + 1
+
+        # Rubrica mínima: código, descrição e valor antes do indicador
+        completas = posicoes - inicios >= 3
+        grupos = linhas[relativas[completas]]
+        posicoes, inicios = posicoes[completas], inicios[completas]
+
+        return grupos, posicoes, normalizar_textos(tabela[grupos, inicios + 1]), tabela[grupos, posicoes - 1]
+
+    @staticmethod
+    def _combinar_partes(partes: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        if not partes:
+            partes = [{
+                'funcionario': np.array([], dtype=np.int64), 'regra': np.array([], dtype=np.int64),
+                'grupo': np.array([], dtype=np.int64), 'coluna': np.array([], dtype=np.int64),
+                'atributo': np.array([], dtype=object), 'valor_bruto': np.array([], dtype=object),
+                'natureza': np.array([], dtype=object), 'ignorar_zero': np.array([], dtype=bool)
+            }]
+        return {chave: np.concatenate([parte[chave] for parte in partes]) for chave in partes[0]}
+
+    def _montar_tabela(self, linhas: Dict[str, np.ndarray], numeros: np.ndarray,
+                       codigos: np.ndarray, campos: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Cria a tabela longa com os tipos definitivos"""
+        posicao = linhas['funcionario'] - 1
+
+        # Nº: quantidade de linhas já geradas + 1, como na ConstrutorTabelaLonga
+        primeira = np.flatnonzero(np.diff(posicao, prepend=-1) != 0)
+        numeros_linha = np.repeat(primeira + 1, np.diff(np.append(primeira, len(posicao))))
+
+        colunas = {
+            'Nº': numeros_linha.astype(np.int64),
+            'Codigo': pd.array(codigos[posicao], dtype="str"),
+            'Atributo': pd.Categorical(linhas['atributo']),
+            'Valor': numeros,
+            'Natureza': pd.Categorical(linhas['natureza'])
+        }
+        for nome, valores in campos.items():
+            spec = self.layout["campos"][nome]
+            valores = valores[posicao]
+            if spec.get("tipo") == "data":
+                colunas[nome] = pd.to_datetime(
+                    pd.Series(normalizar_textos(valores), dtype=object), errors='coerce'
+                ).to_numpy()
+            elif spec.get("categoria"):
+                colunas[nome] = pd.Categorical(valores)
+            else:
+                colunas[nome] = pd.array(valores, dtype="str")
+
+        saida = self.layout.get("saida", list(colunas))
+        return pd.DataFrame({nome: colunas[nome] for nome in saida}, columns=saida)
+
+class ProcessadorLayout(ABC):
+    """
+    Processador genérico de relatórios declarado por um layout
+
+    ProcessadorGenesis e ProcessadorExtrato herdam desta classe e apenas
+    declaram o layout e as configurações padrão (ver carregar_config_padrao);
+    o ProcessadorFenix também troca a origem da grade (ver obter_grade).
+    """
+
+    def __init__(self, arquivo: Path, config: Dict = None,
+                 instrumentacao: Optional[Instrumentacao] = None):
+        """
+        Args:
+            arquivo: Caminho do arquivo Excel
+            config: Configurações ("layout", "substituicoes_cpf", "colunas_cpf",
+                    "funcionarios_excluidos"); se None, usa carregar_config_padrao
+            instrumentacao: Medição de tempo/memória por etapa (None: desativada)
+        """
+        self.arquivo = Path(arquivo)
+        self.config = config or self.carregar_config_padrao()
+        self.instrumentacao = instrumentacao or INSTRUMENTACAO_DESATIVADA
+        self.setup_logging()
+
+        self.layout = self.config["layout"]
+        self.motor = MotorLayout(self.layout)
+        self.substituidor = SubstituidorCPF(self.config.get("substituicoes_cpf", {}))
+
+        # Dados processados
+        self.dados_brutos = None
+        self.dados_estruturados = None
+        self.valores_invalidos = []
+
+    def setup_logging(self):
+        """Configura logging com o nome do processador"""
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @abstractmethod
+    def carregar_config_padrao(self) -> Dict:
+        """Configurações padrão; cada processador declara aqui o seu layout"""
+
+    @medir_etapa("leitura_excel")
+    def carregar_dados_brutos(self) -> pd.DataFrame:
+        """Carrega a planilha do layout, com índice de linha e CPFs substituídos"""
+        self.logger.info(f"Carregando dados de {self.layout['nome']}: {self.arquivo.name}")
+
+        try:
+            df = pd.read_excel(self.arquivo, sheet_name=self.layout["planilha"], header=None)
+
+            df.reset_index(inplace=True)
+            df.rename(columns={'index': 'Índice'}, inplace=True)
+
+            substituidos = self.substituidor.aplicar(df, self.config.get("colunas_cpf", [0]))
+            if substituidos:
+                self.logger.info(f"CPFs substituídos por código: {substituidos}")
+
+            self.dados_brutos = df
+            self.logger.info(f"Dados carregados: {len(df)} linhas, {len(df.columns)} colunas")
+
+            return df
+
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar dados de {self.layout['nome']}: {e}")
+            raise
+
+    def obter_grade(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Relatório compactado entregue ao motor (ver compactar_grade)
+
+        Gancho da origem dos dados: o padrão compacta a planilha carregada por
+        carregar_dados_brutos; subclasses podem ler de um cache ou em streaming.
+        """
+        if self.dados_brutos is None:
+            self.carregar_dados_brutos()
+
+        # Tipos nativos: o valor numérico do Excel não passa por texto
+        with self.instrumentacao.etapa("compactacao"):
+            return compactar_grade(self.dados_brutos, como_texto=False)
+
+    @medir_etapa("estrutura")
+    def processar_estrutura_dados(self) -> pd.DataFrame:
+        """Passa o relatório compactado pelo motor de layout"""
+        indices, valores, offsets = self.obter_grade()
+        with self.instrumentacao.etapa("classificacao_secoes"):
+            df, self.valores_invalidos = self.motor.processar(
+                indices, valores, offsets, self.config.get("funcionarios_excluidos", [])
+            )
+
+        if self.valores_invalidos:
+            exemplos = ", ".join(f"linha {item['indice']}: {item['valor']!r}" for item in self.valores_invalidos[:5])
+            self.logger.warning(f"{len(self.valores_invalidos)} valores não reconhecidos ({exemplos})")
+
+        self.dados_estruturados = df
+        self.logger.info(f"Dados estruturados gerados: {len(df)} registros")
+        return df
+
+    def gerar_relatorio_processamento(self) -> Dict:
+        """Gera relatório do processamento"""
+        if self.dados_estruturados is None:
+            self.processar_estrutura_dados()
+
+        df = self.dados_estruturados
+        return {
+            'timestamp': pd.Timestamp.now().isoformat(),
+            'empresa': self.layout['nome'],
+            'arquivo_origem': str(self.arquivo),
+            # Nº identifica o funcionário (códigos podem se repetir entre empresas do Extrato)
+            'funcionarios_processados': int(df['Nº'].nunique()) if 'Nº' in df.columns else 0,
+            'registros_gerados': len(df),
+            'total_valores': float(df['Valor'].sum()) if len(df) else 0.0,
+            'valores_invalidos': self.valores_invalidos,
+            'performance': self.instrumentacao.resumo()
+        }
+
+    def executar_processamento_completo(self) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Executa o processamento completo
+
+        Returns:
+            Tuple[DataFrame dos dados estruturados, Relatório do processamento]
+        """
+        self.logger.info(f"Iniciando processamento completo de {self.layout['nome']}")
+
+        try:
+            # A planilha é lida por obter_grade, só quando necessário
+            df_resultado = self.processar_estrutura_dados()
+            relatorio = self.gerar_relatorio_processamento()
+
+            self.logger.info(f"Processamento de {self.layout['nome']} concluído com sucesso")
+            self.logger.info(f"   Funcionários: {relatorio['funcionarios_processados']}")
+            self.logger.info(f"   Registros: {relatorio['registros_gerados']}")
+
+            return df_resultado, relatorio
+
+        except Exception as e:
+            self.logger.error(f"Erro no processamento de {self.layout['nome']}: {e}")
+            raise
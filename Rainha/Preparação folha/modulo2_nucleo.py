@@ -0,0 +1,463 @@
+"""
+MÓDULO 2 (NÚCLEO): ROTINAS COMPARTILHADAS PELOS PROCESSADORES
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo concentra as etapas comuns aos processadores Fenix, Genesis e
+Extrato Mensal:
+1. Substituição de CPF por código de funcionário (Table.ReplaceValue do código M)
+2. Classificação das seções dos relatórios pelo primeiro item de cada linha
+3. Conversão de valores monetários no formato brasileiro (1.234,56)
+4. Montagem colunar da tabela longa (funcionário x atributo) que alimenta a Folha Agrupada
+"""
+
+import re
+import json
+from array import array
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Configuração do sistema com o mapeamento CPF -> Código compartilhado
+ARQUIVO_CONFIG_SISTEMA = Path(__file__).parent / "config_sistema.json"
+
+# Valor monetário brasileiro: milhar com ponto e decimal com vírgula
+PADRAO_BRL = r"^(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?$"
+# Texto com ponto decimal (ex: valores exportados como "110.67")
+PADRAO_DECIMAL_PONTO = r"^\d+\.\d+$"
+# Indicador de Desconto/Provento no fim do valor (Extrato Mensal)
+PADRAO_INDICADOR = r"^(.*?)\s*([DP])$"
+
+REGEX_BRL = re.compile(PADRAO_BRL)
+REGEX_DECIMAL_PONTO = re.compile(PADRAO_DECIMAL_PONTO)
+REGEX_INDICADOR = re.compile(PADRAO_INDICADOR, re.IGNORECASE)
+
+# CPF com ou sem máscara (000.000.000-00); zeros à esquerda podem ter sido perdidos
+PADRAO_CPF_TEXTO = re.compile(r"^\d{1,3}\.?\d{3}\.?\d{3}-?\d{2}$")
+
+def normalizar_cpf(valor: Any) -> Optional[str]:
+    """
+    Normaliza um CPF para 11 dígitos
+
+    Aceita CPF numérico (12728617769 ou 12728617769.0), com máscara
+    ("127.286.177-69") ou sem os zeros à esquerda (897706606).
+
+    Returns:
+        CPF com 11 dígitos ou None se o valor não puder ser um CPF
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+
+    if isinstance(valor, (int, np.integer)):
+        texto = str(int(valor))
+    elif isinstance(valor, (float, np.floating)):
+        if not np.isfinite(valor) or valor != int(valor):
+            return None
+        texto = str(int(valor))
+    elif isinstance(valor, str):
+        texto = valor.strip()
+        if texto.endswith(".0"):
+            texto = texto[:-2]
+        if not PADRAO_CPF_TEXTO.match(texto):
+            return None
+        texto = texto.replace(".", "").replace("-", "")
+    else:
+        return None
+
+    if not texto.isdigit() or len(texto) > 11:
+        return None
+    return texto.zfill(11)
+
+def texto_celula(valor: Any) -> Optional[str]:
+    """
+    Texto de uma célula, igual na leitura em lote e em streaming
+
+    O pandas lê como 7.0 uma coluna numérica que o openpyxl entrega como 7:
+    números inteiros viram "7" nos dois casos e datas usam o mesmo formato.
+
+    Returns:
+        Texto da célula ou None se vazia
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        return valor
+    if isinstance(valor, (int, np.integer)) and not isinstance(valor, bool):
+        return str(int(valor))
+    if isinstance(valor, (float, np.floating)) and np.isfinite(valor) and float(valor).is_integer():
+        return str(int(valor))
+    if isinstance(valor, pd.Timestamp):
+        return str(valor.to_pydatetime())
+    return str(valor)
+
+def converter_valor_brl(valor: Any, descontos_negativos: bool = False) -> float:
+    """
+    Converte um único valor monetário (mesmas regras de converter_moeda_brl)
+
+    Usado no processamento em streaming, linha a linha.
+
+    Returns:
+        Valor em float; NaN se vazio ou não reconhecido
+    """
+    if valor is None or isinstance(valor, bool):
+        return np.nan
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return float(valor)
+    if not isinstance(valor, str):
+        return np.nan
+
+    texto = valor.strip()
+    if texto.upper().startswith("R$"):
+        texto = texto[2:].strip()
+
+    desconto = False
+    indicador = REGEX_INDICADOR.match(texto)
+    if indicador:
+        texto = indicador.group(1)
+        desconto = indicador.group(2).upper() == "D"
+
+    negativo = texto.startswith("(") and texto.endswith(")")
+    if negativo:
+        texto = texto[1:-1].strip()
+    if texto.startswith("-") or texto.endswith("-"):
+        negativo = True
+        texto = texto.strip("-").strip()
+
+    if REGEX_BRL.match(texto):
+        numero = float(texto.replace(".", "").replace(",", "."))
+    elif REGEX_DECIMAL_PONTO.match(texto):
+        numero = float(texto)
+    else:
+        return np.nan
+
+    if negativo or (descontos_negativos and desconto):
+        numero = -numero
+    return numero
+
+def converter_moeda_brl(valores, descontos_negativos: bool = False,
+                        centavos: bool = False) -> Tuple[Any, np.ndarray]:
+    """
+    Converte uma coluna inteira de valores monetários numa única passada
+
+    Aceita números já convertidos pelo Excel e textos no formato brasileiro:
+    milhar com ponto e decimal com vírgula ("1.234,56"), prefixo "R$",
+    indicador D/P no final ("150,00 D", como no Extrato Mensal), negativos
+    entre parênteses ou com sinal ("(10,00)", "10,00-"). Textos apenas com
+    ponto decimal ("110.67") também são aceitos.
+
+    Args:
+        valores: Series, array ou lista de valores
+        descontos_negativos: Torna negativos os valores marcados com "D"
+        centavos: Retorna inteiros em centavos (Int64) em vez de float64
+
+    Returns:
+        Tuple[valores convertidos (NaN/NA se vazio ou inválido),
+              máscara dos valores não reconhecidos (para relatório)]
+    """
+    serie = pd.Series(np.asarray(valores, dtype=object), dtype=object)
+    resultado = np.full(len(serie), np.nan)
+    invalidos = np.zeros(len(serie), dtype=bool)
+
+    # Números já convertidos pelo Excel passam direto
+    eh_texto = np.fromiter((isinstance(valor, str) for valor in serie), dtype=bool, count=len(serie))
+    eh_numero = ~eh_texto & serie.notna().to_numpy()
+    if eh_numero.any():
+        numeros = pd.to_numeric(serie[eh_numero], errors='coerce').to_numpy(dtype=float)
+        resultado[eh_numero] = numeros
+        invalidos[np.flatnonzero(eh_numero)[np.isnan(numeros)]] = True
+
+    if eh_texto.any():
+        texto = serie[eh_texto].str.strip().str.replace(r"^R\$\s*", "", regex=True, case=False)
+
+        partes = texto.str.extract(PADRAO_INDICADOR, flags=re.IGNORECASE)
+        tem_indicador = partes[0].notna()
+        texto = texto.where(~tem_indicador, partes[0])
+        desconto = (partes[1].str.upper() == "D").fillna(False).to_numpy(dtype=bool)
+
+        entre_parenteses = (texto.str.startswith("(") & texto.str.endswith(")")).to_numpy(dtype=bool)
+        texto = texto.where(~entre_parenteses, texto.str[1:-1].str.strip())
+        com_sinal = (texto.str.startswith("-") | texto.str.endswith("-")).to_numpy(dtype=bool)
+        texto = texto.str.strip("-").str.strip()
+
+        brl = texto.str.match(PADRAO_BRL).to_numpy(dtype=bool)
+        decimal_ponto = ~brl & texto.str.match(PADRAO_DECIMAL_PONTO).to_numpy(dtype=bool)
+        vazio = (texto == "").to_numpy(dtype=bool)
+
+        normalizado = texto.where(~brl, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+        numeros = pd.to_numeric(normalizado.where(brl | decimal_ponto), errors='coerce').to_numpy(dtype=float)
+
+        negativo = entre_parenteses | com_sinal
+        if descontos_negativos:
+            negativo |= desconto
+        numeros = np.where(negativo, -numeros, numeros)
+
+        posicoes = np.flatnonzero(eh_texto)
+        resultado[posicoes] = numeros
+        invalidos[posicoes] = ~(brl | decimal_ponto | vazio)
+
+    if centavos:
+        return pd.array(np.round(resultado * 100), dtype="Int64"), invalidos
+    return resultado, invalidos
+
+def carregar_mapeamento_cpf(arquivo_config: Path) -> Dict[str, str]:
+    """Lê o mapeamento CPF -> Código de mapeamento_funcionarios no config_sistema.json"""
+    with open(arquivo_config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return dict(config.get("mapeamento_funcionarios", {}).get("mapeamentos", {}))
+
+def carregar_lojas_por_nome(arquivo_config: Path = ARQUIVO_CONFIG_SISTEMA) -> Dict[str, str]:
+    """
+    Lê o mapeamento Nome -> loja de lojas_por_nome no config_sistema.json
+
+    Returns:
+        Dicionário nome do funcionário: loja (vazio se o arquivo não existir)
+    """
+    if not Path(arquivo_config).exists():
+        return {}
+    with open(arquivo_config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return dict(config.get("lojas_por_nome", {}).get("mapeamentos", {}))
+
+def carregar_substituicoes_cpf(especificas: Optional[Dict[str, str]] = None,
+                               arquivo_config: Path = ARQUIVO_CONFIG_SISTEMA) -> Dict[str, str]:
+    """
+    Tabela CPF -> Código compartilhada pelos processadores
+
+    Args:
+        especificas: Exceções de um relatório (código M da empresa), aplicadas por cima
+        arquivo_config: config_sistema.json com o mapeamento compartilhado
+
+    Returns:
+        Dicionário CPF -> código (só as exceções se o arquivo não existir)
+    """
+    mapeamento = {}
+    if Path(arquivo_config).exists():
+        mapeamento = carregar_mapeamento_cpf(arquivo_config)
+    else:
+        logging.getLogger('SubstituidorCPF').warning(f"Mapeamento de CPF não encontrado: {arquivo_config}")
+    mapeamento.update(especificas or {})
+    return mapeamento
+
+class SubstituidorCPF:
+    """
+    Substitui CPFs por códigos de funcionário numa única passada
+
+    O mapeamento é normalizado uma vez para um dicionário (CPF de 11 dígitos
+    -> código). Cada coluna é fatorada em valores únicos, que são normalizados
+    e consultados no dicionário; o custo é linear nas linhas e não depende do
+    tamanho do mapeamento.
+    """
+
+    def __init__(self, mapeamento: Dict[str, str]):
+        """
+        Args:
+            mapeamento: Dicionário CPF -> código (CPF em qualquer formato aceito)
+        """
+        self.logger = logging.getLogger('SubstituidorCPF')
+        self.mapa = {}
+        for cpf, codigo in mapeamento.items():
+            chave = normalizar_cpf(cpf)
+            if chave is None:
+                self.logger.warning(f"CPF inválido no mapeamento ignorado: {cpf}")
+                continue
+            self.mapa[chave] = codigo
+
+    def substituir_valor(self, valor: Any) -> Any:
+        """Retorna o código do CPF ou o próprio valor se não houver mapeamento"""
+        return self.mapa.get(normalizar_cpf(valor), valor)
+
+    def _substituir(self, serie: pd.Series) -> Tuple[Optional[pd.Series], int]:
+        """Retorna (nova Series ou None se nada mudou, quantidade de substituições)"""
+        if not self.mapa or serie.empty:
+            return None, 0
+
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+        substitutos = np.array(
+            [self.mapa.get(normalizar_cpf(valor)) for valor in unicos.tolist()] + [None],
+            dtype=object
+        )
+
+        # O sentinela -1 de nulos aponta para o None final
+        novos = substitutos[codigos]
+        encontrados = np.not_equal(novos, None)
+        quantidade = int(encontrados.sum())
+        if quantidade == 0:
+            return None, 0
+
+        valores = serie.to_numpy(dtype=object, copy=True)
+        valores[encontrados] = novos[encontrados]
+        return pd.Series(valores, index=serie.index, name=serie.name), quantidade
+
+    def substituir_serie(self, serie: pd.Series) -> pd.Series:
+        """
+        Substitui os CPFs de uma coluna
+
+        Returns:
+            Nova Series com os códigos (valores sem mapeamento são mantidos);
+            a própria Series se nenhum CPF for encontrado
+        """
+        substituida, _ = self._substituir(serie)
+        return serie if substituida is None else substituida
+
+    def aplicar(self, df: pd.DataFrame, colunas: Iterable = None) -> int:
+        """
+        Substitui CPFs nas colunas indicadas do DataFrame (in place)
+
+        Args:
+            df: DataFrame a alterar
+            colunas: Colunas que podem conter CPF; se None, todas as colunas
+                     de texto ou numéricas
+
+        Returns:
+            Quantidade de células substituídas
+        """
+        if colunas is None:
+            colunas = [
+                coluna for coluna in df.columns
+                if df[coluna].dtype == object
+                or pd.api.types.is_string_dtype(df[coluna].dtype)
+                or pd.api.types.is_numeric_dtype(df[coluna].dtype)
+            ]
+
+        total = 0
+        for coluna in colunas:
+            if coluna not in df.columns:
+                continue
+            substituida, quantidade = self._substituir(df[coluna])
+            if substituida is not None:
+                df[coluna] = substituida
+                total += quantidade
+
+        return total
+
+class ClassificadorSecoes:
+    """
+    Classificador de seções compilado uma única vez a partir da configuração
+
+    Substitui as cadeias de if/else do código M (Fenix.txt, Genesis.txt,
+    Extrato Mensal.txt) por: verificação de prefixo para códigos de
+    funcionário (000xxx), dicionário de rótulos exatos e conjunto de
+    categorias de pagamento.
+    """
+
+    def __init__(self, rotulos: Dict[str, str], categorias_pagamento: Iterable[str] = (),
+                 prefixo_funcionario: Optional[str] = "000", tipo_padrao: str = "dados"):
+        """
+        Args:
+            rotulos: Rótulo exato -> tipo de seção (ex: "Função :" -> "funcao")
+            categorias_pagamento: Rótulos classificados como 'pagamento'
+            prefixo_funcionario: Prefixo seguido de dígito que identifica o
+                                 cabeçalho de funcionário; None desativa
+            tipo_padrao: Tipo das linhas não reconhecidas
+        """
+        # Rótulos exatos têm precedência sobre as categorias
+        self.tipos = dict.fromkeys(frozenset(categorias_pagamento), "pagamento")
+        self.tipos.update(rotulos)
+        self.prefixo = prefixo_funcionario
+        self.tipo_padrao = tipo_padrao
+
+    def classificar(self, item: str) -> str:
+        """Classifica uma seção pelo primeiro item da linha"""
+        prefixo = self.prefixo
+        if prefixo and item.startswith(prefixo) and item[len(prefixo):len(prefixo) + 1].isdigit():
+            return "funcionario"
+        return self.tipos.get(item, self.tipo_padrao)
+
+    def classificar_lote(self, itens) -> np.ndarray:
+        """
+        Classifica uma coluna inteira de primeiros itens
+
+        Cada valor distinto é classificado uma única vez e o resultado é
+        distribuído para as linhas por índice.
+
+        Returns:
+            Array (object) com o tipo de seção de cada item
+        """
+        codigos, unicos = pd.factorize(np.asarray(itens, dtype=object), use_na_sentinel=True)
+        tipos = np.array(
+            [self.classificar(str(item)) for item in unicos.tolist()] + [self.tipo_padrao],
+            dtype=object
+        )
+        return tipos[codigos]
+
+class ConstrutorTabelaLonga:
+    """
+    Monta a tabela longa (Nº, Nome, Cargo, Adm:, LOJAS, Codigo, Atributo, Valor)
+    diretamente em buffers por coluna
+
+    Os campos do funcionário são guardados uma vez por funcionário e repetidos
+    no final; Cargo, LOJAS e Atributo são codificados como categorias durante
+    a inserção. O DataFrame é criado uma única vez, já com os tipos corretos.
+    """
+
+    COLUNAS = ['Nº', 'Nome', 'Cargo', 'Adm:', 'LOJAS', 'Codigo', 'Atributo', 'Valor']
+
+    def __init__(self):
+        # Uma entrada por funcionário
+        self.numeros = array('q')
+        self.nomes = []
+        self.admissoes = []
+        self.codigos = []
+        self.quantidades = array('q')
+        self.cargos = array('l')
+        self.lojas = array('l')
+
+        # Uma entrada por linha
+        self.atributos = array('l')
+        self.valores = array('d')
+
+        self.categorias = {'Cargo': {}, 'LOJAS': {}, 'Atributo': {}}
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def _codificar(self, coluna: str, valor: str) -> int:
+        categorias = self.categorias[coluna]
+        return categorias.setdefault(valor, len(categorias))
+
+    def adicionar_funcionario(self, codigo: str, nome: str, cargo: str, admissao: Any,
+                              loja: str, atributos: List[str], valores: List[float]):
+        """
+        Adiciona as linhas de um funcionário (atributos[i] com valores[i])
+
+        Funcionários sem atributos não geram linhas.
+        """
+        if not atributos:
+            return
+
+        # Nº: quantidade de linhas já geradas + 1 (como no registro_base original)
+        self.numeros.append(len(self.valores) + 1)
+        self.nomes.append(nome)
+        self.admissoes.append(admissao)
+        self.codigos.append(codigo)
+        self.quantidades.append(len(atributos))
+        self.cargos.append(self._codificar('Cargo', cargo))
+        self.lojas.append(self._codificar('LOJAS', loja))
+
+        categorias = self.categorias['Atributo']
+        self.atributos.extend([categorias.setdefault(atributo, len(categorias)) for atributo in atributos])
+        self.valores.extend(valores)
+
+    def _categoria(self, coluna: str, codigos: np.ndarray) -> pd.Categorical:
+        return pd.Categorical.from_codes(codigos, categories=list(self.categorias[coluna]))
+
+    def construir(self) -> pd.DataFrame:
+        """Cria o DataFrame final com os tipos definitivos"""
+        quantidades = np.frombuffer(self.quantidades, dtype=np.int64)
+
+        def repetir(valores) -> np.ndarray:
+            return np.repeat(np.asarray(valores), quantidades)
+
+        admissoes = pd.to_datetime(pd.Series(self.admissoes, dtype=object), errors='coerce')
+
+        return pd.DataFrame({
+            'Nº': repetir(np.frombuffer(self.numeros, dtype=np.int64)),
+            'Nome': pd.array(repetir(np.array(self.nomes, dtype=object)), dtype="str"),
+            'Cargo': self._categoria('Cargo', repetir(np.asarray(self.cargos))),
+            'Adm:': repetir(admissoes.to_numpy()),
+            'LOJAS': self._categoria('LOJAS', repetir(np.asarray(self.lojas))),
+            'Codigo': pd.array(repetir(np.array(self.codigos, dtype=object)), dtype="str"),
+            'Atributo': self._categoria('Atributo', np.asarray(self.atributos)),
+            'Valor': np.frombuffer(self.valores, dtype=np.float64)
+        }, columns=self.COLUNAS)
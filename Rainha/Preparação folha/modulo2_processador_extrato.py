@@ -0,0 +1,120 @@
+"""
+MÓDULO 2: PROCESSADOR EXTRATO MENSAL
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo replica a lógica do código M "Extrato Mensal.txt" sobre o motor de layouts
+Cada funcionário começa em "Empr.:"; as rubricas trazem o indicador P (Provento)
+ou D (Desconto) depois do valor.
+"""
+
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Dict
+
+from modulo2_motor_layout import ProcessadorLayout, normalizar_textos
+from modulo2_nucleo import carregar_lojas_por_nome
+
+# Layout do Extrato Mensal conforme o código M (ver MotorLayout)
+LAYOUT_EXTRATO = {
+    "nome": "Extrato Mensal",
+    "planilha": "Extrato Mensal",
+    "colunas": 12,
+    "marcadores": {
+        "Cargo:": True,
+        "Competência:": False, "Resumo por Rubrica": False, "EXTRATO MENSAL": False,
+        "Página:": False, "CNPJ:": False, "Cálculo:": False, "Contr:": False,
+        "Situações": False, "Totais por Centro de Custos": False, "Empresa:": False
+    },
+    "cabecalho": {"rotulo": "Empr.:", "codigo": 2},
+    "campos": {
+        "Nome": {"cabecalho": True, "coluna": 3},
+        "Cargo": {"rotulo": "Cargo:", "coluna": 3, "categoria": True},
+        "Cpf": {"rotulo": "CPF:", "coluna": 2},
+        "Situação": {"rotulo": "Situação:", "coluna": 2, "categoria": True},
+        "Adm:": {"rotulo": "Adm:", "coluna": 2, "tipo": "data"},
+        # Empresa do cabeçalho da página ("716 - PRATTIKA ..."): os códigos de
+        # funcionário se repetem entre as empresas do Extrato
+        "Empregador": {"rotulo": "Empresa:", "coluna": 2, "escopo": "pagina", "categoria": True,
+                    "formato": r"\d+ - .+"}
+    },
+    "atributos": [
+        # Pagamento e Desconto1 do código M: rubricas com indicador P e D
+        {"indicador": "P"},
+        {"indicador": "D"},
+        {"rotulo": "Salário:", "atributo": 1, "valor": 2}
+    ],
+    "saida": ["Nº", "Nome", "Cargo", "Cpf", "Situação", "Adm:", "Empregador", "Codigo", "Atributo", "Valor", "Natureza"]
+}
+
+class ProcessadorExtrato(ProcessadorLayout):
+    """
+    Classe responsável por processar o Extrato Mensal
+    Replica a lógica do arquivo Extrato Mensal.txt (Power Query M)
+    """
+
+    def carregar_config_padrao(self) -> Dict:
+        """Carrega configurações padrão baseadas no código M"""
+        return {
+            "layout": LAYOUT_EXTRATO,
+            # O Extrato já traz o código do funcionário em "Empr.:"
+            "substituicoes_cpf": {},
+            "colunas_cpf": [],
+            "funcionarios_excluidos": [],
+            # Nome -> loja (consulta "Lojas" mesclada pelo código M), do config_sistema.json
+            "lojas_por_nome": carregar_lojas_por_nome()
+        }
+
+    def processar_estrutura_dados(self) -> pd.DataFrame:
+        """Processa pelo motor de layout e acrescenta LOJAS pelo nome"""
+        df = super().processar_estrutura_dados()
+
+        lojas = self.config.get("lojas_por_nome", {})
+        chaves = dict(zip(normalizar_textos(list(lojas), True).tolist(), lojas.values()))
+        nomes = pd.Series(normalizar_textos(df['Nome'].to_numpy(dtype=object), True), dtype=object)
+        df.insert(df.columns.get_loc('Adm:') + 1, 'LOJAS', pd.Categorical(nomes.map(chaves)))
+
+        if not lojas:
+            self.logger.warning("lojas_por_nome vazio (config_sistema.json): LOJAS fica vazia no Extrato")
+        else:
+            sem_loja = df.loc[df['LOJAS'].isna(), 'Nome'].dropna().unique()
+            if len(sem_loja):
+                self.logger.warning(f"{len(sem_loja)} funcionários sem loja em lojas_por_nome (ex: {list(sem_loja[:5])})")
+
+        self.dados_estruturados = df
+        return df
+
+# Função de teste
+def main():
+    """Função principal para testar o processador"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("MÓDULO 2: PROCESSADOR EXTRATO MENSAL")
+    print("=" * 50)
+
+    arquivo = Path(__file__).parent / "Base de Dados" / "Extrato Mensal.xlsx"
+
+    if not arquivo.exists():
+        print(f"Arquivo não encontrado: {arquivo}")
+        return False
+
+    try:
+        df_resultado, relatorio = ProcessadorExtrato(arquivo).executar_processamento_completo()
+
+        print("\nRESULTADOS:")
+        print(f"   Funcionários processados: {relatorio['funcionarios_processados']}")
+        print(f"   Registros gerados: {relatorio['registros_gerados']}")
+        print(f"   Valores não reconhecidos: {len(relatorio['valores_invalidos'])}")
+
+        if not df_resultado.empty:
+            print("\nAMOSTRA DOS DADOS (primeiros 5 registros):")
+            print(df_resultado.head().to_string(index=False))
+
+        return True
+
+    except Exception as e:
+        print(f"Erro durante o teste: {e}")
+        return False
+
+if __name__ == "__main__":
+    main()
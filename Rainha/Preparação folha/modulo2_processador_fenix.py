@@ -2,410 +2,286 @@
 MÓDULO 2: PROCESSADOR FENIX
 Sistema de Automação da Folha de Pagamento - Rainha
 
-Este módulo replica a lógica do código M "Fenix.txt" (165 linhas)
+Este módulo replica a lógica do código M "Fenix.txt" sobre o motor de layouts
 Responsável por processar os dados da empresa Fenix
 """
 
 import pandas as pd
 import numpy as np
-import re
-import logging
+import openpyxl
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
-import json
+from typing import Dict, List, Tuple, Optional, Iterator
 
-class ProcessadorFenix:
+from modulo2_nucleo import ConstrutorTabelaLonga, texto_celula, carregar_substituicoes_cpf
+from modulo2_motor_layout import ProcessadorLayout
+from modulo2_cache import CacheParquet, hash_config
+from instrumentacao import Instrumentacao
+
+# Campos da configuração que afetam a leitura do Report (chave do cache Parquet)
+CAMPOS_CONFIG_LEITURA = ["substituicoes_cpf", "colunas_cpf"]
+
+# Categorias de pagamento do filtro "Pagamentos" do código M (Fenix.txt e Genesis.txt)
+CATEGORIAS_PAGAMENTO_REPORT = [
+    "1/3 de Férias (Rescisão)", "1/3 Férias", "Adiantamento", "Adiantamento Salarial",
+    "Férias", "INSS", "INSS  Rescisão", "INSS 13o. Rescisão", "INSS Folha", "INSS Férias",
+    "IRRF Folha", "IRRF Férias", "Plano Odontologico + Dependentes", "Quebra de Caixa",
+    "Quebra de Caixa   5%", "Trienio  5%", "Vale transporte", "Vale Transporte"
+]
+
+# Layout do Report conforme o código M Fenix.txt (ver MotorLayout)
+LAYOUT_FENIX = {
+    "nome": "Fenix",
+    "planilha": "Report",
+    "colunas": 9,
+    "marcadores": {
+        "Função :": True, "Empresa :": True,
+        "Resumo da Folha": False, "Página :": False
+    },
+    "cabecalho": {"prefixo": "000", "codigo": 1},
+    "campos": {
+        "Nome": {"cabecalho": True, "coluna": 2},
+        "Cargo": {"rotulo": "Função :", "coluna": 2, "categoria": True},
+        "Adm:": {"rotulo": "Admissão :", "coluna": 2, "tipo": "data"},
+        "LOJAS": {"rotulo": "Empresa :", "coluna": 2, "escopo": "pagina", "categoria": True,
+                  "padrao": "GENESIS COML CAMA MESA E BANHO LTDA"}
+    },
+    "atributos": [
+        # Pagamentos: (Column2, Column3) das categorias conhecidas
+        {"preenchidas": [3], "vazias": [4], "em": {2: CATEGORIAS_PAGAMENTO_REPORT},
+         "fora": {1: ["(-) Resilição  ...............................:",
+                      "(=) Total Líqüido ..........................:"]},
+         "atributo": 2, "valor": 3},
+        # Salario: Column3 do cabeçalho do funcionário
+        {"cabecalho": True, "preenchidas": [3], "atributo": "Salario Total", "valor": 3},
+        # SalarioBase: (Column2, Column4) com Column4 diferente de zero; Column1 é o
+        # código da rubrica (a linha de totais do resumo começa por um valor)
+        {"preenchidas": [4], "fora": {1: ["Base INSS", "Empresa :", "Resumo do Líquido"]},
+         "padroes": {1: r"\d+"}, "atributo": 2, "valor": 4, "ignorar_zero": True}
+    ],
+    "saida": ConstrutorTabelaLonga.COLUNAS
+}
+
+class ProcessadorFenix(ProcessadorLayout):
     """
     Classe responsável por processar dados da empresa Fenix
     Replica a lógica do arquivo Fenix.txt (Power Query M)
+    
+    Além do ProcessadorLayout: cache Parquet do Report compactado e da tabela
+    longa, leitura em streaming e trilha de auditoria por funcionário.
     """
     
-    def __init__(self, arquivo_fenix: Path, config: Dict = None):
+    def __init__(self, arquivo_fenix: Path, config: Dict = None,
+                 instrumentacao: Optional[Instrumentacao] = None):
         """
         Inicializa o processador Fenix
         
         Args:
             arquivo_fenix: Caminho para o arquivo Excel da Fenix
             config: Configurações e mapeamentos
+            instrumentacao: Medição de tempo/memória por etapa (None: desativada)
         """
-        self.arquivo_fenix = arquivo_fenix
-        self.config = config or self.carregar_config_padrao()
-        self.setup_logging()
+        super().__init__(arquivo_fenix, config, instrumentacao)
+        
+        # Leitura linha a linha (openpyxl), sem o DataFrame da planilha
+        self.streaming = False
         
-        # Dados processados
-        self.dados_brutos = None
-        self.dados_estruturados = None
-        self.funcionarios = {}
+        # Report compactado (Índice, valores, offsets) para reconstruir a auditoria sob demanda
+        self._buffer_auditoria = None
         
-    def setup_logging(self):
-        """Configura logging específico para Fenix"""
-        self.logger = logging.getLogger('ProcessadorFenix')
+        # Cache Parquet do Report compactado e da tabela longa (desativado sem pasta_cache)
+        pasta_cache = self.config.get("pasta_cache")
+        self.cache = CacheParquet(pasta_cache) if pasta_cache else None
+        self._chave_cache = None
         
     def carregar_config_padrao(self) -> Dict:
         """Carrega configurações padrão baseadas no código M"""
         return {
-            "substituicoes_cpf": {
-                "12728617769": "000160",
-                "10897706606": "000161",
-                "12666986766": "000170"
-            },
-            "codigos_salario": {
-                "7": "Salario Total", "28": "Salario Total", "48": "Salario Total",
-                "76": "Salario Total", "79": "Salario Total", "94": "Salario Total",
-                "116": "Salario Total", "145": "Salario Total", "148": "Salario Total",
-                "168": "Salario Total", "183": "Salario Total", "202": "Salario Total",
-                "232": "Salario Total", "251": "Salario Total", "268": "Salario Total",
-                "283": "Salario Total", "328": "Salario Total", "349": "Salario Total",
-                "361": "Salario Total", "186": "Salario Total", "223": "Salario Total"
-            },
-            "funcionarios_excluidos": [
-                "000001", "000002", "000008", "000009", "000013", "000066",
-                "000132", "000135", "000138", "000142", "000155", "000158", 
-                "000161", "000170"
-            ],
-            "empresa_padrao": "GENESIS COML CAMA MESA E BANHO LTDA",
-            "categorias_pagamento": [
-                "1/3 de Férias (Rescisão)", "1/3 Férias", "Adiantamento", 
-                "Adiantamento Salarial", "Férias", "INSS", "INSS Rescisão",
-                "INSS 13o. Rescisão", "INSS Folha", "INSS Férias", "IRRF Folha",
-                "IRRF Férias", "Plano Odontologico + Dependentes", "Quebra de Caixa",
-                "Quebra de Caixa 5%", "Trienio 5%", "Vale transporte", "Vale Transporte"
-            ]
-        }    
-    def carregar_dados_brutos(self) -> pd.DataFrame:
-        """
-        Carrega dados brutos do arquivo Excel
-        Equivale à leitura da sheet "Report"
-        """
-        self.logger.info(f"Carregando dados da Fenix: {self.arquivo_fenix.name}")
-        
-        try:
-            # Ler a sheet Report
-            df = pd.read_excel(self.arquivo_fenix, sheet_name="Report", header=None)
-            
-            # Adicionar índice como no código M
-            df.reset_index(inplace=True)
-            df.rename(columns={'index': 'Índice'}, inplace=True)
-            
-            # Aplicar substituições de CPF por código
-            for cpf, codigo in self.config["substituicoes_cpf"].items():
-                df = df.replace(cpf, codigo)
-            
-            self.dados_brutos = df
-            self.logger.info(f"Dados carregados: {len(df)} linhas, {len(df.columns)} colunas")
-            
-            return df
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar dados da Fenix: {e}")
-            raise
+            "layout": LAYOUT_FENIX,
+            # Mapeamento CPF -> Código do config_sistema.json (o mesmo do Fenix.txt)
+            "substituicoes_cpf": carregar_substituicoes_cpf(),
+            # Colunas do Report que podem conter CPF (Column1 no código M)
+            "colunas_cpf": [0],
+            # No Fenix.txt os códigos excluídos só retiram as linhas de nome, que o
+            # layout não gera como atributo: nenhum funcionário sai da tabela longa
+            "funcionarios_excluidos": [],
+            # Pasta do cache Parquet (ex: pasta de trabalho ou de saída; None desativa)
+            "pasta_cache": None
+        }
     
-    def processar_estrutura_dados(self) -> Dict:
-        """
-        Processa a estrutura complexa dos dados
-        Replica a lógica de transposição e agrupamento do código M
+    def obter_chave_cache(self) -> Optional[str]:
+        """Chave do cache: MD5 do arquivo + hash de CAMPOS_CONFIG_LEITURA (None sem cache)"""
+        if self.cache is None or not self.cache.ativo:
+            return None
+        if self._chave_cache is None:
+            self._chave_cache = self.cache.chave(self.arquivo, self.config, CAMPOS_CONFIG_LEITURA)
+        return self._chave_cache
+    
+    def carregar_grade_cache(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
         """
-        self.logger.info("Processando estrutura dos dados Fenix...")
-        
-        if self.dados_brutos is None:
-            self.carregar_dados_brutos()
+        Carrega do cache o Report compactado, dispensando a leitura do xlsx
         
-        df = self.dados_brutos.copy()
-        
-        # 1. Criar coluna de linhas (removendo nulos)
-        df['Linhas'] = df.apply(self._criar_lista_nao_nula, axis=1)
-        
-        # 2. Processar seções baseado em padrões (equivale ao código M complexo)
-        dados_processados = self._processar_secoes_dados(df)
-        
-        # 3. Identificar e classificar funcionários
-        funcionarios_data = self._identificar_funcionarios(dados_processados)
-        
-        self.funcionarios = funcionarios_data
-        self.logger.info(f"Identificados {len(funcionarios_data)} funcionários")
-        
-        return funcionarios_data    
-    def _criar_lista_nao_nula(self, row) -> List:
-        """
-        Cria lista removendo valores nulos
-        Equivale à lógica List.RemoveNulls do código M
+        Returns:
+            Tuple[indices, valores, offsets] ou None se não estiver no cache
         """
-        valores = []
-        for col in row.index:
-            if col != 'Índice' and pd.notna(row[col]) and row[col] != '':
-                valores.append(str(row[col]))
-        return valores
+        chave = self.obter_chave_cache()
+        if chave is None:
+            return None
+        grade = self.cache.carregar_grade(chave)
+        if grade is not None:
+            self.logger.info(f"Report compactado lido do cache: {len(grade[0])} linhas")
+        return grade
     
-    def _processar_secoes_dados(self, df: pd.DataFrame) -> List[Dict]:
+    def iterar_linhas_report(self) -> Iterator[Tuple[int, List]]:
         """
-        Processa seções de dados identificando padrões
-        Replica a lógica complexa de grouping do código M
-        """
-        dados_processados = []
-        
-        for idx, row in df.iterrows():
-            if not row['Linhas']:  # Pular linhas vazias
-                continue
-                
-            # Identificar tipo de seção baseado no primeiro item
-            primeiro_item = row['Linhas'][0] if row['Linhas'] else ""
-            
-            secao = {
-                'indice': row['Índice'],
-                'dados_originais': row['Linhas'],
-                'tipo_secao': self._identificar_tipo_secao(primeiro_item),
-                'dados_processados': self._extrair_dados_secao(row['Linhas'])
-            }
-            
-            dados_processados.append(secao)
+        Lê a sheet do layout linha a linha (openpyxl read-only), sem carregar a planilha
         
-        return dados_processados    
-    def _identificar_tipo_secao(self, primeiro_item: str) -> str:
-        """
-        Identifica o tipo de seção baseado em padrões
-        Equivale aos if/else do código M
+        Yields:
+            Tuple[Índice da linha, valores não nulos da linha (tipos nativos do Excel)]
         """
-        if re.match(r'^000\d+', primeiro_item):
-            return 'funcionario'
-        elif primeiro_item == "Função :":
-            return 'funcao'
-        elif primeiro_item == "Empresa :":
-            return 'empresa'
-        elif primeiro_item == "Admissão :":
-            return 'admissao'
-        elif primeiro_item in self.config["categorias_pagamento"]:
-            return 'pagamento'
-        elif primeiro_item == "Resumo da Folha":
-            return 'resumo'
-        elif primeiro_item == "Resumo do Líquido":
-            return 'resumo_liquido'
-        else:
-            return 'dados'
+        colunas_cpf = set(self.config.get("colunas_cpf", [0]))
+        workbook = openpyxl.load_workbook(self.arquivo, read_only=True, data_only=True)
+        
+        try:
+            for indice, linha in enumerate(workbook[self.layout["planilha"]].iter_rows(values_only=True)):
+                valores = [
+                    self.substituidor.substituir_valor(valor) if coluna in colunas_cpf else valor
+                    for coluna, valor in enumerate(linha)
+                    if valor is not None and valor != ''
+                ]
+                if valores:
+                    yield indice, valores
+        finally:
+            workbook.close()
     
-    def _extrair_dados_secao(self, dados_linha: List) -> Dict:
-        """
-        Extrai dados estruturados de uma seção
+    def ler_grade_streaming(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        if not dados_linha:
-            return {}
+        Monta o Report compactado (mesmo formato de compactar_grade) lendo linha a linha
         
-        # Estrutura baseada no padrão identificado
-        resultado = {
-            'valores': dados_linha,
-            'principal': dados_linha[0] if dados_linha else None,
-            'secundario': dados_linha[1] if len(dados_linha) > 1 else None,
-            'terciario': dados_linha[2] if len(dados_linha) > 2 else None
-        }
-        
-        return resultado    
-    def _identificar_funcionarios(self, dados_processados: List[Dict]) -> Dict:
+        Só os valores não nulos ficam em memória: a grade da planilha, com as
+        células vazias, nunca é criada.
         """
-        Identifica e agrupa dados por funcionário
-        Replica a lógica de agrupamento por Index do código M
+        indices, itens, offsets = [], [], [0]
+        for indice, linha in self.iterar_linhas_report():
+            indices.append(indice)
+            itens.extend(linha)
+            offsets.append(len(itens))
+        
+        valores = np.empty(len(itens), dtype=object)
+        valores[:] = itens
+        return np.array(indices, dtype=np.int64), valores, np.array(offsets, dtype=np.int64)
+    
+    def obter_grade(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        funcionarios = {}
-        funcionario_atual = None
-        
-        for secao in dados_processados:
-            if secao['tipo_secao'] == 'funcionario':
-                # Novo funcionário identificado
-                codigo_funcionario = secao['dados_processados']['principal']
-                
-                # Verificar se deve ser excluído
-                if codigo_funcionario in self.config["funcionarios_excluidos"]:
-                    funcionario_atual = None
-                    continue
-                
-                funcionario_atual = codigo_funcionario
-                funcionarios[funcionario_atual] = {
-                    'codigo': codigo_funcionario,
-                    'nome': secao['dados_processados']['secundario'] or '',
-                    'funcao': '',
-                    'empresa': self.config["empresa_padrao"],
-                    'admissao': '',
-                    'pagamentos': [],
-                    'salario_total': 0,
-                    'dados_brutos': []
-                }
-            
-            elif funcionario_atual and funcionario_atual in funcionarios:
-                # Adicionar dados ao funcionário atual
-                self._processar_dados_funcionario(funcionarios[funcionario_atual], secao)
+        Report compactado entregue ao motor: cache Parquet, leitura em
+        streaming ou a planilha carregada (ProcessadorLayout.obter_grade)
         
-        return funcionarios    
-    def _processar_dados_funcionario(self, funcionario: Dict, secao: Dict):
+        Fora do modo streaming a grade fica em memória para obter_auditoria.
         """
-        Processa dados específicos de um funcionário
-        """
-        tipo_secao = secao['tipo_secao']
-        dados = secao['dados_processados']
-        
-        if tipo_secao == 'funcao':
-            funcionario['funcao'] = dados['secundario'] or ''
-            
-        elif tipo_secao == 'empresa':
-            funcionario['empresa'] = dados['secundario'] or funcionario['empresa']
-            
-        elif tipo_secao == 'admissao':
-            funcionario['admissao'] = dados['secundario'] or ''
-            
-        elif tipo_secao == 'pagamento':
-            pagamento = {
-                'tipo': dados['principal'],
-                'valor': self._extrair_valor_numerico(dados['secundario'])
-            }
-            funcionario['pagamentos'].append(pagamento)
-            
-        elif tipo_secao == 'dados':
-            # Verificar se é código de salário
-            if dados['principal'] in self.config["codigos_salario"]:
-                funcionario['salario_total'] = self._extrair_valor_numerico(dados['secundario'])
-        
-        # Adicionar dados brutos para auditoria
-        funcionario['dados_brutos'].append(secao)
+        grade = self.carregar_grade_cache() if self.dados_brutos is None else None
+        if grade is None:
+            if self.streaming and self.dados_brutos is None:
+                with self.instrumentacao.etapa("leitura_streaming"):
+                    grade = self.ler_grade_streaming()
+            else:
+                grade = super().obter_grade()
+            if self.obter_chave_cache() is not None:
+                self.cache.guardar_grade(self.obter_chave_cache(), *grade)
+        
+        self._buffer_auditoria = None if self.streaming else grade
+        return grade
     
-    def _extrair_valor_numerico(self, valor: Any) -> float:
+    def processar_estrutura_dados(self, streaming: Optional[bool] = None) -> pd.DataFrame:
         """
-        Extrai valor numérico de uma string
-        Trata formatações diversas
-        """
-        if pd.isna(valor) or valor == '':
-            return 0.0
+        Processa o Report pelo motor de layout (LAYOUT_FENIX), como o código M
         
-        try:
-            # Converter para string e limpar
-            valor_str = str(valor).strip()
-            
-            # Remover caracteres não numéricos exceto . , -
-            valor_limpo = re.sub(r'[^\d.,-]', '', valor_str)
-            
-            # Tratar vírgula como separador decimal
-            valor_limpo = valor_limpo.replace(',', '.')
-            
-            return float(valor_limpo) if valor_limpo else 0.0
-            
-        except (ValueError, TypeError):
-            return 0.0    
-    def gerar_dados_estruturados(self) -> pd.DataFrame:
+        A tabela longa depende da configuração completa e também fica no cache
+        Parquet, quando ativo.
+        
+        Args:
+            streaming: Lê o Report linha a linha, sem manter a planilha nem a
+                       grade da auditoria em memória (None: mantém o modo atual)
         """
-        Gera DataFrame estruturado final
-        Equivale ao resultado final do código M Fenix
+        if streaming is not None:
+            self.streaming = streaming
+        
+        chave = self.obter_chave_cache()
+        etapa = f"estruturado_{hash_config(self.config)[:16]}"
+        if chave is not None:
+            df_cache = self.cache.carregar(chave, etapa)
+            if df_cache is not None:
+                self.valores_invalidos = []
+                self.dados_estruturados = df_cache
+                self.logger.info(f"Dados estruturados lidos do cache: {len(df_cache)} registros")
+                return df_cache
+        
+        df = super().processar_estrutura_dados()
+        if chave is not None:
+            self.cache.guardar(chave, etapa, df)
+        return df
+    
+    def obter_auditoria(self, codigo: str) -> List[Dict]:
         """
-        self.logger.info("Gerando dados estruturados da Fenix...")
-        
-        if not self.funcionarios:
-            self.processar_estrutura_dados()
-        
-        dados_estruturados = []
+        Reconstrói sob demanda as linhas do Report de um funcionário
         
-        for codigo, funcionario in self.funcionarios.items():
-            # Estrutura básica do funcionário
-            registro_base = {
-                'Nº': len(dados_estruturados) + 1,
-                'Nome': funcionario['nome'],
-                'Cargo': funcionario['funcao'],
-                'Adm:': funcionario['admissao'],
-                'LOJAS': funcionario['empresa'],
-                'Codigo': codigo
-            }
-            
-            # Adicionar registro de salário total
-            if funcionario['salario_total'] > 0:
-                registro_salario = registro_base.copy()
-                registro_salario.update({
-                    'Atributo': 'Salario Total',
-                    'Valor': funcionario['salario_total']
-                })
-                dados_estruturados.append(registro_salario)
-            
-            # Adicionar registros de pagamentos
-            for pagamento in funcionario['pagamentos']:
-                registro_pagamento = registro_base.copy()
-                registro_pagamento.update({
-                    'Atributo': pagamento['tipo'],
-                    'Valor': pagamento['valor']
-                })
-                dados_estruturados.append(registro_pagamento)
+        Usa o Report compactado em memória; no modo streaming (ou com a tabela
+        longa vinda do cache), lê de novo o Report compactado.
         
-        df_estruturado = pd.DataFrame(dados_estruturados)
-        
-        # Aplicar transformações finais (tipos de dados)
-        if not df_estruturado.empty:
-            df_estruturado['Valor'] = pd.to_numeric(df_estruturado['Valor'], errors='coerce').fillna(0)
-            df_estruturado['Adm:'] = pd.to_datetime(df_estruturado['Adm:'], errors='coerce')
-        
-        self.dados_estruturados = df_estruturado
-        self.logger.info(f"Dados estruturados gerados: {len(df_estruturado)} registros")
-        
-        return df_estruturado    
+        Returns:
+            Lista de linhas ({'indice', 'valores', 'textos'}), começando pelo
+            cabeçalho do funcionário; 'textos' usa texto_celula, igual em lote e
+            em streaming
+        """
+        grade = self._buffer_auditoria
+        if grade is None:
+            grade = self.carregar_grade_cache() or self.ler_grade_streaming()
+        
+        intervalos = self.motor.intervalos_funcionarios(*grade)
+        if codigo not in intervalos:
+            raise KeyError(f"Funcionário não encontrado no Report: {codigo}")
+        
+        inicio, fim = intervalos[codigo]
+        indices, valores, offsets = grade
+        primeira = int(np.searchsorted(indices, inicio, side='left'))
+        ultima = int(np.searchsorted(indices, fim, side='right'))
+        
+        linhas = []
+        for i in range(primeira, ultima):
+            itens = valores[offsets[i]:offsets[i + 1]].tolist()
+            linhas.append({
+                'indice': int(indices[i]),
+                'valores': itens,
+                'textos': [texto_celula(item) for item in itens]
+            })
+        return linhas
+    
     def gerar_relatorio_processamento(self) -> Dict:
         """
-        Gera relatório do processamento Fenix
+        Gera relatório do processamento Fenix, com os totais de salário e pagamentos
         """
-        if self.dados_estruturados is None:
-            self.gerar_dados_estruturados()
+        relatorio = super().gerar_relatorio_processamento()
         
-        relatorio = {
-            'timestamp': pd.Timestamp.now().isoformat(),
-            'empresa': 'Fenix',
-            'arquivo_origem': str(self.arquivo_fenix),
-            'funcionarios_processados': len(self.funcionarios),
-            'registros_gerados': len(self.dados_estruturados) if self.dados_estruturados is not None else 0,
-            'total_salarios': 0,
-            'total_pagamentos': 0,
-            'funcionarios_detalhes': {}
-        }
+        df = self.dados_estruturados
+        salarios = (df['Atributo'] == 'Salario Total').to_numpy(dtype=bool)
+        relatorio['total_salarios'] = float(df.loc[salarios, 'Valor'].sum())
+        relatorio['total_pagamentos'] = float(df.loc[~salarios, 'Valor'].sum())
         
-        if self.dados_estruturados is not None and not self.dados_estruturados.empty:
-            # Calcular totais
-            salarios = self.dados_estruturados[self.dados_estruturados['Atributo'] == 'Salario Total']
-            relatorio['total_salarios'] = salarios['Valor'].sum()
-            
-            outros_pagamentos = self.dados_estruturados[self.dados_estruturados['Atributo'] != 'Salario Total']
-            relatorio['total_pagamentos'] = outros_pagamentos['Valor'].sum()
-            
-            # Detalhes por funcionário
-            for codigo, funcionario in self.funcionarios.items():
-                relatorio['funcionarios_detalhes'][codigo] = {
-                    'nome': funcionario['nome'],
-                    'cargo': funcionario['funcao'],
-                    'salario_total': funcionario['salario_total'],
-                    'qtd_pagamentos': len(funcionario['pagamentos'])
-                }
-        
-        return relatorio    
-    def executar_processamento_completo(self) -> Tuple[pd.DataFrame, Dict]:
+        return relatorio
+    
+    def executar_processamento_completo(self, streaming: bool = False) -> Tuple[pd.DataFrame, Dict]:
         """
         Executa o processamento completo da Fenix
         
+        Args:
+            streaming: Processa o Report linha a linha, sem o DataFrame da planilha
+                       nem a grade da auditoria em memória
+        
         Returns:
             Tuple[DataFrame dos dados estruturados, Relatório do processamento]
         """
-        self.logger.info("Iniciando processamento completo da Fenix")
-        
-        try:
-            # 1. Carregar dados brutos
-            self.carregar_dados_brutos()
-            
-            # 2. Processar estrutura
-            self.processar_estrutura_dados()
-            
-            # 3. Gerar dados estruturados
-            df_resultado = self.gerar_dados_estruturados()
-            
-            # 4. Gerar relatório
-            relatorio = self.gerar_relatorio_processamento()
-            
-            self.logger.info("Processamento da Fenix concluído com sucesso")
-            self.logger.info(f"   Funcionários: {relatorio['funcionarios_processados']}")
-            self.logger.info(f"   Registros: {relatorio['registros_gerados']}")
-            self.logger.info(f"   Total Salários: R$ {relatorio['total_salarios']:,.2f}")
-            
-            return df_resultado, relatorio
-            
-        except Exception as e:
-            self.logger.error(f"Erro no processamento da Fenix: {e}")
-            raise
+        self.streaming = streaming
+        df_resultado, relatorio = super().executar_processamento_completo()
+        self.logger.info(f"   Total Salários: R$ {relatorio['total_salarios']:,.2f}")
+        return df_resultado, relatorio
 
 # Função de teste
 def main():
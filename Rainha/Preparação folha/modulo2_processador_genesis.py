@@ -0,0 +1,93 @@
+"""
+MÓDULO 2: PROCESSADOR GENESIS
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo replica a lógica do código M "Genesis.txt" sobre o motor de layouts
+Como no código M, lê o Report da folha "FENIX" (LOJAS padrão: FENIX COML)
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict
+
+from modulo2_motor_layout import ProcessadorLayout
+from modulo2_nucleo import carregar_substituicoes_cpf
+from modulo2_processador_fenix import LAYOUT_FENIX
+
+# Diferenças do Genesis.txt em relação ao Fenix.txt: mais marcadores de fim de
+# seção, Salario Total só para alguns códigos e outra empresa padrão
+LAYOUT_GENESIS = {
+    **LAYOUT_FENIX,
+    "nome": "Genesis",
+    "marcadores": {
+        **LAYOUT_FENIX["marcadores"],
+        "Resumo do Líquido": False, "Base INSS": False, "Ref.:": False
+    },
+    "campos": {
+        **LAYOUT_FENIX["campos"],
+        "LOJAS": {**LAYOUT_FENIX["campos"]["LOJAS"], "padrao": "FENIX COML DE CAMA MESA E BANHO LTDA"}
+    },
+    "atributos": [
+        LAYOUT_FENIX["atributos"][0],
+        {**LAYOUT_FENIX["atributos"][1], "codigos": [
+            "000007", "000070", "000093", "000094", "000100", "000103", "000108", "000106",
+            "000109", "000142", "000152", "000155", "000156", "000157", "000158", "000159"
+        ]},
+        LAYOUT_FENIX["atributos"][2]
+    ]
+}
+
+class ProcessadorGenesis(ProcessadorLayout):
+    """
+    Classe responsável por processar dados da empresa Genesis
+    Replica a lógica do arquivo Genesis.txt (Power Query M)
+    """
+
+    def carregar_config_padrao(self) -> Dict:
+        """Carrega configurações padrão baseadas no código M"""
+        return {
+            "layout": LAYOUT_GENESIS,
+            # Mapeamento compartilhado (config_sistema.json) com os códigos do Genesis.txt
+            "substituicoes_cpf": carregar_substituicoes_cpf({
+                "12666986766": "000160",
+                "10897706606": "000161",
+                "12728617769": "000109"
+            }),
+            "colunas_cpf": [0],
+            "funcionarios_excluidos": []
+        }
+
+# Função de teste
+def main():
+    """Função principal para testar o processador"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("MÓDULO 2: PROCESSADOR GENESIS")
+    print("=" * 50)
+
+    arquivo = Path(__file__).parent / "Base de Dados" / "FOLHA DE PAGAMENTO 052025 EXCEL fenix.xlsx"
+
+    if not arquivo.exists():
+        print(f"Arquivo não encontrado: {arquivo}")
+        return False
+
+    try:
+        df_resultado, relatorio = ProcessadorGenesis(arquivo).executar_processamento_completo()
+
+        print("\nRESULTADOS:")
+        print(f"   Funcionários processados: {relatorio['funcionarios_processados']}")
+        print(f"   Registros gerados: {relatorio['registros_gerados']}")
+        print(f"   Valores não reconhecidos: {len(relatorio['valores_invalidos'])}")
+
+        if not df_resultado.empty:
+            print("\nAMOSTRA DOS DADOS (primeiros 5 registros):")
+            print(df_resultado.head().to_string(index=False))
+
+        return True
+
+    except Exception as e:
+        print(f"Erro durante o teste: {e}")
+        return False
+
+if __name__ == "__main__":
+    main()
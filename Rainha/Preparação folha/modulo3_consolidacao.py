@@ -0,0 +1,198 @@
+"""
+MÓDULO 3: CONSOLIDAÇÃO DA FOLHA AGRUPADA
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo replica a lógica do código M "Folha Agrupada.txt":
+1. Table.Combine das tabelas longas (Extrato Mensal, Fenix, Genesis)
+2. Seleção das colunas LOJAS, Nome, Cargo, Adm:, Situação, Atributo, Valor,
+   mais Empregador e Codigo, que identificam o funcionário (comparação entre
+   competências); o Codigo só é único dentro do Empregador no Extrato
+3. Exclusão das rubricas que não entram na folha (lista de <> do código M)
+4. Text.Trim em Nome
+
+As colunas de texto são unidas como categorias; a exclusão é calculada uma
+vez sobre as categorias de Atributo e aplicada às linhas pelos códigos.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from pandas.api.types import union_categoricals
+
+# Colunas da Folha Agrupada (Table.SelectColumns do código M)
+COLUNAS_FOLHA_AGRUPADA = ["LOJAS", "Nome", "Cargo", "Adm:", "Situação", "Atributo", "Valor"]
+
+# Identificação do funcionário levada ao fim da Folha Agrupada (ausente no código M)
+COLUNAS_IDENTIFICACAO = ["Empregador", "Codigo"]
+
+# Colunas de texto unidas como categoria
+COLUNAS_CATEGORIA = ["LOJAS", "Nome", "Cargo", "Situação", "Atributo", "Empregador", "Codigo"]
+
+# Rubricas excluídas pelo filtro "Linhas Filtradas" (comparação exata, como o <> do M)
+ATRIBUTOS_EXCLUIDOS = [
+    "1/3 DAS FERIAS", "1/3 FERIAS INDENIZADAS RESC", "1/3 FERIAS PROPORCIONAIS RESCISAO",
+    "1/3 FERIAS RESCISAO ", "13 SALARIO INTEGRAL RESCISAO", "13o 1/12 INDENIZADO",
+    "Adiantamento", "ADIANTAMENTO DE FERIAS", "AFAST.P/ACID.TRABALHO", "AVISO PREVIO",
+    "AVISO PREVIO ESPECIAL CCT", "FERIAS 1/12 INDENIZADO", "FERIAS PROPORCIONAIS",
+    "FERIAS VENCIDAS", "I.N.S.S.", "INSS 13 SAL.RESCISAO", "INSS DIF FER DESC A MAIOR",
+    "INSS DIFERENCA FERIAS", "INSS EMPREGADOR", "INSS FERIAS", "INSS Folha",
+    "INSS SOBRE RESCISAO", "IRRF EMPREGADOR", "IRRF FERIAS"
+]
+
+class ConsolidadorFolha:
+    """
+    Classe responsável por montar a Folha Agrupada
+    Replica a lógica do arquivo Folha Agrupada.txt (Power Query M)
+    """
+
+    def __init__(self, config: Dict = None):
+        """
+        Inicializa o consolidador
+
+        Args:
+            config: Configurações (colunas, colunas_identificacao, atributos_excluidos)
+        """
+        self.config = config or self.carregar_config_padrao()
+        self.logger = logging.getLogger('ConsolidadorFolha')
+
+    def carregar_config_padrao(self) -> Dict:
+        """Carrega configurações padrão baseadas no código M"""
+        return {
+            "colunas": list(COLUNAS_FOLHA_AGRUPADA),
+            "colunas_identificacao": list(COLUNAS_IDENTIFICACAO),
+            "atributos_excluidos": list(ATRIBUTOS_EXCLUIDOS)
+        }
+
+    def _unir_coluna(self, partes: List[pd.Series], coluna: str) -> pd.Series:
+        """Une uma coluna das tabelas; texto vira uma única categoria"""
+        if coluna in COLUNAS_CATEGORIA:
+            categorias = []
+            for parte in partes:
+                if not isinstance(parte.dtype, pd.CategoricalDtype):
+                    parte = parte.astype(object).where(parte.notna(), None).astype("category")
+                valores = parte.cat.remove_unused_categories().values
+                # Categorias em object: str, object e vazias (float) se unem sem erro de dtype
+                categorias.append(pd.Categorical.from_codes(
+                    valores.codes, categories=pd.Index(valores.categories.astype(str), dtype=object)
+                ))
+            return pd.Series(union_categoricals(categorias, ignore_order=True), name=coluna)
+        if coluna == "Adm:":
+            partes = [pd.to_datetime(parte, errors='coerce', dayfirst=True) for parte in partes]
+        return pd.concat(partes, ignore_index=True).rename(coluna)
+
+    def _aparar_categoria(self, serie: pd.Series) -> pd.Series:
+        """Text.Trim aplicado às categorias distintas, não linha a linha"""
+        categorias = serie.cat.categories
+        aparadas = pd.Index(categorias.astype(str).str.strip())
+        if aparadas.equals(categorias):
+            return serie
+        codigos = aparadas.unique().get_indexer(aparadas)
+        novos = np.where(serie.cat.codes.to_numpy() >= 0, codigos[serie.cat.codes.to_numpy()], -1)
+        return pd.Series(pd.Categorical.from_codes(novos, categories=aparadas.unique()), name=serie.name)
+
+    def consolidar(self, tabelas: Union[Dict[str, pd.DataFrame], List[pd.DataFrame]],
+                   coluna_origem: Optional[str] = None) -> pd.DataFrame:
+        """
+        Monta a Folha Agrupada
+
+        Args:
+            tabelas: Tabelas longas na ordem do Table.Combine (Extrato Mensal,
+                     Fenix, Genesis); com Dict, a chave identifica a origem
+            coluna_origem: Acrescenta ao fim uma coluna com a chave de cada tabela
+
+        Returns:
+            DataFrame com as colunas da Folha Agrupada, as de identificação e
+            coluna_origem
+        """
+        if isinstance(tabelas, dict):
+            origens = {nome: df for nome, df in tabelas.items() if df is not None}
+        else:
+            origens = {i: df for i, df in enumerate(tabelas) if df is not None}
+
+        colunas = self.config["colunas"] + self.config.get("colunas_identificacao", [])
+        tamanhos = [len(df) for df in origens.values()]
+
+        # 1. Table.Combine + SelectColumns (colunas ausentes ficam nulas)
+        dados = {}
+        for coluna in colunas:
+            partes = [
+                df[coluna].reset_index(drop=True) if coluna in df.columns
+                else pd.Series([None] * len(df), dtype=object)
+                for df in origens.values()
+            ]
+            dados[coluna] = self._unir_coluna(partes, coluna) if partes else pd.Series([], dtype=object)
+        df = pd.DataFrame(dados, columns=colunas)
+
+        if coluna_origem is not None:
+            df[coluna_origem] = pd.Categorical(np.repeat(list(origens), tamanhos) if origens else [])
+
+        # 2. Filtro de Atributo: máscara sobre as categorias, aplicada pelos códigos
+        #    (nulo passa, como null <> "x" no M)
+        if "Atributo" in df.columns:
+            atributo = df["Atributo"]
+            excluida = atributo.cat.categories.isin(self.config["atributos_excluidos"])
+            codigos = atributo.cat.codes.to_numpy()
+            manter = (codigos < 0) | ~excluida[np.maximum(codigos, 0)]
+            df = df[manter].reset_index(drop=True)
+            df["Atributo"] = df["Atributo"].cat.remove_unused_categories()
+
+        # 3. Text.Trim em Nome
+        if "Nome" in df.columns:
+            df["Nome"] = self._aparar_categoria(df["Nome"])
+
+        self.logger.info(
+            f"Folha Agrupada: {len(df)} registros de {sum(tamanhos)} "
+            f"({sum(tamanhos) - len(df)} rubricas excluídas)"
+        )
+        return df
+
+# Função de teste
+def main():
+    """Função principal para testar a consolidação"""
+    import time
+    from modulo2_carregadores import carregar_extrato, carregar_folha_fenix, carregar_folha_genesis
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("MÓDULO 3: CONSOLIDAÇÃO DA FOLHA AGRUPADA")
+    print("=" * 50)
+
+    pasta = Path(__file__).parent / "Base de Dados"
+    arquivos = {
+        "Extrato Mensal": pasta / "Extrato Mensal.xlsx",
+        # Como nos códigos M, a consulta Fenix lê a folha GENESIS e vice-versa
+        "Fenix": pasta / "FOLHA GENESIS EXCEL 052025.xlsx",
+        "Genesis": pasta / "FOLHA DE PAGAMENTO 052025 EXCEL fenix.xlsx"
+    }
+    faltantes = [str(arquivo) for arquivo in arquivos.values() if not arquivo.exists()]
+    if faltantes:
+        print(f"Arquivos não encontrados: {faltantes}")
+        return False
+
+    try:
+        tabelas = {
+            "Extrato Mensal": carregar_extrato(arquivos["Extrato Mensal"]),
+            "Fenix": carregar_folha_genesis(arquivos["Fenix"]),
+            "Genesis": carregar_folha_fenix(arquivos["Genesis"])
+        }
+
+        inicio = time.perf_counter()
+        df = ConsolidadorFolha().consolidar(tabelas, coluna_origem="Origem")
+        duracao = time.perf_counter() - inicio
+
+        print("\nRESULTADOS:")
+        print(f"   Registros: {len(df)}")
+        print(f"   Por origem: {df['Origem'].value_counts(sort=False).to_dict()}")
+        print(f"   Tempo de consolidação: {duracao * 1000:.1f} ms")
+        print("\nAMOSTRA DOS DADOS (primeiros 5 registros):")
+        print(df.head().to_string(index=False))
+        return True
+
+    except Exception as e:
+        print(f"Erro durante o teste: {e}")
+        return False
+
+if __name__ == "__main__":
+    main()
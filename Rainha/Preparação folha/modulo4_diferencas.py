@@ -0,0 +1,181 @@
+"""
+MÓDULO 4 (DIFERENÇAS): COMPARAÇÃO DA FOLHA COM A COMPETÊNCIA ANTERIOR
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Comparar a tabela longa do mês com a da competência anterior
+   (junção por hash nas chaves, por padrão Codigo + Atributo)
+2. Emitir apenas as rubricas novas, removidas e alteradas, com o delta
+3. Buscar a competência anterior no histórico (modulo4_historico)
+
+A revisão e a reexportação passam a depender do volume de mudanças, não do
+número de funcionários.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from modulo4_historico import HistoricoFolha
+
+# Chaves da comparação para as tabelas dos processadores (ConstrutorTabelaLonga)
+CHAVES_PADRAO = ["Codigo", "Atributo"]
+
+# Folha Agrupada: Codigo levado pela consolidação; no Extrato ele só é único
+# dentro do Empregador (empresa da página)
+CHAVES_FOLHA_AGRUPADA = ["Empresa", "Empregador", "Codigo", "Atributo"]
+
+# Coluna com o tipo de cada diferença (novo, removido, alterado)
+COLUNA_TIPO = "Tipo Alteração"
+
+class DiferencaFolha:
+    """
+    Classe responsável por comparar duas competências da folha
+    """
+
+    def __init__(self, chaves: List[str] = None, tolerancia: float = 0.005):
+        """
+        Inicializa o comparador
+
+        Args:
+            chaves: Colunas que identificam a rubrica do funcionário
+            tolerancia: Diferença de Valor abaixo da qual a rubrica é considerada igual
+        """
+        self.chaves = list(chaves or CHAVES_PADRAO)
+        self.tolerancia = tolerancia
+        self.logger = logging.getLogger('DiferencaFolha')
+
+    def _agregar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Uma linha por chave (rubricas repetidas somadas)
+
+        As chaves viram texto para que categorias diferentes entre os meses
+        não impeçam a junção.
+        """
+        faltantes = [coluna for coluna in self.chaves + ['Valor'] if coluna not in df.columns]
+        if faltantes:
+            raise KeyError(f"Colunas ausentes para a comparação: {faltantes}")
+
+        chaves = {coluna: df[coluna].astype(object).where(df[coluna].notna(), None) for coluna in self.chaves}
+        base = pd.DataFrame({**chaves, 'Valor': pd.to_numeric(df['Valor'], errors='coerce')})
+        return base.groupby(self.chaves, dropna=False, sort=False)['Valor'].sum(min_count=1).reset_index()
+
+    def comparar(self, atual: pd.DataFrame, anterior: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compara a competência atual com a anterior
+
+        Args:
+            atual: Tabela longa do mês
+            anterior: Tabela longa da competência anterior
+
+        Returns:
+            DataFrame com as chaves, Tipo Alteração (novo, removido, alterado),
+            Valor Anterior, Valor Atual e Delta; rubricas iguais não aparecem
+        """
+        juncao = self._agregar(anterior).merge(
+            self._agregar(atual), on=self.chaves, how='outer',
+            suffixes=(' Anterior', ' Atual'), indicator=True, sort=False
+        )
+
+        valor_anterior = juncao['Valor Anterior'].to_numpy(dtype=float)
+        valor_atual = juncao['Valor Atual'].to_numpy(dtype=float)
+        origem = juncao.pop('_merge').to_numpy()
+
+        # Alterado: diferença acima da tolerância ou valor que passou a/deixou de ser reconhecido
+        ambos_nulos = np.isnan(valor_anterior) & np.isnan(valor_atual)
+        um_nulo = np.isnan(valor_anterior) ^ np.isnan(valor_atual)
+        with np.errstate(invalid='ignore'):
+            diferente = um_nulo | (np.abs(valor_atual - valor_anterior) > self.tolerancia)
+
+        situacao = np.select(
+            [origem == 'right_only', origem == 'left_only', (origem == 'both') & diferente & ~ambos_nulos],
+            ['novo', 'removido', 'alterado'], default=''
+        )
+        manter = situacao != ''
+
+        resultado = juncao[manter].reset_index(drop=True)
+        resultado.insert(len(self.chaves), COLUNA_TIPO, pd.Categorical(
+            situacao[manter], categories=['novo', 'removido', 'alterado']
+        ))
+        resultado['Delta'] = np.nan_to_num(valor_atual[manter]) - np.nan_to_num(valor_anterior[manter])
+
+        resumo = self.resumir(resultado)
+        self.logger.info(
+            f"Diferenças: {resumo['novo']} novas, {resumo['removido']} removidas, "
+            f"{resumo['alterado']} alteradas (de {len(juncao)} rubricas)"
+        )
+        return resultado
+
+    def resumir(self, diferencas: pd.DataFrame) -> Dict:
+        """Contagem por tipo de alteração e soma dos deltas"""
+        contagem = diferencas[COLUNA_TIPO].value_counts()
+        return {
+            'novo': int(contagem.get('novo', 0)),
+            'removido': int(contagem.get('removido', 0)),
+            'alterado': int(contagem.get('alterado', 0)),
+            'delta_total': float(diferencas['Delta'].sum())
+        }
+
+    def comparar_com_historico(self, atual: pd.DataFrame, historico: HistoricoFolha,
+                               competencia: str) -> Optional[pd.DataFrame]:
+        """
+        Compara com a competência imediatamente anterior existente no histórico
+
+        Returns:
+            DataFrame de diferenças ou None se não houver competência anterior
+            (ou se ela foi gravada sem as colunas das chaves)
+        """
+        anteriores = [valor for valor in historico.competencias() if valor < competencia]
+        if not anteriores:
+            self.logger.info(f"Sem competência anterior a {competencia} no histórico")
+            return None
+
+        colunas = [coluna for coluna in self.chaves + ['Valor'] if coluna not in ('Competência', 'Empresa')]
+        faltantes = sorted(set(colunas) - set(historico.colunas(anteriores[-1], anteriores[-1])))
+        if faltantes:
+            self.logger.warning(f"Competência {anteriores[-1]} sem as colunas {faltantes} no histórico: comparação ignorada")
+            return None
+        anterior = historico.consultar(colunas=colunas, inicio=anteriores[-1], fim=anteriores[-1])
+        self.logger.info(f"Comparando {competencia} com {anteriores[-1]}")
+        return self.comparar(atual, anterior)
+
+# Função de teste
+def main():
+    """Função principal para testar a comparação"""
+    import time
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("MÓDULO 4: DIFERENÇAS ENTRE COMPETÊNCIAS")
+    print("=" * 50)
+
+    # 2.000 funcionários com 8 rubricas; no mês seguinte poucas mudanças
+    rng = np.random.default_rng(0)
+    codigos = [f"{i:06d}" for i in range(2000)]
+    rubricas = ["Salario Total", "INSS Folha", "IRRF Folha", "Vale Transporte",
+                "Adiantamento", "Quebra de Caixa", "Trienio 5%", "Férias"]
+    anterior = pd.DataFrame({
+        'Codigo': np.repeat(codigos, len(rubricas)),
+        'Atributo': np.tile(rubricas, len(codigos)),
+        'Valor': rng.uniform(100, 3000, len(codigos) * len(rubricas)).round(2)
+    })
+    atual = anterior.iloc[len(rubricas):].copy()
+    atual.loc[atual.sample(50, random_state=0).index, 'Valor'] += 10
+    atual = pd.concat([atual, pd.DataFrame({'Codigo': ["009999"], 'Atributo': ["Salario Total"], 'Valor': [1518.0]})])
+
+    inicio = time.perf_counter()
+    comparador = DiferencaFolha()
+    diferencas = comparador.comparar(atual, anterior)
+    duracao = time.perf_counter() - inicio
+
+    print("\nRESULTADOS:")
+    print(f"   Rubricas comparadas: {len(anterior)} x {len(atual)}")
+    print(f"   Resumo: {comparador.resumir(diferencas)}")
+    print(f"   Tempo: {duracao * 1000:.0f} ms")
+    print("\nAMOSTRA DAS DIFERENÇAS:")
+    print(diferencas.head().to_string(index=False))
+    return True
+
+if __name__ == "__main__":
+    main()
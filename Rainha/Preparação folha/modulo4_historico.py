@@ -0,0 +1,279 @@
+"""
+MÓDULO 4: HISTÓRICO DA FOLHA POR COMPETÊNCIA
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Acrescentar a Folha Agrupada de cada mês a um histórico em Parquet,
+   particionado por competência e empresa
+2. Consultar o histórico por funcionário, rubrica e período lendo apenas as
+   partições e colunas necessárias
+
+Estrutura em disco (append-only: nenhum lote é reescrito):
+    historico/competencia=2025-05/empresa=Fenix/lote-20250605T101500123456.parquet
+    historico/competencia=2025-05/lote_atual.json
+
+Reprocessar uma competência grava um novo lote e troca o lote_atual.json da
+competência (lote e empresas gravadas); as consultas usam apenas as partições
+desse lote, de modo que uma empresa ausente no reprocessamento deixa de
+aparecer. Competências gravadas sem o manifesto usam o lote mais recente de
+cada partição.
+"""
+
+import re
+import json
+import os
+import logging
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, unquote
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modulo2_cache import PARQUET_DISPONIVEL
+
+if PARQUET_DISPONIVEL:
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+# Competência no formato AAAA-MM
+PADRAO_COMPETENCIA = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+# Manifesto da última gravação de cada competência
+ARQUIVO_LOTE_ATUAL = "lote_atual.json"
+
+def _valor_particao(pasta: Path, campo: str) -> Optional[str]:
+    """Valor de uma pasta "campo=valor" (None se a pasta não for dessa partição)"""
+    prefixo = f"{campo}="
+    return unquote(pasta.name[len(prefixo):]) if pasta.is_dir() and pasta.name.startswith(prefixo) else None
+
+class HistoricoFolha:
+    """
+    Histórico append-only da Folha Agrupada em Parquet particionado
+    (competência / empresa)
+    """
+
+    def __init__(self, pasta_historico: Path):
+        """
+        Inicializa o histórico
+
+        Args:
+            pasta_historico: Pasta raiz do histórico (criada sob demanda)
+        """
+        self.pasta_historico = Path(pasta_historico)
+        self.logger = logging.getLogger('HistoricoFolha')
+        self.ativo = PARQUET_DISPONIVEL
+        if not self.ativo:
+            self.logger.warning("pyarrow não instalado: histórico Parquet desativado")
+
+    def gravar(self, df: pd.DataFrame, competencia: str, coluna_empresa: str = 'Empresa') -> List[Path]:
+        """
+        Acrescenta a folha de uma competência ao histórico (um lote por empresa)
+
+        Args:
+            df: Folha Agrupada do mês
+            competencia: Competência no formato AAAA-MM
+            coluna_empresa: Coluna que define a partição de empresa
+
+        Returns:
+            Lista dos arquivos gravados
+        """
+        if not PADRAO_COMPETENCIA.match(competencia):
+            raise ValueError(f"Competência inválida (esperado AAAA-MM): {competencia}")
+        if not self.ativo:
+            return []
+
+        lote = f"lote-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.parquet"
+        pasta_competencia = self.pasta_historico / f"competencia={competencia}"
+        gravados, empresas = [], []
+        for empresa, df_empresa in df.groupby(coluna_empresa, observed=True, sort=False):
+            pasta = pasta_competencia / f"empresa={quote(str(empresa), safe='')}"
+            pasta.mkdir(parents=True, exist_ok=True)
+
+            temporario = pasta / (lote + ".tmp")
+            df_empresa.drop(columns=[coluna_empresa]).to_parquet(temporario, index=False)
+            temporario.replace(pasta / lote)
+            gravados.append(pasta / lote)
+            empresas.append(str(empresa))
+
+        # O manifesto é trocado só depois de todas as partições gravadas
+        pasta_competencia.mkdir(parents=True, exist_ok=True)
+        temporario = pasta_competencia / (ARQUIVO_LOTE_ATUAL + ".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"lote": lote, "empresas": empresas}, f, ensure_ascii=False)
+        os.replace(temporario, pasta_competencia / ARQUIVO_LOTE_ATUAL)
+
+        self.logger.info(f"Histórico {competencia}: {len(df)} registros em {len(gravados)} partições")
+        return gravados
+
+    def competencias(self) -> List[str]:
+        """Competências disponíveis no histórico, em ordem"""
+        if not self.pasta_historico.exists():
+            return []
+        valores = (_valor_particao(pasta, "competencia") for pasta in self.pasta_historico.iterdir())
+        return sorted(valor for valor in valores if valor is not None)
+
+    def lote_atual(self, competencia: str) -> Optional[Dict]:
+        """Manifesto da última gravação da competência ({"lote", "empresas"}) ou None"""
+        arquivo = self.pasta_historico / f"competencia={competencia}" / ARQUIVO_LOTE_ATUAL
+        if not arquivo.exists():
+            return None
+        with open(arquivo, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _particoes(self, inicio: Optional[str], fim: Optional[str],
+                   empresas: Optional[Iterable[str]]) -> List[Tuple[str, str, Path]]:
+        """
+        Poda de partições: lista só as pastas do período e das empresas pedidas
+
+        Returns:
+            Lista (competência, empresa, arquivo do lote atual da competência)
+        """
+        empresas = set(empresas) if empresas is not None else None
+        particoes = []
+        for competencia in self.competencias():
+            if (inicio and competencia < inicio) or (fim and competencia > fim):
+                continue
+            pasta_competencia = self.pasta_historico / f"competencia={competencia}"
+            manifesto = self.lote_atual(competencia)
+            if manifesto is not None:
+                # Só as empresas da última gravação, no lote dela
+                for empresa in sorted(manifesto["empresas"]):
+                    if empresas is not None and empresa not in empresas:
+                        continue
+                    arquivo = pasta_competencia / f"empresa={quote(empresa, safe='')}" / manifesto["lote"]
+                    if arquivo.exists():
+                        particoes.append((competencia, empresa, arquivo))
+                    else:
+                        self.logger.warning(f"Lote do manifesto ausente: {arquivo}")
+                continue
+
+            for pasta in sorted(pasta_competencia.iterdir()):
+                empresa = _valor_particao(pasta, "empresa")
+                if empresa is None or (empresas is not None and empresa not in empresas):
+                    continue
+                lotes = sorted(pasta.glob("lote-*.parquet"))
+                if lotes:
+                    particoes.append((competencia, empresa, lotes[-1]))
+        return particoes
+
+    def colunas(self, inicio: Optional[str] = None, fim: Optional[str] = None,
+                empresas: Optional[Iterable[str]] = None) -> List[str]:
+        """Colunas presentes em todos os lotes do período (lê só o esquema dos arquivos)"""
+        if not self.ativo:
+            return []
+        esquemas = [pq.read_schema(arquivo).names for _, _, arquivo in self._particoes(inicio, fim, empresas)]
+        if not esquemas:
+            return []
+        comuns = set(esquemas[0]).intersection(*esquemas[1:])
+        return [coluna for coluna in esquemas[0] if coluna in comuns]
+
+    def consultar(self, colunas: Optional[List[str]] = None, inicio: Optional[str] = None,
+                  fim: Optional[str] = None, empresas: Optional[Iterable[str]] = None,
+                  nomes: Optional[Iterable[str]] = None,
+                  atributos: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Consulta o histórico
+
+        Args:
+            colunas: Colunas lidas dos arquivos (None: todas)
+            inicio, fim: Período AAAA-MM (inclusivo)
+            empresas: Empresas consultadas (None: todas)
+            nomes: Filtra por Nome
+            atributos: Filtra por Atributo
+
+        Returns:
+            DataFrame com Competência e Empresa seguidas das colunas pedidas
+        """
+        if not self.ativo:
+            return pd.DataFrame()
+
+        particoes = self._particoes(inicio, fim, empresas)
+        if not particoes:
+            return pd.DataFrame(columns=['Competência', 'Empresa'] + list(colunas or []))
+
+        # Uma única varredura sobre os lotes selecionados; competência e empresa
+        # vêm do caminho (partição hive)
+        dataset = ds.dataset(
+            [str(arquivo) for _, _, arquivo in particoes], format="parquet",
+            partitioning="hive", partition_base_dir=str(self.pasta_historico)
+        )
+        filtro = None
+        for coluna, valores in (("Nome", nomes), ("Atributo", atributos)):
+            if valores is not None:
+                condicao = ds.field(coluna).isin(list(valores))
+                filtro = condicao if filtro is None else filtro & condicao
+
+        if colunas is None:
+            colunas = [nome for nome in dataset.schema.names if nome not in ("competencia", "empresa")]
+        tabela = dataset.to_table(columns=["competencia", "empresa"] + list(colunas), filter=filtro)
+
+        # O pyarrow já decodifica os valores das partições (quote em gravar)
+        return tabela.to_pandas().rename(columns={"competencia": "Competência", "empresa": "Empresa"})
+
+    def por_funcionario(self, nome: str, **filtros) -> pd.DataFrame:
+        """Todas as rubricas de um funcionário no período"""
+        return self.consultar(nomes=[nome], **filtros)
+
+    def por_atributo(self, atributo: str, **filtros) -> pd.DataFrame:
+        """Uma rubrica (ex: "Salário:") de todos os funcionários no período"""
+        return self.consultar(atributos=[atributo], **filtros)
+
+    def por_periodo(self, inicio: str, fim: str, **filtros) -> pd.DataFrame:
+        """Folha completa das competências entre inicio e fim"""
+        return self.consultar(inicio=inicio, fim=fim, **filtros)
+
+    def totais_por_competencia(self, **filtros) -> pd.DataFrame:
+        """Soma de Valor por competência, empresa e rubrica (lendo só Atributo e Valor)"""
+        df = self.consultar(colunas=["Atributo", "Valor"], **filtros)
+        if df.empty:
+            return df
+        return df.groupby(['Competência', 'Empresa', 'Atributo'], observed=True, sort=True)['Valor'].sum().reset_index()
+
+# Função de teste
+def main():
+    """Função principal para testar o histórico"""
+    import time
+    import tempfile
+    import numpy as np
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("MÓDULO 4: HISTÓRICO DA FOLHA POR COMPETÊNCIA")
+    print("=" * 50)
+
+    if not PARQUET_DISPONIVEL:
+        print("pyarrow não instalado")
+        return False
+
+    # 24 competências sintéticas de 3 empresas com 150 funcionários e 5 rubricas
+    rubricas = ["Salário:", "I.N.S.S.", "VALE TRANSPORTE", "QUEBRA DE CAIXA", "TRIENIO"]
+    nomes = [f"FUNCIONARIO {i:03d}" for i in range(150)]
+    base = pd.DataFrame({
+        'Nome': np.repeat(nomes, len(rubricas)),
+        'Atributo': np.tile(rubricas, len(nomes)),
+        'Valor': np.random.default_rng(0).uniform(100, 3000, len(nomes) * len(rubricas)).round(2)
+    })
+
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoFolha(Path(pasta))
+        logging.getLogger('HistoricoFolha').setLevel(logging.WARNING)
+        for mes in range(24):
+            competencia = f"{2024 + mes // 12}-{mes % 12 + 1:02d}"
+            df = pd.concat([base.assign(Empresa=empresa) for empresa in ["Extrato", "Fenix", "Genesis"]])
+            historico.gravar(df, competencia)
+
+        inicio = time.perf_counter()
+        df_funcionario = historico.por_funcionario("FUNCIONARIO 042")
+        df_salarios = historico.por_atributo("Salário:", inicio="2025-01", colunas=["Nome", "Atributo", "Valor"])
+        duracao = time.perf_counter() - inicio
+
+        print("\nRESULTADOS:")
+        print(f"   Competências: {len(historico.competencias())}")
+        print(f"   Registros do funcionário: {len(df_funcionario)}")
+        print(f"   Salários em 2025: {len(df_salarios)}")
+        print(f"   Tempo das consultas: {duracao * 1000:.0f} ms")
+
+    return True
+
+if __name__ == "__main__":
+    main()
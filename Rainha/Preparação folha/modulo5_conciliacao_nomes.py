@@ -0,0 +1,538 @@
+"""
+MÓDULO 5: CONCILIAÇÃO DE NOMES DE FUNCIONÁRIOS
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Normalizar os nomes uma única vez (acentos, caixa, espaços e sufixos de
+   data como " - 26/09" da Folha não contábil)
+2. Montar um índice de blocos por prefixo e chave fonética de cada palavra
+   do nome, para comparar só pares candidatos (não n × m)
+3. Calcular o Jaro-Winkler (algoritmo completo, vetorizado com NumPy) dos
+   pares candidatos
+4. Separar os nomes em conciliados, ambíguos e sem correspondência, com score
+
+Substitui a similaridade simplificada por palavras da conciliação das
+Alocações (conciliacao.js) e o casamento por Text.Trim dos códigos M
+(Base de Nomes.txt, Pagamentos.txt).
+"""
+
+import re
+import logging
+import unicodedata
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Sufixo de data após o nome (ex: "VALERIA BATISTA DOS SANTOS - 26/09")
+PADRAO_SUFIXO_DATA = re.compile(r"\s*-\s*\d{1,2}/\d{1,2}(/\d{2,4})?\s*$")
+PADRAO_NAO_LETRA = re.compile(r"[^A-Z ]+")
+
+# Palavras que não identificam o nome (não geram blocos)
+PARTICULAS = {"DA", "DAS", "DE", "DO", "DOS", "E"}
+
+# Regras fonéticas simplificadas para nomes em português (aplicadas em ordem)
+REGRAS_FONETICAS = [
+    (re.compile(r"PH"), "F"), (re.compile(r"TH"), "T"), (re.compile(r"SCH|SH|CH"), "X"),
+    (re.compile(r"LH"), "L"), (re.compile(r"NH"), "N"),
+    (re.compile(r"C(?=[EI]|AO$)"), "S"), (re.compile(r"G(?=[EI])"), "J"),
+    (re.compile(r"QU"), "K"), (re.compile(r"GU(?=[EI])"), "G"), (re.compile(r"[CQK]"), "K"),
+    (re.compile(r"Z"), "S"), (re.compile(r"Y"), "I"), (re.compile(r"W"), "V"),
+    (re.compile(r"(?<=.)H"), ""), (re.compile(r"^H"), ""), (re.compile(r"(.)\1+"), r"\1"),
+    (re.compile(r"M$"), "N")
+]
+PADRAO_VOGAL = re.compile(r"[AEIOU]")
+
+def normalizar_nome(nome) -> str:
+    """Nome em maiúsculas, sem acentos, sem sufixo de data e com espaços simples"""
+    if nome is None or (isinstance(nome, float) and np.isnan(nome)):
+        return ""
+    texto = PADRAO_SUFIXO_DATA.sub("", str(nome))
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii").upper()
+    return " ".join(PADRAO_NAO_LETRA.sub(" ", texto).split())
+
+def normalizar_nomes(nomes: Iterable) -> np.ndarray:
+    """Normaliza uma coluna de nomes calculando cada nome distinto uma vez"""
+    serie = pd.Series(list(nomes), dtype=object)
+    distintos = serie.drop_duplicates()
+    mapa = {valor: normalizar_nome(valor) for valor in distintos if valor is not None and valor == valor}
+    return np.array([mapa.get(valor, "") if valor is not None and valor == valor else "" for valor in serie], dtype=object)
+
+@lru_cache(maxsize=None)
+def chave_fonetica(palavra: str) -> str:
+    """Chave fonética de uma palavra: primeira letra + consoantes após as regras"""
+    for padrao, substituto in REGRAS_FONETICAS:
+        palavra = padrao.sub(substituto, palavra)
+    return palavra[:1] + PADRAO_VOGAL.sub("", palavra[1:]) if palavra else ""
+
+def _codificar(nomes: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Nomes em matriz de códigos Unicode (preenchida com 0) e comprimentos"""
+    comprimentos = np.fromiter((len(nome) for nome in nomes), dtype=np.int32, count=len(nomes))
+    largura = max(int(comprimentos.max()) if len(nomes) else 0, 1)
+    matriz = np.zeros((len(nomes), largura), dtype=np.uint32)
+    if len(nomes):
+        texto = np.array(nomes, dtype=f"<U{largura}")
+        matriz[:] = texto.view(np.uint32).reshape(len(nomes), largura)
+    return matriz, comprimentos
+
+def _histograma(codigos: np.ndarray, comprimentos: np.ndarray) -> np.ndarray:
+    """Contagem de cada letra (A-Z) e do espaço por nome normalizado"""
+    histograma = np.zeros((len(codigos), 27), dtype=np.int16)
+    validos = np.arange(codigos.shape[1])[None, :] < comprimentos[:, None]
+    letras = np.where(codigos == 32, 26, codigos.astype(np.int64) - 65)
+    linhas, colunas = np.nonzero(validos)
+    np.add.at(histograma, (linhas, letras[linhas, colunas]), 1)
+    return histograma
+
+def _prefixo_comum(codigos_a: np.ndarray, comprimentos_a: np.ndarray,
+                   codigos_b: np.ndarray, comprimentos_b: np.ndarray) -> np.ndarray:
+    """Tamanho do prefixo comum de cada par (até 4 caracteres)"""
+    limite = min(4, codigos_a.shape[1], codigos_b.shape[1])
+    iguais = codigos_a[:, :limite] == codigos_b[:, :limite]
+    iguais &= np.arange(limite)[None, :] < np.minimum(comprimentos_a, comprimentos_b)[:, None]
+    return np.cumprod(iguais, axis=1).sum(axis=1)
+
+def limite_jaro_winkler(histograma_a: np.ndarray, comprimentos_a: np.ndarray,
+                        histograma_b: np.ndarray, comprimentos_b: np.ndarray,
+                        prefixo: np.ndarray, peso_prefixo: float = 0.1) -> np.ndarray:
+    """
+    Limite superior do Jaro-Winkler de cada par, sem o laço de casamento
+
+    Os caracteres casados não passam das letras em comum (histogramas) e as
+    transposições são no mínimo zero.
+    """
+    casados = np.minimum(histograma_a, histograma_b).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jaro = np.where(
+            casados > 0,
+            (casados / np.maximum(comprimentos_a, 1) + casados / np.maximum(comprimentos_b, 1) + 1.0) / 3.0,
+            0.0
+        )
+    return jaro + prefixo * peso_prefixo * (1.0 - jaro)
+
+def jaro_winkler_pares(codigos_a: np.ndarray, comprimentos_a: np.ndarray,
+                       codigos_b: np.ndarray, comprimentos_b: np.ndarray,
+                       peso_prefixo: float = 0.1) -> np.ndarray:
+    """
+    Jaro-Winkler de cada par (linha i de a com linha i de b)
+
+    Mesmo resultado do algoritmo clássico: cada caractere de a casa com o
+    primeiro caractere igual e livre de b dentro da janela; o laço percorre
+    as posições de a e é vetorizado sobre todos os pares.
+
+    Returns:
+        Array float com o score de cada par (0 a 1)
+    """
+    pares, largura_a = codigos_a.shape
+    largura_b = codigos_b.shape[1]
+    janela = np.maximum(np.maximum(comprimentos_a, comprimentos_b) // 2 - 1, 0)
+    posicoes_b = np.arange(largura_b)
+
+    usado_b = np.zeros((pares, largura_b), dtype=bool)
+    casado_a = np.zeros((pares, largura_a), dtype=bool)
+    validos_b = posicoes_b[None, :] < comprimentos_b[:, None]
+
+    janela_max = int(janela.max()) if pares else 0
+
+    for i in range(largura_a):
+        ativos = i < comprimentos_a
+        if not ativos.any():
+            break
+        # Só as colunas de b que podem estar na janela de algum par
+        inicio, fim = max(i - janela_max, 0), min(i + janela_max + 1, largura_b)
+        if inicio >= fim:
+            continue
+        na_janela = (np.abs(posicoes_b[None, inicio:fim] - i) <= janela[:, None]) & validos_b[:, inicio:fim]
+        candidatos = (na_janela & ~usado_b[:, inicio:fim]
+                      & (codigos_b[:, inicio:fim] == codigos_a[:, i:i + 1]) & ativos[:, None])
+        linhas = np.flatnonzero(candidatos.any(axis=1))
+        usado_b[linhas, inicio + candidatos[linhas].argmax(axis=1)] = True
+        casado_a[linhas, i] = True
+
+    m = casado_a.sum(axis=1)
+
+    # Transposições: k-ésimo caractere casado de a contra o k-ésimo de b
+    ordem_a = np.argsort(~casado_a, axis=1, kind="stable")
+    ordem_b = np.argsort(~usado_b, axis=1, kind="stable")
+    largura = min(largura_a, largura_b)
+    seq_a = np.take_along_axis(codigos_a, ordem_a, axis=1)[:, :largura]
+    seq_b = np.take_along_axis(codigos_b, ordem_b, axis=1)[:, :largura]
+    dentro = np.arange(largura)[None, :] < m[:, None]
+    transposicoes = ((seq_a != seq_b) & dentro).sum(axis=1) / 2.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jaro = np.where(
+            m > 0,
+            (m / np.maximum(comprimentos_a, 1) + m / np.maximum(comprimentos_b, 1) + (m - transposicoes) / np.maximum(m, 1)) / 3.0,
+            0.0
+        )
+
+    prefixo = _prefixo_comum(codigos_a, comprimentos_a, codigos_b, comprimentos_b)
+    return jaro + prefixo * peso_prefixo * (1.0 - jaro)
+
+class IndiceNomes:
+    """
+    Índice de blocos dos nomes de uma lista
+
+    A chave de bloco combina min_palavras palavras do nome (pelo prefixo ou
+    pela chave fonética de cada uma): só são comparados nomes com essas
+    palavras em comum, e sobrenomes frequentes como SANTOS ou SILVA sozinhos
+    não geram pares. Nomes com menos palavras usam as chaves de palavra única.
+    """
+
+    def __init__(self, nomes: List[str], tamanho_prefixo: int = 3, min_palavras: int = 2):
+        """
+        Args:
+            nomes: Nomes já normalizados (distintos)
+            tamanho_prefixo: Letras do prefixo de cada palavra
+            min_palavras: Palavras em comum exigidas para comparar dois nomes
+        """
+        self.nomes = nomes
+        self.tamanho_prefixo = tamanho_prefixo
+        self.min_palavras = min_palavras
+        self._vazio = np.array([], dtype=np.int64)
+        self._chaves = [self.chaves(nome) for nome in nomes]
+
+        blocos: Dict[str, List[int]] = {}
+        self.tamanhos = set()
+        for posicao, chaves in enumerate(self._chaves):
+            tamanho = min(min_palavras, len(chaves))
+            self.tamanhos.add(tamanho)
+            for chave in self.chaves_bloco(chaves, tamanho):
+                blocos.setdefault(chave, []).append(posicao)
+        self.blocos = {chave: np.array(posicoes, dtype=np.int64) for chave, posicoes in blocos.items()}
+        self._palavras: Optional[Dict[str, np.ndarray]] = None
+
+    @property
+    def palavras(self) -> Dict[str, np.ndarray]:
+        """Blocos de palavra única (montados só se houver nomes curtos a consultar)"""
+        if self._palavras is None:
+            palavras: Dict[str, List[int]] = {}
+            for posicao, chaves in enumerate(self._chaves):
+                for chave in self.chaves_bloco(chaves, 1):
+                    palavras.setdefault(chave, []).append(posicao)
+            self._palavras = {chave: np.array(posicoes, dtype=np.int64) for chave, posicoes in palavras.items()}
+        return self._palavras
+
+    def chaves(self, nome: str) -> List[Tuple[str, str]]:
+        """Chaves (prefixo, fonética) de cada palavra significativa do nome"""
+        chaves = []
+        for palavra in dict.fromkeys(nome.split()):
+            if palavra in PARTICULAS or len(palavra) < 2:
+                continue
+            chaves.append((palavra[:self.tamanho_prefixo], chave_fonetica(palavra)))
+        return chaves
+
+    @staticmethod
+    def chaves_bloco(chaves: List[Tuple[str, str]], tamanho: int) -> set:
+        """Combinações de tamanho palavras, pelos prefixos ou pelas chaves fonéticas"""
+        if tamanho <= 0:
+            return set()
+        resultado = set()
+        for tipo, posicao in (("p", 0), ("f", 1)):
+            for combinacao in combinations(sorted({chave[posicao] for chave in chaves}), tamanho):
+                resultado.add(f"{tipo}{tamanho}:" + "|".join(combinacao))
+        return resultado
+
+    def pares_candidatos(self, nomes: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (posição em nomes, posição no índice) que compartilham uma chave de bloco
+
+        Returns:
+            Tuple[posições da origem, posições do índice], sem pares repetidos
+        """
+        origens, destinos = [], []
+        for posicao, nome in enumerate(nomes):
+            chaves = self.chaves(nome)
+            if len(chaves) >= self.min_palavras:
+                # Nomes do índice com min_palavras em comum, ou com menos palavras
+                # (indexados pelas próprias combinações menores)
+                consultas = [self.blocos.get(chave) for tamanho in sorted(self.tamanhos)
+                             for chave in self.chaves_bloco(chaves, tamanho)]
+            else:
+                consultas = [self.palavras.get(chave) for chave in self.chaves_bloco(chaves, 1)]
+            for bloco in consultas:
+                if bloco is not None:
+                    destinos.append(bloco)
+                    origens.append(np.full(len(bloco), posicao, dtype=np.int64))
+        if not destinos:
+            return self._vazio, self._vazio
+
+        tamanho = len(self.nomes)
+        codigos = np.unique(np.concatenate(origens) * tamanho + np.concatenate(destinos))
+        return codigos // tamanho, codigos % tamanho
+
+class ConciliadorNomes:
+    """
+    Classe responsável por conciliar duas listas de nomes de funcionários
+    (ex: Alocações x folha, Não contábil x folha)
+    """
+
+    def __init__(self, config: Dict = None):
+        """
+        Inicializa o conciliador
+
+        Args:
+            config: Limiares e parâmetros do índice (ver carregar_config_padrao)
+        """
+        self.config = config or self.carregar_config_padrao()
+        self.logger = logging.getLogger('ConciliadorNomes')
+
+    def carregar_config_padrao(self) -> Dict:
+        """Limiares calibrados para nomes completos (Jaro-Winkler de 0 a 1)"""
+        return {
+            # Score mínimo para conciliar automaticamente
+            "limiar_aceite": 0.92,
+            # Abaixo deste score o nome fica sem correspondência; pares cujo
+            # limite superior não o alcança nem são calculados
+            "limiar_revisao": 0.85,
+            # Diferença mínima entre o melhor e o segundo candidato
+            "margem_ambiguidade": 0.02,
+            # Candidatos listados por nome ambíguo
+            "candidatos_ambiguos": 3,
+            "tamanho_prefixo": 3,
+            # Palavras do nome em comum para o par ser comparado
+            "min_palavras": 2,
+            "peso_prefixo": 0.1,
+            # Pares por lote do cálculo vetorizado (limita a memória)
+            "pares_por_lote": 50000
+        }
+
+    def _pontuar(self, origem: List[str], destino: List[str]) -> pd.DataFrame:
+        """Score Jaro-Winkler de todos os pares candidatos (origem x destino distintos)"""
+        indice = IndiceNomes(destino, self.config["tamanho_prefixo"], self.config["min_palavras"])
+
+        pares_origem, pares_destino = indice.pares_candidatos(origem)
+
+        codigos_origem, comprimentos_origem = _codificar(origem)
+        codigos_destino, comprimentos_destino = _codificar(destino)
+        candidatos = len(pares_origem)
+
+        # Pares que não alcançam limiar_revisao nem no limite superior não são calculados
+        limite = limite_jaro_winkler(
+            _histograma(codigos_origem, comprimentos_origem)[pares_origem], comprimentos_origem[pares_origem],
+            _histograma(codigos_destino, comprimentos_destino)[pares_destino], comprimentos_destino[pares_destino],
+            _prefixo_comum(codigos_origem[pares_origem], comprimentos_origem[pares_origem],
+                           codigos_destino[pares_destino], comprimentos_destino[pares_destino]),
+            self.config["peso_prefixo"]
+        )
+        manter = limite >= self.config["limiar_revisao"]
+        pares_origem, pares_destino = pares_origem[manter], pares_destino[manter]
+
+        # Lotes de pares com comprimentos parecidos: matrizes estreitas e laço mais curto
+        ordem = np.argsort(np.maximum(comprimentos_origem[pares_origem], comprimentos_destino[pares_destino]), kind="stable")
+        scores = np.empty(len(pares_origem), dtype=float)
+        lote = self.config["pares_por_lote"]
+        for inicio in range(0, len(ordem), lote):
+            selecao = ordem[inicio:inicio + lote]
+            a, b = pares_origem[selecao], pares_destino[selecao]
+            largura_a = max(int(comprimentos_origem[a].max()), 1)
+            largura_b = max(int(comprimentos_destino[b].max()), 1)
+            scores[selecao] = jaro_winkler_pares(
+                codigos_origem[a, :largura_a], comprimentos_origem[a],
+                codigos_destino[b, :largura_b], comprimentos_destino[b],
+                self.config["peso_prefixo"]
+            )
+
+        self.logger.info(
+            f"{len(pares_origem)} pares calculados ({candidatos} candidatos "
+            f"de {len(origem) * len(destino)} possíveis)"
+        )
+        return pd.DataFrame({"origem": pares_origem, "destino": pares_destino, "score": scores})
+
+    def conciliar(self, nomes_origem: Iterable, nomes_destino: Iterable) -> Dict[str, pd.DataFrame]:
+        """
+        Concilia cada nome da origem com a lista de destino
+
+        Args:
+            nomes_origem: Nomes a conciliar (ex: Alocações)
+            nomes_destino: Nomes de referência (ex: folha)
+
+        Returns:
+            Dict com os DataFrames:
+              "conciliados": Nome, Correspondente, Score, Método (exato/jaro_winkler)
+              "ambiguos": Nome, Candidato, Score, Posição (melhores candidatos)
+              "sem_correspondencia": Nome, Melhor Candidato, Score
+        """
+        origem_original = pd.Series(list(nomes_origem), dtype=object)
+        destino_original = pd.Series(list(nomes_destino), dtype=object)
+        origem_norm = normalizar_nomes(origem_original)
+        destino_norm = normalizar_nomes(destino_original)
+
+        # Um representante (primeira grafia) por nome normalizado
+        destino_distintos = pd.Series(destino_original.to_numpy(), index=destino_norm)
+        destino_distintos = destino_distintos[destino_distintos.index != ""]
+        destino_distintos = destino_distintos[~destino_distintos.index.duplicated()]
+        origem_distintos = [nome for nome in pd.unique(origem_norm) if nome]
+
+        # 1. Igualdade após a normalização: sem cálculo de score
+        destino_lista = list(destino_distintos.index)
+        exatos = set(origem_distintos) & set(destino_lista)
+        restantes = [nome for nome in origem_distintos if nome not in exatos]
+
+        # 2. Jaro-Winkler só dentro dos blocos
+        pontuacao = self._pontuar(restantes, destino_lista)
+        pontuacao = pontuacao.sort_values(["origem", "score"], ascending=[True, False], kind="stable")
+        posicao = pontuacao.groupby("origem", sort=False).cumcount().to_numpy()
+        pontuacao["posicao"] = posicao
+
+        melhores = pontuacao[posicao == 0].set_index("origem")
+        segundos = pontuacao[posicao == 1].set_index("origem")["score"]
+        melhor_score = melhores["score"].reindex(range(len(restantes))).to_numpy()
+        segundo_score = segundos.reindex(range(len(restantes))).fillna(0.0).to_numpy()
+        melhor_destino = melhores["destino"].reindex(range(len(restantes))).to_numpy()
+
+        aceite, revisao = self.config["limiar_aceite"], self.config["limiar_revisao"]
+        with np.errstate(invalid="ignore"):
+            claro = (melhor_score - segundo_score) >= self.config["margem_ambiguidade"]
+            conciliado = (melhor_score >= aceite) & claro
+            ambiguo = ~conciliado & (melhor_score >= revisao)
+
+        representantes = destino_distintos.to_numpy()
+
+        # Resultado por nome normalizado da origem
+        situacao = {nome: ("conciliado", destino_distintos[nome], 1.0, "exato") for nome in exatos}
+        for i, nome in enumerate(restantes):
+            if conciliado[i]:
+                situacao[nome] = ("conciliado", representantes[int(melhor_destino[i])], float(melhor_score[i]), "jaro_winkler")
+            elif ambiguo[i]:
+                situacao[nome] = ("ambiguo", None, float(melhor_score[i]), None)
+            else:
+                melhor = representantes[int(melhor_destino[i])] if not np.isnan(melhor_score[i]) else None
+                situacao[nome] = ("sem_correspondencia", melhor, 0.0 if np.isnan(melhor_score[i]) else float(melhor_score[i]), None)
+
+        linhas_conciliados, linhas_sem = [], []
+        nomes_ambiguos = {}
+        for original, normalizado in zip(origem_original, origem_norm):
+            if not normalizado:
+                continue
+            estado, correspondente, score, metodo = situacao[normalizado]
+            if estado == "conciliado":
+                linhas_conciliados.append((original, correspondente, round(score, 4), metodo))
+            elif estado == "ambiguo":
+                nomes_ambiguos.setdefault(normalizado, original)
+            else:
+                linhas_sem.append((original, correspondente, round(score, 4)))
+
+        linhas_ambiguos = []
+        if nomes_ambiguos:
+            indice_restantes = {nome: i for i, nome in enumerate(restantes)}
+            limite = self.config["candidatos_ambiguos"]
+            por_origem = pontuacao[pontuacao["posicao"] < limite].groupby("origem", sort=False)
+            for normalizado, original in nomes_ambiguos.items():
+                for _, linha in por_origem.get_group(indice_restantes[normalizado]).iterrows():
+                    if linha["score"] >= revisao:
+                        linhas_ambiguos.append((
+                            original, representantes[int(linha["destino"])],
+                            round(float(linha["score"]), 4), int(linha["posicao"]) + 1
+                        ))
+
+        resultado = {
+            "conciliados": pd.DataFrame(linhas_conciliados, columns=["Nome", "Correspondente", "Score", "Método"]),
+            "ambiguos": pd.DataFrame(linhas_ambiguos, columns=["Nome", "Candidato", "Score", "Posição"]),
+            "sem_correspondencia": pd.DataFrame(linhas_sem, columns=["Nome", "Melhor Candidato", "Score"])
+        }
+        self.logger.info(
+            f"Conciliação: {len(resultado['conciliados'])} conciliados "
+            f"({len(exatos)} nomes exatos), {len(nomes_ambiguos)} ambíguos, "
+            f"{len(resultado['sem_correspondencia'])} sem correspondência"
+        )
+        return resultado
+
+    def conciliar_tabelas(self, df_origem: pd.DataFrame, df_destino: pd.DataFrame,
+                          coluna_origem: str = "Nome", coluna_destino: str = "Nome",
+                          colunas_destino: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Acrescenta à origem as colunas do destino conciliado (ex: Codigo da folha)
+
+        Returns:
+            df_origem com "Nome Conciliado", "Score", "Situação" e colunas_destino
+        """
+        resultado = self.conciliar(df_origem[coluna_origem], df_destino[coluna_destino])
+
+        conciliados = resultado["conciliados"].drop_duplicates("Nome").set_index("Nome")
+        ambiguos = set(resultado["ambiguos"]["Nome"])
+        nomes = df_origem[coluna_origem]
+
+        df = df_origem.copy()
+        df["Nome Conciliado"] = nomes.map(conciliados["Correspondente"])
+        df["Score"] = nomes.map(conciliados["Score"])
+        df["Situação"] = np.where(
+            df["Nome Conciliado"].notna(), "conciliado",
+            np.where(nomes.isin(ambiguos), "ambiguo", "sem_correspondencia")
+        )
+
+        if colunas_destino:
+            referencia = df_destino.drop_duplicates(coluna_destino).set_index(coluna_destino)[colunas_destino]
+            df = df.join(referencia, on="Nome Conciliado")
+        return df
+
+# Função de teste
+def main():
+    """Função principal para testar a conciliação"""
+    import time
+    from modulo2_carregadores import carregar_alocacoes, carregar_extrato, carregar_gratificacao, carregar_nao_contabil
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("MÓDULO 5: CONCILIAÇÃO DE NOMES")
+    print("=" * 50)
+
+    pasta = Path(__file__).parent / "Base de Dados"
+    arquivos = {
+        "alocacoes": pasta / "Alocações 052025.xlsx",
+        "extrato": pasta / "Extrato Mensal.xlsx",
+        "gratificacao": pasta / "Gratificação.xlsx",
+        "nao_contabil": pasta / "Folha não contábil.xlsx"
+    }
+    faltantes = [str(arquivo) for arquivo in arquivos.values() if not arquivo.exists()]
+    if faltantes:
+        print(f"Arquivos não encontrados: {faltantes}")
+        return False
+
+    try:
+        alocacoes = carregar_alocacoes(arquivos["alocacoes"])
+        folha = carregar_extrato(arquivos["extrato"])
+        nomes_folha = folha["Nome"].dropna().unique()
+        conciliador = ConciliadorNomes()
+
+        print("\nRESULTADOS:")
+        for rotulo, nomes in [
+            ("Alocações", alocacoes["Nome"]),
+            ("Gratificação", carregar_gratificacao(arquivos["gratificacao"])["COLABORADOR"]),
+            ("Não contábil", carregar_nao_contabil(arquivos["nao_contabil"])["Nome"])
+        ]:
+            inicio = time.perf_counter()
+            resultado = conciliador.conciliar(nomes, nomes_folha)
+            duracao = time.perf_counter() - inicio
+            print(f"   {rotulo} x Extrato: {len(resultado['conciliados'])} conciliados, "
+                  f"{resultado['ambiguos']['Nome'].nunique()} ambíguos, "
+                  f"{len(resultado['sem_correspondencia'])} sem correspondência ({duracao * 1000:.0f} ms)")
+
+        # Volume sintético: 5.000 nomes com uma grafia alterada contra 5.000
+        rng = np.random.default_rng(0)
+        silabas = np.array(["MA", "RI", "AN", "JO", "SE", "LU", "CA", "RO", "DA", "NI", "EL", "TE", "VA", "GO",
+                            "BE", "SI", "PE", "DRO", "FER", "NAN", "DES", "TO", "LI", "VEI", "RA", "MOU"])
+        def palavra():
+            return "".join(rng.choice(silabas, rng.integers(2, 4)))
+        destino = list(dict.fromkeys(f"{palavra()} {palavra()} DOS {palavra()}" for _ in range(5200)))[:5000]
+        origem = [nome.replace("S", "Z", 1).replace("LU", "LLU", 1) + " - 26/09" for nome in destino]
+
+        inicio = time.perf_counter()
+        resultado = conciliador.conciliar(origem, destino)
+        duracao = time.perf_counter() - inicio
+        print(f"   Sintético 5.000 x 5.000: {len(resultado['conciliados'])} conciliados em {duracao * 1000:.0f} ms")
+
+        if not resultado["ambiguos"].empty:
+            print("\nAMOSTRA DOS AMBÍGUOS:")
+            print(resultado["ambiguos"].head().to_string(index=False))
+        return True
+
+    except Exception as e:
+        print(f"Erro durante o teste: {e}")
+        return False
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""
+PIPELINE DA FOLHA: EXECUÇÃO DAS ETAPAS COM CACHE
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Declarar as etapas (validação, leitura, consolidação, exportação) com
+   entradas explícitas: arquivos ou saídas de outras etapas
+2. Calcular a impressão digital de cada etapa (MD5 dos arquivos, impressões
+   das etapas anteriores, código e configuração) e pular as que não mudaram
+   e cujos arquivos gravados (xlsx exportado) continuam em disco
+3. Executar em paralelo as etapas independentes (ProcessPoolExecutor)
+4. Manter em disco a saída de cada etapa (Parquet; pickle sem pyarrow)
+
+Alterar só a planilha de Gratificação reexecuta apenas a validação e a
+leitura dela e a exportação.
+
+Estrutura em disco:
+    pipeline/estado_pipeline.json         impressão e artefato de cada etapa
+    pipeline/artefatos/<etapa>.parquet    saída de cada etapa
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from modulo1_backup import calcular_hash_md5
+from modulo1_estrutura_xlsx import validar_estrutura_xlsx
+from modulo1_validacao import carregar_configuracao_validacao
+from modulo2_cache import PARQUET_DISPONIVEL, hash_config
+from modulo2_carregadores import CARREGADORES, CARREGADORES_PASTA, LISTAGENS_PASTA
+from modulo2_nucleo import carregar_lojas_por_nome, carregar_substituicoes_cpf
+from modulo3_consolidacao import ConsolidadorFolha
+
+MAX_WORKERS_PIPELINE = os.cpu_count() or 1
+
+# Módulos cujo código entra na impressão das etapas de leitura e consolidação
+MODULOS_LEITURA = [
+    "modulo2_carregadores", "modulo2_motor_layout", "modulo2_nucleo",
+    "modulo2_processador_extrato", "modulo2_processador_fenix", "modulo2_processador_genesis"
+]
+MODULOS_CONSOLIDACAO = ["modulo3_consolidacao"]
+
+# Prefixo das entradas que são arquivos ou pastas (as demais são etapas)
+PREFIXO_ARQUIVO = "arquivo:"
+
+def arquivos_da_entrada(tipo: str, caminho: Path) -> List[Path]:
+    """Arquivos lidos de uma entrada: o próprio arquivo ou os listados da pasta (LISTAGENS_PASTA)"""
+    if not caminho.is_dir():
+        return [caminho]
+    if tipo in LISTAGENS_PASTA:
+        return LISTAGENS_PASTA[tipo](caminho)
+    return sorted((arquivo for arquivo in caminho.iterdir() if arquivo.is_file()), key=lambda arquivo: arquivo.name)
+
+def hash_entrada(tipo: str, caminho: Path) -> str:
+    """MD5 de um arquivo de entrada; numa pasta, combina nome e MD5 de cada arquivo listado"""
+    if not caminho.exists():
+        return "ausente"
+    if not caminho.is_dir():
+        return calcular_hash_md5(caminho)
+    hash_md5 = hashlib.md5()
+    for arquivo in arquivos_da_entrada(tipo, caminho):
+        hash_md5.update(f"{arquivo.name}={calcular_hash_md5(arquivo)}|".encode("utf-8"))
+    return hash_md5.hexdigest()
+
+def impressao_saida(caminho: Path) -> Optional[str]:
+    """Tamanho e data de modificação de um arquivo gravado por uma etapa (None se não existe)"""
+    try:
+        info = caminho.stat()
+    except OSError:
+        return None
+    return f"{info.st_size}:{info.st_mtime_ns}"
+
+def _nome_modulo(modulo: str) -> str:
+    """Nome do módulo pelo arquivo (o mesmo rodando como script ou importado)"""
+    return Path(sys.modules[modulo].__file__).stem
+
+def _hash_modulos(modulos: List[str]) -> str:
+    """MD5 do código-fonte dos módulos (mudar o código invalida a etapa)"""
+    hash_md5 = hashlib.md5()
+    for nome in sorted(modulos):
+        hash_md5.update(nome.encode("utf-8"))
+        arquivo = Path(sys.modules[nome].__file__) if nome in sys.modules else Path(__file__).with_name(f"{nome}.py")
+        hash_md5.update(calcular_hash_md5(arquivo).encode("utf-8"))
+    return hash_md5.hexdigest()
+
+def salvar_artefato(df: pd.DataFrame, destino: Path) -> Path:
+    """Grava a saída de uma etapa (arquivo temporário + rename)"""
+    destino = destino.with_suffix(".parquet" if PARQUET_DISPONIVEL else ".pkl")
+    temporario = destino.with_suffix(destino.suffix + ".tmp")
+    if PARQUET_DISPONIVEL:
+        df.to_parquet(temporario, index=False)
+    else:
+        df.to_pickle(temporario)
+    os.replace(temporario, destino)
+    return destino
+
+def carregar_artefato(caminho: Path) -> pd.DataFrame:
+    """Lê a saída gravada por salvar_artefato"""
+    return pd.read_parquet(caminho) if caminho.suffix == ".parquet" else pd.read_pickle(caminho)
+
+def _executar_etapa(funcao: Callable, arquivos: Dict[str, str], artefatos: Dict[str, str],
+                    config: Dict, destino: str) -> Dict:
+    """
+    Executa uma etapa (num processo do ProcessPoolExecutor)
+
+    As entradas viajam como caminhos; as saídas das etapas anteriores são lidas
+    do disco aqui, sem serializar DataFrames entre processos.
+    """
+    inicio = datetime.now()
+    entradas: Dict[str, Any] = {nome: Path(caminho) for nome, caminho in arquivos.items()}
+    entradas.update({nome: carregar_artefato(Path(caminho)) for nome, caminho in artefatos.items()})
+
+    df = funcao(entradas, config)
+    caminho = salvar_artefato(df, Path(destino))
+    return {
+        "artefato": str(caminho),
+        "registros": len(df),
+        "segundos": round((datetime.now() - inicio).total_seconds(), 3)
+    }
+
+class Etapa:
+    """
+    Etapa do pipeline
+
+    A função recebe (entradas, config): entradas mapeia cada nome de entrada
+    para o Path do arquivo ou para o DataFrame da etapa anterior, e deve
+    retornar um DataFrame. Precisa ser uma função de módulo (executada em outro processo).
+    """
+
+    def __init__(self, nome: str, funcao: Callable, entradas: List[str],
+                 config: Dict = None, modulos: List[str] = None, versao: str = "1",
+                 saidas: List[str] = None):
+        """
+        Args:
+            nome: Nome único da etapa
+            funcao: Função da etapa
+            entradas: "arquivo:<tipo>" ou nomes de outras etapas
+            config: Configuração passada à função (entra na impressão)
+            modulos: Módulos cujo código entra na impressão (além do módulo da função)
+            versao: Versão manual da etapa (mudar força a reexecução)
+            saidas: Arquivos gravados pela função além do artefato; apagar ou
+                    alterar um deles força a reexecução
+        """
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.config = config or {}
+        self.modulos = sorted(set((modulos or []) + [_nome_modulo(funcao.__module__)]))
+        self.versao = versao
+        self.saidas = [str(saida) for saida in (saidas or [])]
+
+class PipelineFolha:
+    """
+    Executor das etapas com cache por impressão digital
+    """
+
+    VERSAO = 1
+
+    def __init__(self, pasta_pipeline: Path, arquivos: Dict[str, Path]):
+        """
+        Args:
+            pasta_pipeline: Pasta do estado e dos artefatos
+            arquivos: Tipo -> caminho dos arquivos de entrada (ou da pasta, lida
+                      pelo carregador de CARREGADORES_PASTA)
+        """
+        self.pasta_pipeline = Path(pasta_pipeline)
+        self.pasta_artefatos = self.pasta_pipeline / "artefatos"
+        self.arquivo_estado = self.pasta_pipeline / "estado_pipeline.json"
+        self.arquivos = {tipo: Path(caminho) for tipo, caminho in arquivos.items()}
+        self.etapas: Dict[str, Etapa] = {}
+        self.logger = logging.getLogger('PipelineFolha')
+
+    def adicionar_etapa(self, etapa: Etapa):
+        """Registra uma etapa; as entradas de etapa devem ter sido registradas antes"""
+        for entrada in etapa.entradas:
+            if entrada.startswith(PREFIXO_ARQUIVO):
+                if entrada[len(PREFIXO_ARQUIVO):] not in self.arquivos:
+                    raise KeyError(f"Etapa {etapa.nome}: arquivo desconhecido {entrada}")
+            elif entrada not in self.etapas:
+                raise KeyError(f"Etapa {etapa.nome}: etapa de entrada não registrada {entrada}")
+        self.etapas[etapa.nome] = etapa
+
+    def _carregar_estado(self) -> Dict:
+        """Estado da execução anterior (descartado se a versão mudou)"""
+        if not self.arquivo_estado.exists():
+            return {}
+        try:
+            with open(self.arquivo_estado, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return dados.get("etapas", {}) if dados.get("versao") == self.VERSAO else {}
+
+    def _salvar_estado(self, estado: Dict):
+        self.pasta_pipeline.mkdir(parents=True, exist_ok=True)
+        with open(self.arquivo_estado, "w", encoding="utf-8") as f:
+            json.dump({"versao": self.VERSAO, "etapas": estado}, f, indent=2, ensure_ascii=False)
+
+    def calcular_impressoes(self) -> Dict[str, str]:
+        """
+        Impressão digital de cada etapa, na ordem de registro (topológica)
+
+        Combina MD5 dos arquivos de entrada (de cada arquivo listado, numa
+        pasta), impressões das etapas de entrada, código dos módulos,
+        configuração e versão.
+        """
+        hashes_arquivos = {}
+        hashes_codigo = {}
+        impressoes = {}
+        for nome, etapa in self.etapas.items():
+            partes = []
+            for entrada in etapa.entradas:
+                if entrada.startswith(PREFIXO_ARQUIVO):
+                    tipo = entrada[len(PREFIXO_ARQUIVO):]
+                    if tipo not in hashes_arquivos:
+                        hashes_arquivos[tipo] = hash_entrada(tipo, self.arquivos[tipo])
+                    partes.append(f"{entrada}={hashes_arquivos[tipo]}")
+                else:
+                    partes.append(f"{entrada}={impressoes[entrada]}")
+
+            chave_codigo = tuple(etapa.modulos)
+            if chave_codigo not in hashes_codigo:
+                hashes_codigo[chave_codigo] = _hash_modulos(etapa.modulos)
+            partes += [
+                f"funcao={_nome_modulo(etapa.funcao.__module__)}.{etapa.funcao.__qualname__}",
+                f"codigo={hashes_codigo[chave_codigo]}",
+                f"config={hash_config(etapa.config)}",
+                f"versao={etapa.versao}"
+            ]
+            impressoes[nome] = hashlib.md5("|".join(partes).encode("utf-8")).hexdigest()
+        return impressoes
+
+    def executar(self, forcar: bool = False, max_workers: int = None) -> Dict[str, Dict]:
+        """
+        Executa as etapas cuja impressão mudou, em paralelo quando independentes
+
+        Args:
+            forcar: Reexecuta todas as etapas
+            max_workers: Processos simultâneos (padrão: MAX_WORKERS_PIPELINE)
+
+        Returns:
+            Dict etapa -> {"status": "executada" | "em cache" | "erro" | "bloqueada", ...}
+        """
+        self.pasta_artefatos.mkdir(parents=True, exist_ok=True)
+        estado = self._carregar_estado()
+        impressoes = self.calcular_impressoes()
+        resultados: Dict[str, Dict] = {}
+
+        # Etapas em cache: mesma impressão, artefato ainda em disco e arquivos
+        # gravados (saidas) sem alteração desde a execução
+        for nome, etapa in self.etapas.items():
+            anterior = estado.get(nome)
+            if (not forcar and anterior and anterior.get("impressao") == impressoes[nome]
+                    and Path(anterior.get("artefato", "")).exists()
+                    and all(anterior.get("saidas", {}).get(saida) == impressao_saida(Path(saida))
+                            for saida in etapa.saidas)):
+                resultados[nome] = {**anterior, "status": "em cache"}
+
+        pendentes = [nome for nome in self.etapas if nome not in resultados]
+        self.logger.info(f"Etapas em cache: {len(resultados)}; a executar: {len(pendentes)}")
+
+        with ProcessPoolExecutor(max_workers=max_workers or MAX_WORKERS_PIPELINE) as executor:
+            em_execucao = {}
+            while pendentes or em_execucao:
+                # Submeter as etapas cujas entradas de etapa já terminaram
+                for nome in list(pendentes):
+                    etapa = self.etapas[nome]
+                    dependencias = [entrada for entrada in etapa.entradas if not entrada.startswith(PREFIXO_ARQUIVO)]
+                    if any(resultados.get(dep, {}).get("status") in ("erro", "bloqueada") for dep in dependencias):
+                        resultados[nome] = {"status": "bloqueada"}
+                        pendentes.remove(nome)
+                        self.logger.warning(f"Etapa bloqueada por falha anterior: {nome}")
+                        continue
+                    if not all(dep in resultados for dep in dependencias):
+                        continue
+
+                    arquivos = {
+                        entrada[len(PREFIXO_ARQUIVO):]: str(self.arquivos[entrada[len(PREFIXO_ARQUIVO):]])
+                        for entrada in etapa.entradas if entrada.startswith(PREFIXO_ARQUIVO)
+                    }
+                    artefatos = {dep: resultados[dep]["artefato"] for dep in dependencias}
+                    futuro = executor.submit(
+                        _executar_etapa, etapa.funcao, arquivos, artefatos,
+                        etapa.config, str(self.pasta_artefatos / nome)
+                    )
+                    em_execucao[futuro] = nome
+                    pendentes.remove(nome)
+
+                if not em_execucao:
+                    continue
+
+                concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    nome = em_execucao.pop(futuro)
+                    try:
+                        resultado = futuro.result()
+                        saidas = {saida: impressao_saida(Path(saida)) for saida in self.etapas[nome].saidas}
+                        resultados[nome] = {
+                            **resultado, "saidas": saidas, "impressao": impressoes[nome], "status": "executada"
+                        }
+                        self.logger.info(f"✅ {nome}: {resultado['registros']} registros em {resultado['segundos']:.2f}s")
+                    except Exception as e:
+                        resultados[nome] = {"status": "erro", "erro": str(e)}
+                        self.logger.error(f"❌ Erro na etapa {nome}: {e}")
+
+        # Só as etapas concluídas ficam no estado (as com erro serão reexecutadas)
+        self._salvar_estado({
+            nome: {chave: valor for chave, valor in resultado.items() if chave != "status"}
+            for nome, resultado in resultados.items()
+            if resultado["status"] in ("executada", "em cache")
+        })
+        return resultados
+
+    def obter_saida(self, nome: str) -> pd.DataFrame:
+        """Saída de uma etapa concluída (lida do disco)"""
+        entrada = self._carregar_estado().get(nome)
+        if entrada is None:
+            raise KeyError(f"Etapa sem saída em disco: {nome}")
+        return carregar_artefato(Path(entrada["artefato"]))
+
+# Etapas da folha Rainha (funções de módulo, executadas em outros processos)
+
+def etapa_validar(entradas: Dict, config: Dict) -> pd.DataFrame:
+    """Valida a estrutura de um arquivo, ou de cada arquivo da pasta (mesmas regras do ValidadorArquivos)"""
+    (tipo, caminho), = entradas.items()
+    validacoes = config["validacoes"]
+
+    arquivos = arquivos_da_entrada(tipo, caminho)
+    if not arquivos:
+        raise ValueError(f"{caminho.name} inválido: nenhum arquivo de {tipo} na pasta")
+
+    warnings = []
+    for arquivo in arquivos:
+        tamanho_kb = arquivo.stat().st_size / 1024
+        if tamanho_kb < validacoes["tamanho_minimo_kb"]:
+            raise ValueError(f"{arquivo.name} inválido: arquivo muito pequeno ({tamanho_kb:.1f}KB)")
+
+        resultado = validar_estrutura_xlsx(
+            arquivo, config["tipo"], validacoes["linhas_minimas"], validacoes["linhas_cabecalho"]
+        )
+        if resultado["erros"]:
+            raise ValueError(f"{arquivo.name} inválido: {'; '.join(resultado['erros'])}")
+        warnings.append(len(resultado["warnings"]))
+    return pd.DataFrame({
+        "tipo": [tipo] * len(arquivos), "arquivo": [arquivo.name for arquivo in arquivos],
+        "warnings": warnings, "erros": [0] * len(arquivos)
+    })
+
+def etapa_ler(entradas: Dict, config: Dict) -> pd.DataFrame:
+    """Lê uma fonte pelo carregador correspondente (modulo2_carregadores; uma pasta usa CARREGADORES_PASTA)"""
+    tipo = config["tipo"]
+    carregador = CARREGADORES_PASTA[tipo] if entradas[tipo].is_dir() else CARREGADORES[tipo]
+    return carregador(entradas[tipo])
+
+def etapa_consolidar(entradas: Dict, config: Dict) -> pd.DataFrame:
+    """Folha Agrupada na ordem do Table.Combine, com a coluna Empresa"""
+    tabelas = {empresa: entradas[f"ler_{tipo}"] for tipo, empresa in config["fontes"].items()}
+    return ConsolidadorFolha().consolidar(tabelas, coluna_origem="Empresa")
+
+def etapa_exportar(entradas: Dict, config: Dict) -> pd.DataFrame:
+    """Exporta a Folha Agrupada e as planilhas de apoio; retorna as abas gravadas"""
+    df = entradas["consolidar"]
+    abas = {"Consolidado": df}
+    for empresa, df_empresa in df.groupby("Empresa", observed=True, sort=False):
+        abas[str(empresa)] = df_empresa
+    for tipo, aba in config["complementares"].items():
+        abas[aba] = entradas[f"ler_{tipo}"]
+
+    with pd.ExcelWriter(config["arquivo_saida"], engine="openpyxl") as writer:
+        for aba, df_aba in abas.items():
+            df_aba.to_excel(writer, sheet_name=aba, index=False)
+
+    return pd.DataFrame({"aba": list(abas), "registros": [len(df_aba) for df_aba in abas.values()]})
+
+def montar_pipeline_rainha(pasta_dados: Path, arquivos: Dict[str, str], pasta_pipeline: Path,
+                           arquivo_saida: Path, combinar_nao_contabil: bool = False) -> PipelineFolha:
+    """
+    Monta o pipeline da folha Rainha
+
+    validar_<tipo> -> ler_<tipo> -> consolidar (extrato, genesis, fenix) -> exportar
+    (exportar também recebe gratificação, não contábil e alocações)
+
+    Args:
+        pasta_dados: Pasta dos arquivos de entrada
+        arquivos: Tipo -> nome do arquivo (arquivos_entrada do FolhaPagamentoAutomation)
+        pasta_pipeline: Pasta do estado e dos artefatos
+        arquivo_saida: Caminho do xlsx exportado
+        combinar_nao_contabil: Lê todas as pastas de trabalho "não contábil" da
+                               pasta do arquivo (como o FolhaPagamentoAutomation)
+    """
+    from folha_pagamento_automation import FONTES_RELATORIO
+
+    caminhos = {tipo: Path(pasta_dados) / nome for tipo, nome in arquivos.items()}
+    if combinar_nao_contabil and "nao_contabil" in caminhos:
+        caminhos["nao_contabil"] = caminhos["nao_contabil"].parent
+    pipeline = PipelineFolha(pasta_pipeline, caminhos)
+    regras = carregar_configuracao_validacao()
+
+    # Mapeamentos do config_sistema.json lidos pelos carregadores: alterá-los reexecuta as leituras
+    mapeamentos = hash_config({
+        "substituicoes_cpf": carregar_substituicoes_cpf(), "lojas_por_nome": carregar_lojas_por_nome()
+    })
+
+    for tipo in CARREGADORES:
+        if tipo not in arquivos:
+            continue
+        pipeline.adicionar_etapa(Etapa(
+            f"validar_{tipo}", etapa_validar, [f"{PREFIXO_ARQUIVO}{tipo}"],
+            config={"tipo": regras["arquivos_obrigatorios"].get(tipo, {}), "validacoes": regras["validacoes"]},
+            modulos=["modulo1_estrutura_xlsx"]
+        ))
+        pipeline.adicionar_etapa(Etapa(
+            f"ler_{tipo}", etapa_ler, [f"{PREFIXO_ARQUIVO}{tipo}", f"validar_{tipo}"],
+            config={"tipo": tipo, "mapeamentos": mapeamentos}, modulos=MODULOS_LEITURA
+        ))
+
+    fontes = {tipo: empresa for tipo, empresa in FONTES_RELATORIO.items() if tipo in arquivos}
+    pipeline.adicionar_etapa(Etapa(
+        "consolidar", etapa_consolidar, [f"ler_{tipo}" for tipo in fontes],
+        config={"fontes": fontes}, modulos=MODULOS_CONSOLIDACAO
+    ))
+
+    complementares = {
+        tipo: aba for tipo, aba in
+        [("gratificacao", "Gratificação"), ("nao_contabil", "Não Contábil"), ("alocacoes", "Alocações")]
+        if tipo in arquivos
+    }
+    pipeline.adicionar_etapa(Etapa(
+        "exportar", etapa_exportar, ["consolidar"] + [f"ler_{tipo}" for tipo in complementares],
+        config={"complementares": complementares, "arquivo_saida": str(arquivo_saida)},
+        saidas=[str(arquivo_saida)]
+    ))
+    return pipeline
+
+# Função de teste e demonstração
+def main():
+    """Executa o pipeline sobre a pasta de dados"""
+    from folha_pagamento_automation import FolhaPagamentoAutomation
+
+    parser = argparse.ArgumentParser(description="Pipeline da folha de pagamento com cache por etapa")
+    parser.add_argument("--base-path", default=str(Path(__file__).parent / "Base de Dados"),
+                        help="Pasta dos arquivos de entrada")
+    parser.add_argument("--pasta-pipeline", help="Pasta do estado e artefatos (padrão: <base-path>/pipeline)")
+    parser.add_argument("--saida", help="Arquivo xlsx de saída (padrão: FolhaRainha.MM.AA.xlsx)")
+    parser.add_argument("--forcar", action="store_true", help="Reexecuta todas as etapas")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    print("PIPELINE DA FOLHA DE PAGAMENTO")
+    print("=" * 50)
+
+    base_path = Path(args.base_path)
+    sistema = FolhaPagamentoAutomation(base_path)
+    competencia = sistema.obter_competencia()
+    saida = Path(args.saida) if args.saida else base_path / f"FolhaRainha.{competencia[5:]}.{competencia[2:4]}.xlsx"
+
+    pipeline = montar_pipeline_rainha(
+        base_path, sistema.config["arquivos_entrada"],
+        Path(args.pasta_pipeline) if args.pasta_pipeline else base_path / "pipeline", saida,
+        combinar_nao_contabil=sistema.config.get("combinar_nao_contabil", False)
+    )
+    resultados = pipeline.executar(forcar=args.forcar)
+
+    print("\nETAPAS:")
+    for nome, resultado in resultados.items():
+        print(f"   {nome}: {resultado['status']}")
+    return all(resultado["status"] in ("executada", "em cache") for resultado in resultados.values())
+
+if __name__ == "__main__":
+    main()
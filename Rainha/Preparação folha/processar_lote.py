@@ -0,0 +1,300 @@
+"""
+PROCESSAMENTO EM LOTE: VÁRIAS COMPETÊNCIAS E CLIENTES
+Sistema de Automação da Folha de Pagamento - Rainha
+
+Este módulo é responsável por:
+1. Receber uma lista (ou glob) de pastas de competência, cada uma com as
+   planilhas de um mês
+2. Identificar as planilhas de cada pasta pelos padrões da validação
+   (*FENIX*.xlsx, *GENESIS*.xlsx, ...), sem nomes fixos de 05/2025
+3. Distribuir as pastas num ProcessPoolExecutor: pandas, openpyxl e os módulos
+   da folha são importados uma vez por processo, não uma vez por mês
+4. Emitir um resumo consolidado ao final (tela e resumo_lote.json)
+
+Uso:
+    python processar_lote.py "clientes/*/2025-0[1-3]" --workers 4 --saida resultados --historico historico
+
+Cada pasta roda o FolhaPagamentoAutomation completo, com as fontes carregadas
+em sequência dentro do processo (o paralelismo fica entre as competências).
+Com --historico e --identidades, os meses de um cliente (pastas irmãs)
+compartilham o histórico e o cadastro de identidades; a aba "Alterações" de
+um mês depende de o mês anterior já ter sido gravado: para um
+reprocessamento em ordem use --workers 1.
+
+A competência de cada pasta vem do MMAAAA no nome das folhas ou, na falta,
+do nome da pasta (2025-05, 05-2025, 052025); duas pastas de um mesmo
+cliente (mesma pasta-mãe) com a mesma competência interrompem o lote antes
+de processar, pois gravariam sobre o mesmo histórico.
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import fnmatch
+import logging
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from modulo1_catalogo import competencia_do_nome
+from modulo1_validacao import configuracao_validacao_padrao
+from folha_pagamento_automation import FolhaPagamentoAutomation
+
+MAX_WORKERS_LOTE = os.cpu_count() or 1
+
+FORMATO_LOG_LOTE = '%(asctime)s - %(processName)s - %(levelname)s - %(message)s'
+
+def expandir_pastas(padroes: List[str]) -> List[Path]:
+    """Pastas de competência dos argumentos (caminhos ou globs), sem repetição e em ordem"""
+    pastas = {}
+    for padrao in padroes:
+        for caminho in (glob.glob(padrao) if glob.has_magic(padrao) else [padrao]):
+            caminho = Path(caminho)
+            if caminho.is_dir():
+                pastas[caminho.resolve()] = caminho
+    return [pastas[chave] for chave in sorted(pastas)]
+
+def resolver_arquivos_entrada(pasta: Path, arquivos_obrigatorios: Dict) -> Dict[str, str]:
+    """
+    Nome da planilha de cada tipo na pasta (o mais recente, se houver vários)
+
+    Os padrões são comparados sem distinção de maiúsculas, como no catálogo.
+    """
+    classificadores = [
+        (tipo, re.compile(fnmatch.translate(config["pattern"]), re.IGNORECASE))
+        for tipo, config in arquivos_obrigatorios.items()
+    ]
+    encontrados = {}
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if not entrada.is_file() or entrada.name.startswith("~$"):
+                continue
+            tipo = next((tipo for tipo, padrao in classificadores if padrao.match(entrada.name)), None)
+            if tipo is None:
+                continue
+            mtime = entrada.stat().st_mtime_ns
+            if tipo not in encontrados or mtime > encontrados[tipo][1]:
+                encontrados[tipo] = (entrada.name, mtime)
+    return {tipo: nome for tipo, (nome, _) in encontrados.items()}
+
+def resolver_competencias(pastas: List[Path], arquivos_obrigatorios: Dict) -> Dict[str, Optional[str]]:
+    """
+    Competência AAAA-MM de cada pasta: MMAAAA no nome das planilhas ou, na falta, no nome da pasta
+
+    Raises:
+        ValueError: Duas pastas com a mesma pasta-mãe resolvem para a mesma competência
+    """
+    competencias = {}
+    por_cliente: Dict[tuple, Path] = {}
+    for pasta in pastas:
+        nomes = list(resolver_arquivos_entrada(pasta, arquivos_obrigatorios).values())
+        competencia = next(
+            (competencia for competencia in map(competencia_do_nome, nomes + [pasta.resolve().name]) if competencia),
+            None
+        )
+        competencias[str(pasta)] = competencia
+        if competencia is None:
+            continue
+        chave = (pasta.resolve().parent, competencia)
+        if chave in por_cliente:
+            raise ValueError(f"Competência {competencia} repetida em {por_cliente[chave]} e {pasta}")
+        por_cliente[chave] = pasta
+    return competencias
+
+def _inicializar_worker(nivel_log: int):
+    """
+    Inicializa cada processo do lote
+
+    Os módulos pesados já vêm com a importação deste módulo (uma vez por
+    processo); aqui só o log é configurado, com o nome do processo, antes
+    do basicConfig do FolhaPagamentoAutomation.
+    """
+    logging.basicConfig(level=nivel_log, format=FORMATO_LOG_LOTE)
+
+def processar_competencia(pasta: str, opcoes: Dict) -> Dict:
+    """
+    Processa uma pasta de competência (executada num processo do lote)
+
+    Args:
+        pasta: Pasta com as planilhas do mês
+        opcoes: competencia, pasta_saida, pasta_historico, cadastro_identidades,
+                paralelo (carregamento das fontes)
+
+    Returns:
+        Resumo da competência (JSON)
+    """
+    inicio = time.perf_counter()
+    resumo = {"pasta": pasta, "competencia": opcoes.get("competencia"), "status": "erro"}
+    try:
+        if not opcoes.get("competencia"):
+            resumo["erro"] = "Competência não identificada (nome das planilhas ou da pasta)"
+            return resumo
+
+        sistema = FolhaPagamentoAutomation(pasta)
+        arquivos = resolver_arquivos_entrada(Path(pasta), configuracao_validacao_padrao()["arquivos_obrigatorios"])
+        faltantes = sorted(set(sistema.config["arquivos_entrada"]) - set(arquivos))
+        if faltantes:
+            resumo["erro"] = f"Arquivos não encontrados: {', '.join(faltantes)}"
+            return resumo
+
+        sistema.config["arquivos_entrada"] = arquivos
+        sistema.config["competencia"] = opcoes["competencia"]
+        sistema.config["pasta_saida"] = opcoes.get("pasta_saida") or pasta
+        if opcoes.get("pasta_historico") is not None:
+            sistema.config["pasta_historico"] = opcoes["pasta_historico"]
+        if opcoes.get("cadastro_identidades") is not None:
+            sistema.config["cadastro_identidades"] = opcoes["cadastro_identidades"]
+
+        competencia = sistema.obter_competencia()
+        resumo["competencia"] = competencia
+        nome_saida = f"FolhaRainha.{competencia[5:]}.{competencia[2:4]}.xlsx"
+
+        sucesso = sistema.executar_processo_completo(paralelo=opcoes.get("paralelo", False), nome_arquivo=nome_saida)
+        relatorio = sistema.ultimo_relatorio or {}
+        resumo.update({
+            "status": "ok" if sucesso else "falha",
+            "funcionarios": relatorio.get("total_funcionarios"),
+            "empresas": relatorio.get("empresas", {}),
+            "arquivo_saida": str(sistema.caminho_saida(nome_saida)) if sucesso else None
+        })
+    except Exception as e:
+        resumo["erro"] = str(e)
+    finally:
+        resumo["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumo
+
+def _pasta_saida(pasta: Path, raiz_comum: Optional[Path], saida: Optional[Path]) -> Optional[str]:
+    """Pasta de saída da competência: espelha o caminho relativo à raiz comum"""
+    if saida is None:
+        return None
+    relativo = pasta.resolve().relative_to(raiz_comum) if raiz_comum else Path(pasta.name)
+    return str(saida / (relativo if str(relativo) != "." else pasta.name))
+
+def processar_lote(pastas: List[Path], max_workers: int = MAX_WORKERS_LOTE,
+                   saida: Optional[Path] = None, pasta_historico: Optional[str] = None,
+                   cadastro_identidades: Optional[str] = None) -> List[Dict]:
+    """
+    Processa as competências num pool de processos
+
+    Args:
+        pastas: Pastas de competência
+        max_workers: Processos simultâneos
+        saida: Pasta raiz dos resultados (None: cada pasta de competência)
+        pasta_historico: Histórico Parquet relativo à pasta-mãe de cada competência
+                         (None: o padrão, dentro de cada pasta)
+        cadastro_identidades: Banco de identidades relativo à pasta-mãe de cada
+                              competência (None: o padrão, dentro de cada pasta)
+
+    Returns:
+        Resumos na ordem das pastas
+
+    Raises:
+        ValueError: Competência repetida entre pastas do mesmo cliente
+    """
+    logger = logging.getLogger('ProcessadorLote')
+    competencias = resolver_competencias(pastas, configuracao_validacao_padrao()["arquivos_obrigatorios"])
+    raiz_comum = Path(os.path.commonpath([str(pasta.resolve()) for pasta in pastas])) if len(pastas) > 1 else None
+    opcoes = {
+        str(pasta): {
+            "competencia": competencias[str(pasta)],
+            "pasta_saida": _pasta_saida(pasta, raiz_comum, saida),
+            "pasta_historico": str(pasta.resolve().parent / pasta_historico) if pasta_historico else None,
+            "cadastro_identidades": (
+                str(pasta.resolve().parent / cadastro_identidades) if cadastro_identidades else None
+            ),
+            "paralelo": False
+        }
+        for pasta in pastas
+    }
+
+    workers = max(1, min(max_workers, len(pastas)))
+    logger.info(f"Processando {len(pastas)} competências com {workers} processos")
+
+    resumos = {}
+    if workers == 1:
+        # Sem pool: as fontes de cada mês usam o paralelismo do próprio processo
+        for pasta in pastas:
+            resumos[str(pasta)] = processar_competencia(str(pasta), {**opcoes[str(pasta)], "paralelo": True})
+            logger.info(f"{pasta}: {resumos[str(pasta)]['status']}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker,
+                                 initargs=(logging.getLogger().getEffectiveLevel(),)) as executor:
+            futuros = {executor.submit(processar_competencia, pasta, opcoes[pasta]): pasta for pasta in opcoes}
+            for futuro in as_completed(futuros):
+                pasta = futuros[futuro]
+                try:
+                    resumos[pasta] = futuro.result()
+                except Exception as e:
+                    resumos[pasta] = {"pasta": pasta, "competencia": None, "status": "erro", "erro": str(e)}
+                logger.info(f"{pasta}: {resumos[pasta]['status']}")
+
+    return [resumos[str(pasta)] for pasta in pastas]
+
+def consolidar_resumos(resumos: List[Dict], segundos: float) -> Dict:
+    """Resumo consolidado do lote"""
+    contagem = {}
+    for resumo in resumos:
+        contagem[resumo["status"]] = contagem.get(resumo["status"], 0) + 1
+    return {
+        "total_competencias": len(resumos),
+        "por_status": contagem,
+        "total_funcionarios": sum(resumo.get("funcionarios") or 0 for resumo in resumos),
+        "segundos": round(segundos, 3),
+        "segundos_somados": round(sum(resumo.get("segundos", 0) for resumo in resumos), 3),
+        "competencias": resumos
+    }
+
+def main():
+    """Processa em lote as pastas de competência informadas"""
+    parser = argparse.ArgumentParser(description="Processamento em lote da folha de pagamento")
+    parser.add_argument("pastas", nargs="+", help="Pastas de competência (aceita glob, ex: 'clientes/*/2025-0*')")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS_LOTE,
+                        help=f"Processos simultâneos (padrão: {MAX_WORKERS_LOTE})")
+    parser.add_argument("--saida", help="Pasta raiz dos resultados (padrão: a própria pasta de competência)")
+    parser.add_argument("--historico",
+                        help="Histórico Parquet relativo à pasta-mãe das competências (ex: clientes/A/historico)")
+    parser.add_argument("--identidades",
+                        help="Cadastro de identidades relativo à pasta-mãe das competências (ex: identidades.sqlite)")
+    parser.add_argument("--resumo", default="resumo_lote.json", help="Arquivo do resumo consolidado")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=FORMATO_LOG_LOTE)
+
+    print("PROCESSAMENTO EM LOTE DA FOLHA DE PAGAMENTO")
+    print("=" * 60)
+
+    pastas = expandir_pastas(args.pastas)
+    if not pastas:
+        print("Nenhuma pasta de competência encontrada")
+        return False
+
+    inicio = time.perf_counter()
+    try:
+        resumos = processar_lote(
+            pastas, args.workers, Path(args.saida) if args.saida else None, args.historico, args.identidades
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    consolidado = consolidar_resumos(resumos, time.perf_counter() - inicio)
+
+    with open(args.resumo, "w", encoding="utf-8") as f:
+        json.dump(consolidado, f, indent=2, ensure_ascii=False)
+
+    print("\nRESUMO DO LOTE:")
+    for resumo in resumos:
+        simbolo = "✅" if resumo["status"] == "ok" else "❌"
+        detalhe = f"{resumo.get('funcionarios')} funcionários" if resumo["status"] == "ok" else resumo.get("erro", resumo["status"])
+        print(f"   {simbolo} {resumo['competencia'] or '-':8} {resumo['pasta']}: {detalhe} ({resumo['segundos']:.1f}s)")
+    print(f"\n   Competências: {consolidado['total_competencias']} {consolidado['por_status']}")
+    print(f"   Tempo total: {consolidado['segundos']:.1f}s (somado: {consolidado['segundos_somados']:.1f}s)")
+    print(f"   Resumo salvo em: {args.resumo}")
+
+    return consolidado["por_status"].get("ok", 0) == len(resumos)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
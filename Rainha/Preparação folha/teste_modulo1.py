@@ -7,12 +7,23 @@ Execute este arquivo para testar o Módulo 1 com seus dados
 
 import sys
 import os
+import json
+import shutil
+import tempfile
 from pathlib import Path
 
 # Adicionar o caminho do módulo
 sys.path.append(str(Path(__file__).parent))
 
-from modulo1_validacao import ValidadorArquivos
+from modulo1_backup import ArmazemBackup
+from modulo1_validacao import ValidadorArquivos, carregar_configuracao_validacao, configuracao_validacao_padrao
+
+PASTA_DADOS = Path(__file__).parent / "Base de Dados"
+
+def criar_base(pasta: Path) -> Path:
+    """Pasta base temporária com uma cópia da Base de Dados"""
+    shutil.copytree(PASTA_DADOS, pasta / "Base de Dados")
+    return pasta
 
 def executar_teste_completo():
     """Executa teste completo do Módulo 1"""
@@ -150,6 +161,144 @@ def testar_descoberta_arquivos():
         print(f"❌ Erro: {e}")
         return False
 
+def testar_descoberta_por_competencia():
+    """Extrato, Gratificação e não contábil (sem MMAAAA no nome) ficam na competência da pasta"""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+        validador = ValidadorArquivos(criar_base(Path(pasta)))
+        arquivos = validador.descobrir_arquivos("2025-05")
+        assert sorted(arquivos) == sorted(validador.config["arquivos_obrigatorios"])
+
+        # Outra árvore no mesmo catálogo não é considerada
+        outra = Path(pasta) / "Outro cliente"
+        outra.mkdir()
+        shutil.copy(PASTA_DADOS / "FOLHA GENESIS EXCEL 052025.xlsx", outra)
+        validador.catalogo.atualizar(outra)
+        assert validador.descobrir_arquivos("2025-05")["genesis"].parent == validador.pasta_dados.resolve()
+        validador.catalogo.fechar()
+
+def testar_competencias_misturadas_grava_relatorio():
+    """FENIX de outro mês sem competência informada: erro no relatório, sem os resultados anteriores"""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+        validador = ValidadorArquivos(criar_base(Path(pasta)))
+        sucesso, _ = validador.executar_validacao_completa()
+        assert sucesso
+
+        junho = validador.pasta_dados / "2025" / "Junho"
+        junho.mkdir(parents=True)
+        shutil.copy(PASTA_DADOS / "FOLHA DE PAGAMENTO 052025 EXCEL fenix.xlsx", junho / "folha fenix 062025.xlsx")
+
+        sucesso, relatorio = validador.executar_validacao_completa()
+        with open(validador.base_path / "relatorio_validacao.json", "r", encoding="utf-8") as f:
+            salvo = json.load(f)
+        validador.catalogo.fechar()
+        assert not sucesso
+        assert "competências diferentes" in relatorio["erro"]
+        assert salvo["erro"] == relatorio["erro"] and salvo["detalhes"] == {}
+
+def testar_monitoramento_ve_subpastas():
+    """O instantâneo do monitoramento usa a varredura do catálogo (subpastas, sem distinção de maiúsculas)"""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+        validador = ValidadorArquivos(criar_base(Path(pasta)))
+        junho = validador.pasta_dados / "2025" / "Junho"
+        junho.mkdir(parents=True)
+        novo = junho / "folha fenix 062025.xlsx"
+        shutil.copy(PASTA_DADOS / "FOLHA DE PAGAMENTO 052025 EXCEL fenix.xlsx", novo)
+
+        instantaneo = validador._instantaneo_pasta()
+        validador.catalogo.fechar()
+        assert str(novo) in instantaneo
+        assert validador.tipos_do_arquivo(str(novo)) == ["fenix"]
+
+def testar_configuracao_do_sistema():
+    """Validações e backup do config_sistema.json substituem as padrão, chave a chave"""
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = Path(pasta) / "config_sistema.json"
+        arquivo.write_text(json.dumps({
+            "validacoes": {"linhas_cabecalho": 3},
+            "backup": {"manter_sessoes": 5}
+        }), encoding="utf-8")
+
+        padrao = configuracao_validacao_padrao()
+        config = carregar_configuracao_validacao(arquivo)
+        assert config["validacoes"]["linhas_cabecalho"] == 3
+        assert config["validacoes"]["tamanho_minimo_kb"] == padrao["validacoes"]["tamanho_minimo_kb"]
+        assert config["backup"] == {**padrao["backup"], "manter_sessoes": 5}
+        assert carregar_configuracao_validacao(Path(pasta) / "ausente.json") == padrao
+
+def criar_arquivos(pasta: Path, conteudos: dict) -> dict:
+    """Grava arquivos nome: conteúdo e retorna tipo (nome sem extensão): caminho"""
+    arquivos = {}
+    for nome, conteudo in conteudos.items():
+        arquivo = pasta / nome
+        arquivo.write_bytes(conteudo)
+        arquivos[arquivo.stem] = arquivo
+    return arquivos
+
+def testar_backup_deduplica_conteudo():
+    """Conteúdos iguais (no mesmo backup ou em sessões diferentes) viram um único objeto"""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+        pasta = Path(pasta)
+        armazem = ArmazemBackup(pasta / "backup")
+        arquivos = criar_arquivos(pasta, {"fenix.xlsx": b"mesmo conteudo", "genesis.xlsx": b"mesmo conteudo"})
+
+        primeira = armazem.criar_sessao(arquivos)
+        segunda = armazem.criar_sessao({"fenix": arquivos["fenix"]})
+
+        objetos = list(armazem.pasta_objetos.glob("??/*"))
+        assert len(objetos) == 1
+        hashes = {info["hash"] for sessao in (primeira, segunda) for info in sessao["arquivos"].values()}
+        assert hashes == {objetos[0].name}
+
+def testar_restauracao_confere_hash():
+    """A restauração devolve o conteúdo original e recusa um objeto corrompido"""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+        pasta = Path(pasta)
+        armazem = ArmazemBackup(pasta / "backup")
+        arquivos = criar_arquivos(pasta, {"fenix.xlsx": b"folha fenix", "genesis.xlsx": b"folha genesis"})
+        manifesto = armazem.criar_sessao(arquivos)
+        sessao = armazem.listar_sessoes()[-1]
+
+        restaurados = armazem.restaurar(sessao.name, pasta / "restaurados")
+        assert {tipo: alvo.read_bytes() for tipo, alvo in restaurados.items()} == {
+            "fenix": b"folha fenix", "genesis": b"folha genesis"
+        }
+
+        # Objetos são somente leitura: corromper exige liberar a escrita
+        objeto = armazem.pasta_backup / manifesto["arquivos"]["fenix"]["objeto"]
+        os.chmod(objeto, 0o600)
+        objeto.write_bytes(b"conteudo corrompido")
+        try:
+            armazem.restaurar(sessao.name, pasta / "corrompidos", ["fenix"])
+        except ValueError as erro:
+            assert "Hash divergente" in str(erro)
+        else:
+            raise AssertionError("objeto corrompido restaurado sem erro")
+
+def testar_coleta_lixo_mantem_ultima_sessao_por_tipo():
+    """A coleta remove sessões antigas, exceto a última de cada tipo, e os objetos órfãos"""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as pasta:
+        pasta = Path(pasta)
+        armazem = ArmazemBackup(pasta / "backup", {"manter_sessoes": 1, "manter_dias": 0})
+        arquivos = criar_arquivos(pasta, {"fenix.xlsx": b"fenix v1", "genesis.xlsx": b"genesis v1"})
+        armazem.criar_sessao(arquivos)
+        arquivos["fenix"].write_bytes(b"fenix v2")
+        armazem.criar_sessao({"fenix": arquivos["fenix"]})
+        primeira, segunda = armazem.listar_sessoes()
+
+        # A primeira sessão tem o único backup do genesis: nada é removido
+        resumo = armazem.coletar_lixo()
+        assert resumo["sessoes_removidas"] == [] and resumo["objetos_removidos"] == 0
+
+        arquivos["genesis"].write_bytes(b"genesis v2")
+        armazem.criar_sessao({"genesis": arquivos["genesis"]})
+        resumo = armazem.coletar_lixo()
+
+        # fenix v1 e genesis v1 só eram referenciados pela primeira sessão
+        assert resumo["sessoes_removidas"] == [primeira.name]
+        assert resumo["objetos_removidos"] == 2
+        assert armazem.listar_sessoes()[0] == segunda
+        assert len(list(armazem.pasta_objetos.glob("??/*"))) == 2
+
 def main():
     """Função principal"""
     print("🧪 BATERIA DE TESTES - MÓDULO 1")
@@ -166,6 +315,16 @@ def main():
     sucesso_validacao = executar_teste_completo()
     print()
     
+    # Teste 3: Catálogo, relatório e backup (asserts; também executados pelo pytest)
+    print("📋 TESTE 3: Catálogo, Relatório e Backup")
+    for teste in [testar_descoberta_por_competencia, testar_competencias_misturadas_grava_relatorio,
+                  testar_monitoramento_ve_subpastas, testar_configuracao_do_sistema,
+                  testar_backup_deduplica_conteudo, testar_restauracao_confere_hash,
+                  testar_coleta_lixo_mantem_ultima_sessao_por_tipo]:
+        teste()
+        print(f"   ✅ {teste.__name__}")
+    print()
+    
     # Resumo final
     print("🏆 RESUMO DOS TESTES:")
     print(f"   Descoberta de arquivos: {'✅' if sucesso_descoberta else '❌'}")
@@ -0,0 +1,131 @@
+"""
+TESTE DO MÓDULO 2 - PROCESSADORES DA FOLHA
+Testes de regressão dos processadores do Report (Fenix/Genesis)
+
+Execute este arquivo diretamente ou com pytest
+"""
+
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+# Adicionar o caminho do módulo
+sys.path.append(str(Path(__file__).parent))
+
+from modulo2_processador_fenix import ProcessadorFenix
+from modulo2_processador_genesis import ProcessadorGenesis
+
+PASTA_DADOS = Path(__file__).parent / "Base de Dados"
+
+# Report mínimo no formato da folha: empresa, cabeçalho do funcionário com
+# salário e função, admissão (data), rubricas com valores de três casas
+# decimais (não podem ser lidos como milhar) e a linha de totais do resumo.
+# A terceira coluna só tem números: o pandas a lê como float (7.0) e o
+# openpyxl como int (7).
+LINHAS_REPORT = [
+    ["Empresa :", "GENESIS COML CAMA MESA E BANHO LTDA"],
+    ["000007", "FULANO DE TAL", 1500, "Função :", "VENDEDOR"],
+    ["Admissão :", datetime(2020, 1, 2)],
+    ["001", "Salário Base", 30, "1.500,00"],
+    ["903", "INSS Folha", 16.605],
+    ["914", "IRRF Folha", 2.125],
+    ["604", "Vale Transporte", 7],
+    ["Resumo do Líquido", 1527, 18.73, 1508.27],
+    ["000008", "BELTRANO", 1200, "Função :", "CAIXA"],
+    ["903", "INSS Folha", 90],
+]
+
+def criar_report(pasta: Path, linhas=LINHAS_REPORT) -> Path:
+    """Grava um xlsx com a sheet Report a partir das linhas informadas"""
+    workbook = openpyxl.Workbook()
+    planilha = workbook.active
+    planilha.title = "Report"
+    for linha in linhas:
+        planilha.append(linha)
+    arquivo = pasta / "Report.xlsx"
+    workbook.save(arquivo)
+    return arquivo
+
+def valores_por_atributo(df: pd.DataFrame) -> dict:
+    """Valor de cada atributo do funcionário 000007"""
+    df = df[df['Codigo'] == "000007"]
+    return dict(zip(df['Atributo'], df['Valor']))
+
+def testar_valores_float_lote_e_streaming():
+    """Floats do Excel mantêm o valor nos dois caminhos (16.605 não vira 16605)"""
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = criar_report(Path(pasta))
+        esperado = {
+            "Salario Total": 1500.0, "Salário Base": 1500.0, "INSS Folha": 16.605,
+            "IRRF Folha": 2.125, "Vale Transporte": 7.0
+        }
+
+        for streaming in (False, True):
+            processador = ProcessadorFenix(arquivo)
+            valores = valores_por_atributo(processador.processar_estrutura_dados(streaming=streaming))
+            assert set(valores) == set(esperado), (streaming, valores)
+            for atributo, valor in esperado.items():
+                assert abs(valores[atributo] - valor) < 1e-9, (streaming, atributo, valores[atributo])
+            assert not processador.valores_invalidos
+
+def testar_lote_igual_streaming():
+    """Leitura em lote e em streaming produzem os mesmos textos e valores"""
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = criar_report(Path(pasta))
+
+        resultados = {}
+        for streaming in (False, True):
+            processador = ProcessadorFenix(arquivo)
+            df = processador.processar_estrutura_dados(streaming=streaming)
+            auditoria = processador.obter_auditoria("000007")
+            resultados[streaming] = (df, [linha['indice'] for linha in auditoria],
+                                     [linha['textos'] for linha in auditoria])
+
+        df_lote, indices_lote, textos_lote = resultados[False]
+        df_streaming, indices_streaming, textos_streaming = resultados[True]
+        pd.testing.assert_frame_equal(df_lote, df_streaming)
+        assert textos_lote == textos_streaming
+        # Auditoria: do cabeçalho até a linha anterior ao próximo funcionário
+        assert indices_lote == indices_streaming == list(range(1, 8))
+        assert textos_lote[0][2] == "1500"
+        assert textos_lote[5] == ["604", "Vale Transporte", "7"]
+        assert set(df_lote['LOJAS']) == {"GENESIS COML CAMA MESA E BANHO LTDA"}
+
+def testar_layout_sem_linha_de_totais():
+    """A linha de totais do resumo (127,27 / 9,54 / 117,73) não vira rubrica"""
+    arquivos = [
+        (ProcessadorGenesis, "FOLHA DE PAGAMENTO 052025 EXCEL fenix.xlsx"),
+        (ProcessadorFenix, "FOLHA GENESIS EXCEL 052025.xlsx"),
+    ]
+    for classe, nome in arquivos:
+        processador = classe(PASTA_DADOS / nome)
+        df = processador.processar_estrutura_dados()
+
+        assert len(df) > 0, nome
+        assert not df['Valor'].isna().any(), (nome, df[df['Valor'].isna()])
+        numericos = df['Atributo'].astype(str).str.fullmatch(r"[\d.,]+")
+        assert not numericos.any(), (nome, df.loc[numericos, 'Atributo'].tolist())
+        assert not processador.valores_invalidos, (nome, processador.valores_invalidos)
+
+def main():
+    """Função principal"""
+    print("🧪 BATERIA DE TESTES - MÓDULO 2")
+    print("=" * 60)
+
+    testes = [
+        testar_valores_float_lote_e_streaming, testar_lote_igual_streaming,
+        testar_layout_sem_linha_de_totais
+    ]
+    for teste in testes:
+        teste()
+        print(f"✅ {teste.__name__}")
+
+    print()
+    print(f"🎉 {len(testes)} testes concluídos com sucesso")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+TESTE DO MÓDULO 4 - DIFERENÇAS ENTRE COMPETÊNCIAS
+Testes da comparação da folha com a competência anterior (DiferencaFolha)
+
+Execute este arquivo diretamente ou com pytest
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o caminho do módulo
+sys.path.append(str(Path(__file__).parent))
+
+from modulo4_diferencas import CHAVES_FOLHA_AGRUPADA, COLUNA_TIPO, DiferencaFolha
+
+def tipos_por_chave(diferencas: pd.DataFrame, chaves: list) -> dict:
+    """Tipo Alteração de cada chave (tupla) do resultado"""
+    return {
+        tuple(linha[:-1]): linha[-1]
+        for linha in diferencas[chaves + [COLUNA_TIPO]].astype(object).itertuples(index=False)
+    }
+
+def testar_novos_removidos_alterados():
+    """Só as rubricas novas, removidas e alteradas aparecem, com o delta"""
+    anterior = pd.DataFrame({
+        'Codigo': ["000001", "000001", "000002", "000003"],
+        'Atributo': ["Salario Total", "INSS Folha", "Salario Total", "Salario Total"],
+        'Valor': [1500.0, 120.0, 2000.0, 1800.0]
+    })
+    atual = pd.DataFrame({
+        'Codigo': ["000001", "000001", "000002", "000004"],
+        'Atributo': ["Salario Total", "INSS Folha", "Salario Total", "Salario Total"],
+        'Valor': [1500.0, 135.5, 2000.0, 1518.0]
+    })
+
+    diferencas = DiferencaFolha().comparar(atual, anterior)
+    assert tipos_por_chave(diferencas, ['Codigo', 'Atributo']) == {
+        ("000001", "INSS Folha"): "alterado",
+        ("000003", "Salario Total"): "removido",
+        ("000004", "Salario Total"): "novo"
+    }
+    deltas = dict(zip(diferencas['Codigo'], diferencas['Delta']))
+    assert deltas == {"000001": 15.5, "000003": -1800.0, "000004": 1518.0}
+    assert DiferencaFolha().resumir(diferencas) == {
+        'novo': 1, 'removido': 1, 'alterado': 1, 'delta_total': -266.5
+    }
+
+def testar_tolerancia_de_um_centavo():
+    """Diferenças de arredondamento abaixo de meio centavo não contam; um centavo conta"""
+    anterior = pd.DataFrame({'Codigo': ["1", "2"], 'Atributo': ["Salario Total"] * 2, 'Valor': [100.0, 100.0]})
+    atual = pd.DataFrame({'Codigo': ["1", "2"], 'Atributo': ["Salario Total"] * 2, 'Valor': [100.004, 100.01]})
+
+    diferencas = DiferencaFolha().comparar(atual, anterior)
+    assert diferencas['Codigo'].tolist() == ["2"]
+    assert diferencas[COLUNA_TIPO].tolist() == ["alterado"]
+    assert abs(diferencas['Delta'].iloc[0] - 0.01) < 1e-9
+
+def testar_valor_que_vira_ou_deixa_de_ser_nan():
+    """Um valor que deixa de ser reconhecido (NaN), ou volta a ser, é alterado; NaN nos dois não"""
+    anterior = pd.DataFrame({
+        'Codigo': ["1", "2", "3"], 'Atributo': ["INSS Folha"] * 3, 'Valor': [50.0, np.nan, np.nan]
+    })
+    atual = pd.DataFrame({
+        'Codigo': ["1", "2", "3"], 'Atributo': ["INSS Folha"] * 3, 'Valor': [np.nan, 60.0, np.nan]
+    })
+
+    diferencas = DiferencaFolha().comparar(atual, anterior)
+    assert tipos_por_chave(diferencas, ['Codigo', 'Atributo']) == {
+        ("1", "INSS Folha"): "alterado",
+        ("2", "INSS Folha"): "alterado"
+    }
+    assert dict(zip(diferencas['Codigo'], diferencas['Delta'])) == {"1": -50.0, "2": 60.0}
+
+def testar_chaves_nulas_da_folha_agrupada():
+    """Linhas Fenix/Genesis (sem Empregador) e sem Codigo juntam pelas chaves nulas"""
+    anterior = pd.DataFrame({
+        'Empresa': ["Extrato", "Extrato", "Fenix", "Genesis", "Fenix"],
+        'Empregador': ["716 - PRATTIKA", "717 - OUTRA", None, None, None],
+        'Codigo': ["1", "1", "000007", "000007", None],
+        'Atributo': ["Salario Total"] * 4 + ["Gratificação"],
+        'Valor': [1000.0, 2000.0, 1500.0, 1600.0, 300.0]
+    })
+    # Mês atual com as chaves como categorias e outra ordem de linhas
+    atual = anterior.iloc[::-1].reset_index(drop=True)
+    atual = atual.assign(Valor=atual['Valor'].where(atual['Empresa'] != "Genesis", 1700.0))
+    atual = atual.astype({'Empresa': "category", 'Empregador': "category", 'Atributo': "category"})
+
+    diferencas = DiferencaFolha(CHAVES_FOLHA_AGRUPADA).comparar(atual, anterior)
+    assert len(diferencas) == 1
+    linha = diferencas.iloc[0]
+    assert (linha['Empresa'], linha['Codigo'], linha[COLUNA_TIPO]) == ("Genesis", "000007", "alterado")
+    assert pd.isna(linha['Empregador'])
+    assert linha['Delta'] == 100.0
+
+def main():
+    """Função principal"""
+    print("🧪 BATERIA DE TESTES - MÓDULO 4")
+    print("=" * 60)
+
+    testes = [
+        testar_novos_removidos_alterados, testar_tolerancia_de_um_centavo,
+        testar_valor_que_vira_ou_deixa_de_ser_nan, testar_chaves_nulas_da_folha_agrupada
+    ]
+    for teste in testes:
+        teste()
+        print(f"✅ {teste.__name__}")
+
+    print()
+    print(f"🎉 {len(testes)} testes concluídos com sucesso")
+
+if __name__ == "__main__":
+    main()
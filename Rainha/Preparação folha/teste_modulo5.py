@@ -0,0 +1,87 @@
+"""
+TESTE DO MÓDULO 5 - CADASTRO DE IDENTIDADES
+Testes das regras de gravação do CadastroIdentidades
+
+Execute este arquivo diretamente ou com pytest
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar o caminho do módulo
+sys.path.append(str(Path(__file__).parent))
+
+from modulo5_conciliacao_nomes import normalizar_nome
+from modulo5_identidades import METODO_FOLHA, METODO_MANUAL, CadastroIdentidades
+
+def folha(linhas: list, empregador: bool = False) -> pd.DataFrame:
+    """Folha mínima com Nome e Codigo (e Empregador, como no Extrato)"""
+    colunas = ["Nome", "Codigo", "Empregador"] if empregador else ["Nome", "Codigo"]
+    return pd.DataFrame(linhas, columns=colunas)
+
+def testar_manual_nao_sobrescrito():
+    """Uma confirmação manual não é trocada por conciliação nem pela folha, só por outra manual"""
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = Path(pasta) / "identidades.sqlite"
+        cadastro = CadastroIdentidades(banco)
+        assert cadastro.confirmar("Maria da Silva", "Fenix", "000010", "rh")
+
+        gravados = cadastro.registrar([("MARIA DA  SILVA", "Fenix", "000099", 0.9, "jaro_winkler", "automatico")])
+        assert gravados == 0
+        cadastro.aprender_folha({"Fenix": folha([["Maria da Silva", "000099"]])})
+        assert cadastro.identidade("maria da silva") == ("Fenix", "000010")
+        cadastro.fechar()
+
+        # A confirmação persiste no banco, com o método manual
+        cadastro = CadastroIdentidades(banco)
+        assert cadastro.identidade("Maria da Silva") == ("Fenix", "000010")
+        assert cadastro.metodos[normalizar_nome("Maria da Silva")] == METODO_MANUAL
+        assert cadastro.confirmar("Maria da Silva", "Fenix", "000011", "rh")
+        assert cadastro.identidade("Maria da Silva") == ("Fenix", "000011")
+        cadastro.fechar()
+
+def testar_conflitos_removidos():
+    """Um nome com duas identidades nas folhas do mês não é aprendido e sai do cadastro"""
+    with tempfile.TemporaryDirectory() as pasta:
+        cadastro = CadastroIdentidades(Path(pasta) / "identidades.sqlite")
+        extrato = folha([
+            ["JOSE SANTOS", "1", "716 - PRATTIKA"],
+            ["ANA LIMA", "2", "716 - PRATTIKA"],
+            ["CARLOS REIS", "3", "716 - PRATTIKA"]
+        ], empregador=True)
+        cadastro.aprender_folha({"Extrato": extrato}, competencia="2025-04")
+        assert cadastro.identidade("Jose Santos") == ("716 - PRATTIKA", "1")
+        cadastro.confirmar("Carlos Reis", "716 - PRATTIKA", "3", "rh")
+
+        # No mês seguinte os mesmos nomes aparecem também na Fenix, com outro código
+        fenix = folha([["José  Santos", "000007"], ["Carlos Reis", "000008"], ["Paulo Souza", "000009"]])
+        cadastro.aprender_folha({"Extrato": extrato, "Fenix": fenix}, competencia="2025-05")
+
+        assert cadastro.identidade("JOSE SANTOS") is None
+        assert normalizar_nome("José Santos") not in cadastro.metodos
+        assert cadastro.identidade("ANA LIMA") == ("716 - PRATTIKA", "2")
+        assert cadastro.identidade("Paulo Souza") == ("Fenix", "000009")
+        assert cadastro.metodos[normalizar_nome("Paulo Souza")] == METODO_FOLHA
+        # Confirmações manuais não são removidas pelos conflitos
+        assert cadastro.identidade("Carlos Reis") == ("716 - PRATTIKA", "3")
+        assert cadastro.estatisticas() == {METODO_FOLHA: 2, METODO_MANUAL: 1}
+        cadastro.fechar()
+
+def main():
+    """Função principal"""
+    print("🧪 BATERIA DE TESTES - MÓDULO 5")
+    print("=" * 60)
+
+    testes = [testar_manual_nao_sobrescrito, testar_conflitos_removidos]
+    for teste in testes:
+        teste()
+        print(f"✅ {teste.__name__}")
+
+    print()
+    print(f"🎉 {len(testes)} testes concluídos com sucesso")
+
+if __name__ == "__main__":
+    main()
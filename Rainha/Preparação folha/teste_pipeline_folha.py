@@ -0,0 +1,105 @@
+"""
+TESTE DO PIPELINE DA FOLHA
+Testes das impressões digitais e da propagação de falhas do PipelineFolha
+
+Execute este arquivo diretamente ou com pytest
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar o caminho do módulo
+sys.path.append(str(Path(__file__).parent))
+
+from pipeline_folha import PREFIXO_ARQUIVO, Etapa, PipelineFolha
+
+# Etapas de teste (funções de módulo: são executadas em outros processos)
+
+def ler_numeros(entradas, config):
+    """Lê os números (um por linha) do arquivo de entrada"""
+    arquivo = next(iter(entradas.values()))
+    return pd.DataFrame({"valor": [int(linha) for linha in arquivo.read_text().split()]})
+
+def somar(entradas, config):
+    """Soma os valores das etapas de entrada"""
+    return pd.DataFrame({"total": [int(sum(df["valor"].sum() for df in entradas.values()))]})
+
+def falhar(entradas, config):
+    """Etapa que sempre falha"""
+    raise ValueError("falha proposital")
+
+def montar_pipeline(pasta: Path) -> PipelineFolha:
+    """DAG: ler_a e ler_b (arquivos a.txt e b.txt) alimentam somar"""
+    arquivos = {"a": pasta / "a.txt", "b": pasta / "b.txt"}
+    arquivos["a"].write_text("1\n2\n")
+    arquivos["b"].write_text("10\n")
+
+    pipeline = PipelineFolha(pasta / "pipeline", arquivos)
+    pipeline.adicionar_etapa(Etapa("ler_a", ler_numeros, [f"{PREFIXO_ARQUIVO}a"]))
+    pipeline.adicionar_etapa(Etapa("ler_b", ler_numeros, [f"{PREFIXO_ARQUIVO}b"]))
+    pipeline.adicionar_etapa(Etapa("somar", somar, ["ler_a", "ler_b"]))
+    return pipeline
+
+def status(resultados: dict) -> dict:
+    """Status de cada etapa do resultado de executar"""
+    return {nome: resultado["status"] for nome, resultado in resultados.items()}
+
+def testar_reexecuta_so_o_que_mudou():
+    """Mudar uma entrada reexecuta só a etapa dela e as dependentes"""
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        pipeline = montar_pipeline(pasta)
+
+        assert set(status(pipeline.executar(max_workers=2)).values()) == {"executada"}
+        assert set(status(pipeline.executar(max_workers=2)).values()) == {"em cache"}
+
+        # Mesmo conteúdo regravado: a impressão usa o MD5, não a data
+        pipeline.arquivos["b"].write_text("10\n")
+        assert set(status(pipeline.executar(max_workers=2)).values()) == {"em cache"}
+
+        pipeline.arquivos["b"].write_text("20\n")
+        assert status(pipeline.executar(max_workers=2)) == {
+            "ler_a": "em cache", "ler_b": "executada", "somar": "executada"
+        }
+        assert pipeline.obter_saida("somar")["total"].tolist() == [23]
+
+def testar_erro_bloqueia_dependentes():
+    """Uma etapa com erro bloqueia as dependentes (diretas e indiretas), não as independentes"""
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        pipeline = montar_pipeline(pasta)
+        pipeline.adicionar_etapa(Etapa("falhar", falhar, ["ler_a"]))
+        pipeline.adicionar_etapa(Etapa("depois_da_falha", somar, ["falhar", "ler_b"]))
+        pipeline.adicionar_etapa(Etapa("final", somar, ["depois_da_falha"]))
+
+        resultados = pipeline.executar(max_workers=2)
+        assert status(resultados) == {
+            "ler_a": "executada", "ler_b": "executada", "somar": "executada",
+            "falhar": "erro", "depois_da_falha": "bloqueada", "final": "bloqueada"
+        }
+        assert "falha proposital" in resultados["falhar"]["erro"]
+
+        # Etapas com erro ou bloqueadas não ficam no estado: são tentadas de novo
+        assert status(pipeline.executar(max_workers=2)) == {
+            "ler_a": "em cache", "ler_b": "em cache", "somar": "em cache",
+            "falhar": "erro", "depois_da_falha": "bloqueada", "final": "bloqueada"
+        }
+
+def main():
+    """Função principal"""
+    print("🧪 BATERIA DE TESTES - PIPELINE DA FOLHA")
+    print("=" * 60)
+
+    testes = [testar_reexecuta_so_o_que_mudou, testar_erro_bloqueia_dependentes]
+    for teste in testes:
+        teste()
+        print(f"✅ {teste.__name__}")
+
+    print()
+    print(f"🎉 {len(testes)} testes concluídos com sucesso")
+
+if __name__ == "__main__":
+    main()
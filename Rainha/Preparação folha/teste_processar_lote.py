@@ -0,0 +1,75 @@
+"""
+TESTE DO PROCESSAMENTO EM LOTE
+Testes da resolução das competências das pastas (resolver_competencias)
+
+Execute este arquivo diretamente ou com pytest
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Adicionar o caminho do módulo
+sys.path.append(str(Path(__file__).parent))
+
+from modulo1_validacao import configuracao_validacao_padrao
+from processar_lote import resolver_competencias
+
+ARQUIVOS_OBRIGATORIOS = configuracao_validacao_padrao()["arquivos_obrigatorios"]
+
+def criar_pasta(raiz: Path, caminho: str, nomes: list) -> Path:
+    """Pasta de competência com planilhas vazias (só os nomes importam)"""
+    pasta = raiz / caminho
+    pasta.mkdir(parents=True)
+    for nome in nomes:
+        (pasta / nome).touch()
+    return pasta
+
+def testar_competencia_pelas_planilhas_ou_pela_pasta():
+    """MMAAAA das planilhas tem prioridade; sem ele vale o nome da pasta; sem os dois, None"""
+    with tempfile.TemporaryDirectory() as raiz:
+        raiz = Path(raiz)
+        pelas_planilhas = criar_pasta(raiz, "cliente/2025-06", ["FOLHA GENESIS EXCEL 052025.xlsx", "Extrato Mensal.xlsx"])
+        pela_pasta = criar_pasta(raiz, "cliente/07-2025", ["Extrato Mensal.xlsx", "Gratificação.xlsx"])
+        sem_competencia = criar_pasta(raiz, "cliente/atual", ["Extrato Mensal.xlsx"])
+
+        competencias = resolver_competencias([pelas_planilhas, pela_pasta, sem_competencia], ARQUIVOS_OBRIGATORIOS)
+        assert competencias == {
+            str(pelas_planilhas): "2025-05",
+            str(pela_pasta): "2025-07",
+            str(sem_competencia): None
+        }
+
+def testar_competencia_repetida_no_mesmo_cliente():
+    """Duas pastas irmãs na mesma competência interrompem o lote; clientes diferentes não"""
+    with tempfile.TemporaryDirectory() as raiz:
+        raiz = Path(raiz)
+        maio = criar_pasta(raiz, "cliente_a/2025-05", ["Extrato Mensal.xlsx"])
+        copia = criar_pasta(raiz, "cliente_a/maio", ["FOLHA DE PAGAMENTO 052025 EXCEL fenix.xlsx"])
+        outro_cliente = criar_pasta(raiz, "cliente_b/2025-05", ["Extrato Mensal.xlsx"])
+
+        competencias = resolver_competencias([maio, outro_cliente], ARQUIVOS_OBRIGATORIOS)
+        assert set(competencias.values()) == {"2025-05"}
+
+        try:
+            resolver_competencias([maio, copia, outro_cliente], ARQUIVOS_OBRIGATORIOS)
+        except ValueError as erro:
+            assert "2025-05" in str(erro) and str(copia) in str(erro)
+        else:
+            raise AssertionError("competência repetida aceita")
+
+def main():
+    """Função principal"""
+    print("🧪 BATERIA DE TESTES - PROCESSAMENTO EM LOTE")
+    print("=" * 60)
+
+    testes = [testar_competencia_pelas_planilhas_ou_pela_pasta, testar_competencia_repetida_no_mesmo_cliente]
+    for teste in testes:
+        teste()
+        print(f"✅ {teste.__name__}")
+
+    print()
+    print(f"🎉 {len(testes)} testes concluídos com sucesso")
+
+if __name__ == "__main__":
+    main()